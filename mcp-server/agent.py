@@ -5,11 +5,35 @@ Connects Ollama LLM with MCP server for command execution
 """
 
 import json
+import re
 import subprocess
+import time
 import sys
 import os
 import asyncio
-from typing import Optional, Dict, Any
+import codecs
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Optional, Dict, Any, Tuple
+
+from ollama_client import OllamaClient, OllamaError, DEFAULT_KEEP_ALIVE
+from system_context import SystemContextCache
+from system_collectors import collect
+from output_capture import run_streaming
+from file_reader import read_file
+from kube_cache import KubeCache
+from kube_health import summarize
+from response_cache import ResponseCache
+from tool_registry import REGISTRY
+from conversation_memory import ConversationMemory, HISTORY_TOKENS
+from output_compactor import compact, is_log_call
+from tool_call_parser import ToolCallExtractor, extract_tool_calls
+from model_router import ModelRouter, DEFAULT_MODELS as ROUTE_MODELS
+from tool_result_cache import ToolResultCache
+from prefetch import Prefetcher, guess_calls
+from tracing import Trace, TraceLog, ollama_stats
+from system_tools import kubernetes_tool
 
 # ANSI Colors
 GREEN = "\033[92m"
@@ -19,479 +43,413 @@ BLUE = "\033[94m"
 RESET = "\033[0m"
 BOLD = "\033[1m"
 
+# Context window large enough that the static system prefix is never truncated
+# (front truncation would change the prefix and defeat Ollama's KV cache reuse)
+NUM_CTX = 8192
+
+# Generated from the tool registry; identical across runs so the prompt prefix stays cacheable
+TOOL_CATALOGUE = REGISTRY.prompt_section()
+
+# Generation cap for tool-selection turns; a tool call is a few dozen tokens
+TOOL_NUM_PREDICT = 256
+# Start of a constrained turn's plain answer, whitespace removed
+ANSWER_PREFIX = '{"answer":'
+
+# Default number of plan/act rounds per request (LLM turn + tool execution)
+MAX_STEPS = 3
+# Read-only tool calls from one step run concurrently, up to this many at once
+MAX_PARALLEL_TOOLS = 4
+# Characters of each tool result fed back to the LLM between steps
+FEEDBACK_CHARS = 2000
+
+# Words asking for up-to-date results instead of reusing a cached tool result
+FRESH_WORDS = re.compile(r"\b(fresh|refresh|re-?run|latest|again)\b", re.IGNORECASE)
+
+# Per-probe timeout for system_status subprocesses (e.g. kubectl against an unreachable cluster)
+PROBE_TIMEOUT = 5
+
+
+def _run_probe(cmd: list) -> str:
+    """Run a status probe, raising on failure so it is reported as a partial result"""
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"{cmd[0]} exited with {result.returncode}")
+    return result.stdout
+
 class MCPAgent:
-    def __init__(self, model="qwen2.5-coder:3b", auto_approve=False):
+    def __init__(self, model="qwen2.5-coder:3b", auto_approve=False, keep_alive=DEFAULT_KEEP_ALIVE,
+                 stream=True, refresh_context=False, kube_cache=False, llm=None,
+                 response_cache=True, fuzzy_cache=False, max_steps=MAX_STEPS,
+                 history_tokens=HISTORY_TOKENS, constrained=True, route=False, route_models=None,
+                 route_score=False, fresh=False, prefetch=True, profile=False, cwd=None):
         self.model = model
         self.auto_approve = auto_approve
-        self.conversation_history = []
-        self.system_context = self._get_system_context()
-        
-    def _get_system_context(self):
-        """Get system context"""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        context_script = os.path.join(script_dir, "..", "get-system-context.sh")
-        
+        self.stream = stream
+        self.max_steps = max(1, max_steps)
+        # Constrain tool-selection turns to the registry's JSON schema (Ollama `format`)
+        self.constrained = constrained
+        self.llm = llm or OllamaClient(keep_alive=keep_alive)
+        # Per-request model choice (fast/default/strong); without it every turn uses self.model
+        self.router = ModelRouter(route_models, llm=self.llm, score=route_score) if route else None
+        self.active_model = model
+        self._turn_seconds = 0.0
+        # Read-only tool results reused within their TTL; fresh=True always re-runs tools
+        self.tool_cache = ToolResultCache()
+        self.fresh = fresh
+        self._fresh_request = False
+        # Directory relative paths and commands resolve against (None = process cwd)
+        self.cwd = cwd
+        # Batch mode: no one to ask, and LLM turns / tool runs share bounded worker slots
+        self.can_prompt = True
+        self.llm_slots = None
+        self.tool_slots = None
+        self.kube_cache = KubeCache().start() if kube_cache else None
+        self._response_streamed = False
+        self._output_streamed = False
+        self.memory = ConversationMemory(budget=history_tokens)
+        # Per-phase timings of the current request; printed and logged with profile=True
+        self.profile = profile
+        self.trace_log = TraceLog() if profile else None
+        self.trace: Optional[Trace] = None
+        self.last_trace: Optional[Trace] = None
+        started = time.monotonic()
+        self.system_context = self._get_system_context(force_refresh=refresh_context)
+        self._startup = [{"phase": "context", "seconds": round(time.monotonic() - started, 4), "startup": True}]
+        self.system_prompt = self._build_system_prompt()
+        self.response_cache = ResponseCache(f"{model}\n{TOOL_CATALOGUE}", fuzzy=fuzzy_cache) if response_cache else None
+        # Tools that need agent state; the rest use the registry's shared handlers
+        self._handlers = {
+            "execute_command": self._execute_command,
+            "read_file": self._read_file_tool,
+            "write_file": self._write_file_tool,
+            "kubernetes": self._kubernetes_tool,
+            "system_status": self._system_status_tool,
+            "recall_output": lambda args: self.memory.recall(
+                args.get("handle", ""), args.get("start_line"), args.get("end_line")),
+        }
+        # Likely read-only calls started while the LLM is still thinking
+        self.prefetcher = Prefetcher(self._run_prefetch) if prefetch else None
+        
+    def _get_system_context(self, force_refresh=False):
+        """Get system context from the on-disk cache (stale fields refresh in the background)"""
         try:
-            result = subprocess.run(
-                ["bash", context_script],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.stdout
-        except:
+            return SystemContextCache().render(force_refresh=force_refresh, cwd=self.cwd)
+        except Exception:
             return ""
     
-    def _sway_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Manage Sway window manager configuration"""
-        action = args.get("action", "help")
-        config_path = os.path.expanduser("~/.config/sway/config")
-        
-        if action == "show-config":
-            try:
-                with open(config_path, 'r') as f:
-                    return {"content": f.read()}
-            except FileNotFoundError:
-                return {"error": f"Config file not found: {config_path}"}
-        
-        elif action == "list-keybindings":
-            try:
-                with open(config_path, 'r') as f:
-                    lines = f.readlines()
-                keybindings = [line.strip() for line in lines if line.strip().startswith('bindsym')]
-                return {"keybindings": "\n".join(keybindings)}
-            except FileNotFoundError:
-                return {"error": f"Config file not found: {config_path}"}
-        
-        elif action == "add-keybinding":
-            key = args.get("key")
-            command = args.get("command")
-            if not key or not command:
-                return {"error": "Both 'key' and 'command' arguments required"}
-            
-            binding_line = f"bindsym {key} exec {command}\n"
-            try:
-                with open(config_path, 'a') as f:
-                    f.write(binding_line)
-                return {"status": "success", "message": f"Added: {binding_line.strip()}"}
-            except Exception as e:
-                return {"error": str(e)}
-        
-        elif action == "reload":
-            result = subprocess.run(["swaymsg", "reload"], capture_output=True, text=True)
-            return {"output": result.stdout, "status": "success" if result.returncode == 0 else "failed"}
-        
-        else:
-            return {"error": f"Unknown action: {action}. Available: show-config, list-keybindings, add-keybinding, reload"}
+    def _resolve_path(self, path: str) -> str:
+        """Expand ~ and resolve relative paths against the agent's working directory"""
+        path = os.path.expanduser(path)
+        if self.cwd and not os.path.isabs(path):
+            path = os.path.join(self.cwd, path)
+        return path
     
-    def _waybar_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Manage Waybar configuration"""
-        action = args.get("action", "help")
-        config_path = os.path.expanduser("~/.config/waybar/config.jsonc")
-        
-        if action == "show-config":
-            try:
-                with open(config_path, 'r') as f:
-                    return {"content": f.read()}
-            except FileNotFoundError:
-                # Try without .jsonc extension
-                config_path = os.path.expanduser("~/.config/waybar/config")
+    def _execute_command(self, args: Dict[str, Any], stream_output: bool = False) -> Dict[str, Any]:
+        """Run a bash command; with stream_output its output is printed live as it arrives"""
+        cmd = args.get("command")
+        working_dir = args.get("working_dir")
+        decoders = {
+            "stdout": codecs.getincrementaldecoder("utf-8")(errors="replace"),
+            "stderr": codecs.getincrementaldecoder("utf-8")(errors="replace"),
+        }
+        streamed = False
+        
+        def show(stream, chunk):
+            nonlocal streamed
+            if not streamed:
+                print(f"\n{BOLD}output:{RESET}")
+                streamed = True
+            text = decoders[stream].decode(chunk)
+            if stream == "stderr":
+                text = f"{RED}{text}{RESET}"
+            print(text, end="", flush=True)
+        
+        result = run_streaming(
+            cmd,
+            shell=True,
+            cwd=self._resolve_path(working_dir) if working_dir else self.cwd,
+            timeout=REGISTRY.get("execute_command").timeout,
+            on_output=show if stream_output else None
+        )
+        if streamed:
+            print()
+            self._output_streamed = True
+        return result
+    
+    def _system_status_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Check system resources, running all probes concurrently"""
+        component = args.get("component", "all")
+        
+        # cpu, memory, disk and network are read natively from /proc and /sys
+        probes = {}
+        for name in ["cpu", "memory", "disk", "network"]:
+            if component in [name, "all"]:
+                probes[name] = (collect, name)
+        if component in ["docker", "all"]:
+            probes["docker"] = (_run_probe, ["docker", "ps", "-a"])
+        if component in ["kubernetes", "all"]:
+            probes["k8s_context"] = (_run_probe, ["kubectl", "config", "current-context"])
+            probes["k8s_nodes"] = (_run_probe, ["kubectl", "get", "nodes"])
+            probes["k8s_pods"] = (_run_probe, ["kubectl", "get", "pods"])
+        
+        # Fan out so the report takes as long as the slowest probe, not the sum;
+        # each subprocess probe is bounded by PROBE_TIMEOUT and failures are partial
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(probes) or 1) as pool:
+            futures = {name: pool.submit(fn, arg) for name, (fn, arg) in probes.items()}
+            for name, future in futures.items():
                 try:
-                    with open(config_path, 'r') as f:
-                        return {"content": f.read()}
-                except FileNotFoundError:
-                    return {"error": "Waybar config not found"}
-        
-        elif action == "restart":
-            # Kill existing waybar
-            subprocess.run(["killall", "waybar"], capture_output=True)
-            # Start new one
-            result = subprocess.run(["waybar", "&"], shell=True, capture_output=True, text=True)
-            return {"status": "success", "message": "Waybar restarted"}
-        
-        elif action == "reload":
-            subprocess.run(["killall", "-SIGUSR2", "waybar"], capture_output=True)
-            return {"status": "success", "message": "Waybar reloaded"}
-        
-        else:
-            return {"error": f"Unknown action: {action}. Available: show-config, restart, reload"}
+                    results[name] = future.result()
+                except subprocess.TimeoutExpired:
+                    results[name] = {"error": f"timed out after {PROBE_TIMEOUT}s"}
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+        
+        status = {name: results[name] for name in ["cpu", "memory", "disk", "network", "docker"]
+                  if name in results}
+        
+        if component in ["kubernetes", "all"]:
+            k8s_info = ""
+            context = results["k8s_context"]
+            if isinstance(context, str):
+                k8s_info += f"Context: {context.strip()}\n\n"
+            if isinstance(results["k8s_nodes"], str):
+                k8s_info += "Nodes:\n" + results["k8s_nodes"] + "\n"
+            if isinstance(results["k8s_pods"], str):
+                k8s_info += "Pods:\n" + results["k8s_pods"]
+            status["kubernetes"] = k8s_info or results["k8s_nodes"]
+        
+        return status if status else {"output": "No data available"}
     
-    def _network_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Manage network configuration"""
-        action = args.get("action", "status")
-        
-        if action == "status":
-            result = subprocess.run(["nmcli", "device", "status"], capture_output=True, text=True)
-            return {"output": result.stdout}
-        
-        elif action == "connections":
-            result = subprocess.run(["nmcli", "connection", "show"], capture_output=True, text=True)
-            return {"output": result.stdout}
+    def _build_system_prompt(self) -> str:
+        """Build the static prompt prefix (system context + tool catalogue).
+
+        This never changes within a session, so it is sent as the chat system
+        message and Ollama can reuse its evaluated KV cache on every turn.
+        """
+        return f"{self.system_context}\n\n{TOOL_CATALOGUE}"
+    
+    def _build_messages(self, prompt: str) -> list:
+        """Build the chat messages: static system prefix, then the variable tail"""
+        messages = [{"role": "system", "content": self.system_prompt}]
         
-        elif action == "wifi-list":
-            result = subprocess.run(["nmcli", "device", "wifi", "list"], capture_output=True, text=True)
-            return {"output": result.stdout}
+        # Summary of older turns plus recent ones, fitted to the history token budget
+        messages.extend(self.memory.messages())
         
-        elif action == "set-dns":
-            connection = args.get("connection")
-            dns = args.get("dns")
-            if not connection or not dns:
-                return {"error": "Both 'connection' and 'dns' required"}
-            
-            result = subprocess.run(
-                ["nmcli", "connection", "modify", connection, "ipv4.dns", dns],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                # Reload connection
-                subprocess.run(["nmcli", "connection", "up", connection], capture_output=True)
-                return {"status": "success", "message": f"DNS set to {dns} for {connection}"}
-            return {"error": result.stderr}
-        
-        else:
-            return {"error": f"Unknown action: {action}. Available: status, connections, wifi-list, set-dns"}
+        answer = ' as {"answer": "..."}' if self.constrained else ""
+        messages.append({"role": "user", "content": f"""Current user request: {prompt}
+
+Respond with the appropriate JSON tool call, or if it's a question about previous output, answer based on conversation history{answer}."""})
+        return messages
     
-    def _systemd_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Manage systemd services"""
-        action = args.get("action", "status")
-        service = args.get("service", "")
-        
-        if action == "status":
-            if not service:
-                return {"error": "Service name required"}
-            result = subprocess.run(["systemctl", "status", service], capture_output=True, text=True)
-            return {"output": result.stdout}
-        
-        elif action == "restart":
-            if not service:
-                return {"error": "Service name required"}
-            result = subprocess.run(["systemctl", "restart", service], capture_output=True, text=True)
-            return {"status": "success" if result.returncode == 0 else "failed", "output": result.stderr}
-        
-        elif action == "enable":
-            if not service:
-                return {"error": "Service name required"}
-            result = subprocess.run(["systemctl", "enable", service], capture_output=True, text=True)
-            return {"status": "success" if result.returncode == 0 else "failed", "output": result.stdout}
-        
-        elif action == "disable":
-            if not service:
-                return {"error": "Service name required"}
-            result = subprocess.run(["systemctl", "disable", service], capture_output=True, text=True)
-            return {"status": "success" if result.returncode == 0 else "failed", "output": result.stdout}
-        
-        elif action == "logs":
-            if not service:
-                return {"error": "Service name required"}
-            lines = args.get("lines", "50")
-            result = subprocess.run(["journalctl", "-u", service, "-n", str(lines)], capture_output=True, text=True)
-            return {"output": result.stdout}
-        
-        elif action == "list":
-            result = subprocess.run(["systemctl", "list-units", "--type=service", "--all"], capture_output=True, text=True)
-            return {"output": result.stdout}
-        
-        else:
-            return {"error": f"Unknown action: {action}. Available: status, restart, enable, disable, logs, list"}
+    def _phase(self, name: str, **fields):
+        """Time a block in the current request's trace"""
+        return self.trace.phase(name, **fields) if self.trace else nullcontext({})
     
     def _ask_llm(self, prompt: str) -> str:
         """Ask the LLM a question"""
-        # Build conversation history
-        history_context = ""
-        if self.conversation_history:
-            history_context = "\n\nPrevious conversation:\n"
-            for entry in self.conversation_history[-3:]:  # Last 3 exchanges
-                history_context += f"\nUser: {entry['user']}\n"
-                if 'tool_result' in entry:
-                    history_context += f"Tool result: {entry['tool_result'][:500]}...\n"  # Truncate long outputs
-        
-        full_prompt = f"""{self.system_context}
-{history_context}
-
-You have access to system tools via MCP (Model Context Protocol).
-
-When the user asks you to do something, respond with a JSON tool call in this format:
-{{
-  "tool": "tool_name",
-  "arguments": {{"arg1": "value1"}},
-  "explanation": "what this will do"
-}}
-
-Available tools:
-- execute_command: Run bash commands (args: command, working_dir)
-  Example: {{"tool": "execute_command", "arguments": {{"command": "cat /etc/os-release"}}, "explanation": "Check OS version"}}
-  Example: {{"tool": "execute_command", "arguments": {{"command": "df -h"}}, "explanation": "Check disk space"}}
-  Use this for: OS version, hostname, date/time, uptime, specific file operations, package info
-
-- read_file: Read file contents (args: path)
-  Example: {{"tool": "read_file", "arguments": {{"path": "/etc/hostname"}}, "explanation": "Read hostname file"}}
-
-- write_file: Write to files (args: path, content)
-
-- sway: Manage Sway window manager (args: action = show-config|list-keybindings|add-keybinding|reload, key = for add-keybinding, command = for add-keybinding)
-  Example: {{"tool": "sway", "arguments": {{"action": "show-config"}}, "explanation": "Show Sway configuration file"}}
-  Example: {{"tool": "sway", "arguments": {{"action": "list-keybindings"}}, "explanation": "List all Sway keybindings"}}
-  Example: {{"tool": "sway", "arguments": {{"action": "add-keybinding", "key": "Mod+d", "command": "rofi -show drun"}}, "explanation": "Add Mod+d keybinding for rofi"}}
-  Example: {{"tool": "sway", "arguments": {{"action": "reload"}}, "explanation": "Reload Sway configuration"}}
-
-- waybar: Manage Waybar status bar (args: action = show-config|restart|reload)
-  Example: {{"tool": "waybar", "arguments": {{"action": "show-config"}}, "explanation": "Show Waybar configuration"}}
-  Example: {{"tool": "waybar", "arguments": {{"action": "restart"}}, "explanation": "Restart Waybar"}}
-  Example: {{"tool": "waybar", "arguments": {{"action": "reload"}}, "explanation": "Reload Waybar config without restarting"}}
-
-- network: Manage network configuration (args: action = status|connections|wifi-list|set-dns, connection = for set-dns, dns = for set-dns)
-  Example: {{"tool": "network", "arguments": {{"action": "status"}}, "explanation": "Show network device status"}}
-  Example: {{"tool": "network", "arguments": {{"action": "connections"}}, "explanation": "List network connections"}}
-  Example: {{"tool": "network", "arguments": {{"action": "set-dns", "connection": "Wired connection 1", "dns": "8.8.8.8"}}, "explanation": "Set DNS to Google DNS"}}
-
-- systemd: Manage system services (args: action = status|restart|enable|disable|logs|list, service = service name, lines = for logs)
-  Example: {{"tool": "systemd", "arguments": {{"action": "status", "service": "docker"}}, "explanation": "Check Docker service status"}}
-  Example: {{"tool": "systemd", "arguments": {{"action": "restart", "service": "networkmanager"}}, "explanation": "Restart NetworkManager"}}
-  Example: {{"tool": "systemd", "arguments": {{"action": "logs", "service": "sshd", "lines": "100"}}, "explanation": "Show last 100 lines of SSH logs"}}
-  Example: {{"tool": "systemd", "arguments": {{"action": "list"}}, "explanation": "List all systemd services"}}
-
-- kubernetes: Manage Kubernetes resources (args: action = pods|deployments|services|namespaces|all|check-health|logs|describe, namespace = optional|all, pod = required for logs/describe, tail = optional for logs, resource = optional)
-  Example: {{"tool": "kubernetes", "arguments": {{"action": "pods", "namespace": "grafana"}}, "explanation": "Get pods in grafana namespace"}}
-  Example: {{"tool": "kubernetes", "arguments": {{"action": "pods", "namespace": "all"}}, "explanation": "Get pods in all namespaces"}}
-  Example: {{"tool": "kubernetes", "arguments": {{"action": "check-health"}}, "explanation": "Check for any pods with issues across entire cluster"}}
-  Example: {{"tool": "kubernetes", "arguments": {{"action": "logs", "pod": "grafana-6cf4bffb9-9mlkq", "namespace": "grafana", "tail": "50"}}, "explanation": "Get last 50 logs from grafana pod"}}
-  Example: {{"tool": "kubernetes", "arguments": {{"action": "describe", "pod": "gpu-operator-node-feature-discovery-prune-nf4tp", "namespace": "gpu-operator"}}, "explanation": "Describe pod to see why it's in error state"}}
-  Use action "check-health" when user asks about problems, issues, or health status.
-  IMPORTANT: When showing logs or describing a pod, use the SAME namespace where that pod was found!
-
-- system_status: Check system resources ONLY (args: component = cpu|memory|disk|network|docker|kubernetes|all)
-  Example: {{"tool": "system_status", "arguments": {{"component": "disk"}}, "explanation": "Check disk usage"}}
-  Use this ONLY for: memory usage, disk space summary, CPU info
-  DO NOT use this for OS version - use execute_command with "cat /etc/os-release" instead
-
-Current user request: {prompt}
-
-Respond with the appropriate JSON tool call, or if it's a question about previous output, answer based on conversation history.
-"""
+        with self._phase("prompt") as entry:
+            messages = self._build_messages(prompt)
+            entry["messages"] = len(messages)
+        return self._complete(messages, select_tool=True)
+    
+    def _complete(self, messages: list, select_tool: bool = False) -> str:
+        """Run one LLM turn over prepared chat messages.
+        
+        Tool-selection turns are constrained to the tool call schema and
+        capped at TOOL_NUM_PREDICT tokens, so they are short and always parse.
+        The cap is sized for tool calls: when the model answers in prose
+        instead, or a call runs past the cap, the turn is re-run uncapped.
+        """
+        self._response_streamed = False
+        started = time.monotonic()
+        try:
+            with self.llm_slots or nullcontext(), self._phase("llm", model=self.active_model) as stats:
+                return self._generate(messages, select_tool, stats)
+        finally:
+            self._turn_seconds = time.monotonic() - started
+    
+    def _generate(self, messages: list, select_tool: bool, stats: Dict[str, Any]) -> str:
+        options = {"num_ctx": NUM_CTX}
+        extra = {}
+        capped = select_tool and self.constrained
+        if capped:
+            options["num_predict"] = TOOL_NUM_PREDICT
+            extra["format"] = REGISTRY.response_schema()
+        text, truncated, answering = self._chat(messages, options, extra, stats, stop_on_answer=capped)
+        if capped and (truncated or answering):
+            # Answers get a full, unconstrained turn so they stream as plain text;
+            # a long tool call (write_file content) keeps the schema but not the cap
+            stats["rerun"] = "answer" if answering else "truncated"
+            del options["num_predict"]
+            text, _, _ = self._chat(messages, options, {} if answering else extra, stats, stop_on_answer=False)
+        return text
+    
+    def _chat(self, messages: list, options: Dict[str, Any], extra: Dict[str, Any], stats: Dict[str, Any],
+              stop_on_answer: bool) -> Tuple[str, bool, bool]:
+        """One /api/chat call; returns (text, cut off by num_predict, stopped because the model is answering)"""
+        if self.stream:
+            return self._stream_llm(messages, options, extra, stats, stop_on_answer)
         
-        result = subprocess.run(
-            ["ollama", "run", self.model, full_prompt],
-            capture_output=True,
-            text=True,
-            timeout=60
+        try:
+            result = self.llm.chat(self.active_model, messages, options=options, **extra)
+        except OllamaError as e:
+            return f"Error talking to Ollama: {e}", False, False
+        
+        stats.update(ollama_stats(result))
+        text = result.get("message", {}).get("content", "").strip()
+        return text, result.get("done_reason") == "length", False
+    
+    def _stream_llm(self, messages: list, options: Dict[str, Any], extra: Dict[str, Any],
+                    stats: Dict[str, Any], stop_on_answer: bool = False) -> Tuple[str, bool, bool]:
+        """Stream tokens to the terminal, stopping as soon as a valid tool call is complete.
+        
+        With stop_on_answer, a reply that starts as {"answer": ...} is held back
+        and cancelled, so the caller can ask for the answer as plain text.
+        """
+        detector = ToolCallExtractor()
+        started = time.monotonic()
+        chunks = self.llm.chat_stream(self.active_model, messages, options=options, **extra)
+        print()
+        stats["tokens"] = 0
+        held = "" if stop_on_answer else None
+        truncated = answering = False
+        try:
+            for chunk in chunks:
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    if not stats["tokens"]:
+                        # Prompt evaluation (and model load) happen before the first token
+                        stats["first_token"] = round(time.monotonic() - started, 4)
+                    stats["tokens"] += 1
+                if chunk.get("done"):
+                    # Ollama only reports eval counts and durations in the final chunk
+                    stats.update(ollama_stats(chunk))
+                    truncated = chunk.get("done_reason") == "length"
+                if held is not None:
+                    held += token
+                    head = "".join(held.split())
+                    if head.startswith(ANSWER_PREFIX):
+                        stats["cancelled"] = not chunk.get("done")
+                        answering = True
+                        break
+                    if ANSWER_PREFIX.startswith(head) and not chunk.get("done"):
+                        continue
+                    token, held = held, None
+                print(token, end="", flush=True)
+                if detector.feed(token):
+                    # Cancel the rest of the generation; the tool call is all we need
+                    stats["cancelled"] = not chunk.get("done")
+                    break
+        except OllamaError as e:
+            print()
+            return f"Error talking to Ollama: {e}", False, False
+        finally:
+            chunks.close()
+        if answering:
+            return "", False, True
+        print()
+        
+        self._response_streamed = True
+        if detector.tool_call_text is not None:
+            return detector.tool_call_text, False, False
+        return detector.text.strip(), truncated, False
+    
+    def _read_file_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Read a file, or a byte/line range of it"""
+        # Expand ~ to home directory
+        file_path = self._resolve_path(args["path"])
+        return read_file(
+            file_path,
+            offset=args.get("offset"),
+            length=args.get("length"),
+            start_line=args.get("start_line"),
+            end_line=args.get("end_line"),
+            tail=args.get("tail")
         )
+    
+    def _write_file_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Write content to a file, creating parent directories"""
+        # Expand ~ to home directory
+        file_path = self._resolve_path(args["path"])
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as f:
+            f.write(args["content"])
+        return {"status": "success"}
+    
+    def _kubernetes_tool(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Query Kubernetes resources, from the watched cache when it is enabled"""
+        action = args.get("action", "status")
+        namespace = args.get("namespace", "")
+        
+        if self.kube_cache:
+            if action == "check-health":
+                if self.kube_cache.ready("pods") and self.kube_cache.ready("nodes"):
+                    return {"output": summarize(self.kube_cache.items("pods", "all"),
+                                                self.kube_cache.items("nodes"))}
+            elif action in ("pods", "deployments", "services", "namespaces") and self.kube_cache.ready(action):
+                return {"output": self.kube_cache.get(action, namespace)}
         
-        return result.stdout.strip()
+        return kubernetes_tool(args)
+    
+    def _handler(self, tool: str):
+        return self._handlers.get(tool) or REGISTRY.get(tool).handler
+    
+    def _run_prefetch(self, tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        # Speculative calls count against the same tool slots as real ones (batch mode)
+        with self.tool_slots or nullcontext():
+            return self._handler(tool)(args)
     
-    def _execute_tool(self, tool_call: dict) -> dict:
-        """Execute an MCP tool"""
+    def _prefetch(self, user_input: str):
+        """Start the read-only calls the request probably needs, unless already cached"""
+        fresh = self.fresh or self._fresh_request
+        calls = [call for call in guess_calls(user_input)
+                 if fresh or not self.tool_cache.contains(call["tool"], call["arguments"],
+                                                          REGISTRY.get(call["tool"]).ttl(call["arguments"]))]
+        with self._phase("prefetch") as entry:
+            self.prefetcher.start(calls)
+            entry["started"] = len(calls)
+    
+    def _execute_tool(self, tool_call: dict, stream_output: bool = False) -> dict:
+        """Execute an MCP tool; stream_output prints command output live (foreground calls only)"""
         tool = tool_call.get("tool")
         args = tool_call.get("arguments", {})
         
-        if tool == "execute_command":
-            cmd = args.get("command")
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return {
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "returncode": result.returncode
-            }
-        
-        elif tool == "read_file":
-            # Expand ~ to home directory
-            file_path = os.path.expanduser(args["path"])
-            with open(file_path, 'r') as f:
-                return {"content": f.read()}
-        
-        elif tool == "write_file":
-            # Expand ~ to home directory
-            file_path = os.path.expanduser(args["path"])
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'w') as f:
-                f.write(args["content"])
-            return {"status": "success"}
-        
-        elif tool == "network_info":
-            result = subprocess.run(
-                ["nmcli", "device", "status"],
-                capture_output=True,
-                text=True
-            )
-            return {"output": result.stdout}
-        
-        elif tool == "kubernetes":
-            action = args.get("action", "status")
-            namespace = args.get("namespace", "")
-            resource = args.get("resource", "pods")
+        spec = REGISTRY.get(tool)
+        if spec is None:
+            return {"error": f"Unknown tool: {tool}"}
+        
+        with self._phase("tool", tool=tool) as entry:
+            ttl = spec.ttl(args)
+            if ttl and not (self.fresh or self._fresh_request or args.get("fresh")):
+                cached = self.tool_cache.get(tool, args, ttl)
+                if cached:
+                    result, age = cached
+                    print(f"{GREEN}⚡ Reusing {tool} result from {age:.0f}s ago{RESET}")
+                    entry["source"] = "cache"
+                    return result
             
-            # Special case for all namespaces
-            if namespace == "all" or action == "check-health":
-                ns_flag = ["--all-namespaces"]
-            elif namespace:
-                ns_flag = ["-n", namespace]
+            result = self.prefetcher.take(tool, args) if self.prefetcher and spec.is_read_only(args) else None
+            if result is not None:
+                print(f"{GREEN}⚡ Using prefetched {tool} result{RESET}")
+                entry["source"] = "prefetch"
             else:
-                ns_flag = []
-            
-            if action == "check-health":
-                # Check for pods with issues across all namespaces
-                result = subprocess.run(
-                    ["kubectl", "get", "pods", "--all-namespaces", 
-                     "--field-selector=status.phase!=Running,status.phase!=Succeeded"],
-                    capture_output=True,
-                    text=True
-                )
-                output = result.stdout
-                if not output.strip() or "No resources found" in output:
-                    # Also check for pods that are running but not ready
-                    result2 = subprocess.run(
-                        ["kubectl", "get", "pods", "--all-namespaces"],
-                        capture_output=True,
-                        text=True
-                    )
-                    lines = result2.stdout.split('\n')
-                    issues = [lines[0]]  # header
-                    for line in lines[1:]:
-                        if line and 'Running' in line:
-                            parts = line.split()
-                            if len(parts) >= 3:
-                                ready = parts[2]  # READY column
-                                if '/' in ready:
-                                    current, total = ready.split('/')
-                                    if current != total:
-                                        issues.append(line)
-                    
-                    if len(issues) > 1:
-                        output = '\n'.join(issues)
+                with self.tool_slots or nullcontext():
+                    if stream_output and tool == "execute_command":
+                        result = self._execute_command(args, stream_output=True)
                     else:
-                        output = "All pods are healthy!"
-                return {"output": output}
-            
-            elif action == "pods":
-                result = subprocess.run(
-                    ["kubectl", "get", "pods"] + ns_flag,
-                    capture_output=True,
-                    text=True
-                )
-            elif action == "deployments":
-                result = subprocess.run(
-                    ["kubectl", "get", "deployments"] + ns_flag,
-                    capture_output=True,
-                    text=True
-                )
-            elif action == "services":
-                result = subprocess.run(
-                    ["kubectl", "get", "services"] + ns_flag,
-                    capture_output=True,
-                    text=True
-                )
-            elif action == "logs":
-                pod_name = args.get("pod", "")
-                tail_lines = args.get("tail", "100")
-                container = args.get("container", "")
-                
-                if not pod_name:
-                    return {"error": "Pod name required for logs"}
-                
-                log_cmd = ["kubectl", "logs", pod_name] + ns_flag + ["--tail=" + str(tail_lines)]
-                if container:
-                    log_cmd.extend(["-c", container])
-                
-                result = subprocess.run(
-                    log_cmd,
-                    capture_output=True,
-                    text=True
-                )
-            elif action == "describe":
-                pod_name = args.get("pod", "")
-                if not pod_name:
-                    return {"error": "Pod name required for describe"}
-                
-                result = subprocess.run(
-                    ["kubectl", "describe", "pod", pod_name] + ns_flag,
-                    capture_output=True,
-                    text=True
-                )
-            elif action == "namespaces":
-                result = subprocess.run(
-                    ["kubectl", "get", "namespaces"],
-                    capture_output=True,
-                    text=True
-                )
-            elif action == "all":
-                result = subprocess.run(
-                    ["kubectl", "get", "all"] + ns_flag,
-                    capture_output=True,
-                    text=True
-                )
-            else:
-                result = subprocess.run(
-                    ["kubectl", "get", resource] + ns_flag,
-                    capture_output=True,
-                    text=True
-                )
-            
-            return {"output": result.stdout if result.returncode == 0 else result.stderr}
-        
-        elif tool == "system_status":
-            component = args.get("component", "all")
-            outputs = []
-            
-            if component in ["cpu", "all"]:
-                result = subprocess.run(["lscpu"], capture_output=True, text=True)
-                outputs.append("=== CPU Info ===\n" + result.stdout)
-            
-            if component in ["memory", "all"]:
-                result = subprocess.run(["free", "-h"], capture_output=True, text=True)
-                outputs.append("=== Memory ===\n" + result.stdout)
-            
-            if component in ["disk", "all"]:
-                result = subprocess.run(["df", "-h"], capture_output=True, text=True)
-                outputs.append("=== Disk ===\n" + result.stdout)
-            
-            if component in ["network", "all"]:
-                result = subprocess.run(["nmcli", "device", "status"], capture_output=True, text=True)
-                outputs.append("=== Network ===\n" + result.stdout)
-            
-            if component in ["docker", "all"]:
-                result = subprocess.run(["docker", "ps", "-a"], capture_output=True, text=True)
-                if result.returncode == 0:
-                    outputs.append("=== Docker Containers ===\n" + result.stdout)
-            
-            if component in ["kubernetes", "all"]:
-                # Get current context
-                ctx_result = subprocess.run(["kubectl", "config", "current-context"], capture_output=True, text=True)
-                # Get nodes
-                nodes_result = subprocess.run(["kubectl", "get", "nodes"], capture_output=True, text=True)
-                # Get pods in current namespace
-                pods_result = subprocess.run(["kubectl", "get", "pods"], capture_output=True, text=True)
-                
-                k8s_info = "=== Kubernetes Cluster ===\n"
-                if ctx_result.returncode == 0:
-                    k8s_info += f"Context: {ctx_result.stdout.strip()}\n\n"
-                if nodes_result.returncode == 0:
-                    k8s_info += "Nodes:\n" + nodes_result.stdout + "\n"
-                if pods_result.returncode == 0:
-                    k8s_info += "Pods:\n" + pods_result.stdout
-                
-                outputs.append(k8s_info)
-            
-            return {"output": "\n\n".join(outputs) if outputs else "No data available"}
-        
-        elif tool == "sway":
-            return self._sway_tool(args)
-        
-        elif tool == "waybar":
-            return self._waybar_tool(args)
-        
-        elif tool == "network":
-            return self._network_tool(args)
-        
-        elif tool == "systemd":
-            return self._systemd_tool(args)
-        
-        else:
-            return {"error": f"Unknown tool: {tool}"}
+                        result = self._handler(tool)(args)
+            if ttl:
+                self.tool_cache.put(tool, args, result)
+            elif not spec.is_read_only(args):
+                self._invalidate()
+            return result
+    
+    def _invalidate(self):
+        """Forget cached and prefetched results; they may predate a change to the system"""
+        self.tool_cache.clear()
+        if self.prefetcher:
+            self.prefetcher.discard()
     
     def _confirm_action(self, tool_call: dict) -> bool:
         """Ask user to confirm action"""
@@ -517,6 +475,10 @@ Respond with the appropriate JSON tool call, or if it's a question about previou
             print(f"{GREEN}✓ Auto-approved:{RESET} {tool_call.get('explanation', tool)}")
             return True
         
+        if not self.can_prompt:
+            print(f"{RED}✗ Needs confirmation, skipped (use -y to allow):{RESET} {tool_call.get('explanation', tool)}")
+            return False
+        
         # Ask for confirmation on file writes
         print(f"\n{YELLOW}🤖 LLM wants to:{RESET}")
         print(f"{BOLD}{tool_call.get('explanation', 'Execute tool')}{RESET}")
@@ -536,76 +498,251 @@ Respond with the appropriate JSON tool call, or if it's a question about previou
         
         return response == 'y'
     
-    def process_request(self, user_input: str):
-        """Process user request"""
-        print(f"\n{GREEN}🤔 Thinking...{RESET}")
-        
-        # Ask LLM
-        response = self._ask_llm(user_input)
-        
-        # Check if response is a tool call
+    @staticmethod
+    def _unwrap_answer(response: str) -> Optional[str]:
+        """The text of a {"answer": "..."} reply, or None"""
+        if not response.lstrip().startswith("{"):
+            return None
         try:
-            # Strip markdown code blocks if present
-            cleaned_response = response.strip()
-            if cleaned_response.startswith('```'):
-                # Extract JSON from code block
-                lines = cleaned_response.split('\n')
-                # Remove first line (```json or ```) and last line (```)
-                if lines[0].startswith('```'):
-                    lines = lines[1:]
-                if lines and lines[-1].strip() == '```':
-                    lines = lines[:-1]
-                cleaned_response = '\n'.join(lines).strip()
+            parsed = json.loads(response)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(parsed, dict) and isinstance(parsed.get("answer"), str):
+            return parsed["answer"]
+        return None
+    
+    def _run_calls(self, calls: list) -> list:
+        """Execute approved tool calls in order; consecutive read-only calls run concurrently.
+        
+        Returns (result, output_streamed) pairs in the order of calls.
+        """
+        results = [None] * len(calls)
+        i = 0
+        while i < len(calls):
+            spec = REGISTRY.get(calls[i].get("tool"))
+            if spec is None or not spec.is_read_only(calls[i].get("arguments", {})):
+                # Mutating (or unknown) calls run alone, after everything planned before them
+                results[i] = self._run_in_foreground(calls[i])
+                i += 1
+                continue
             
-            # Try to parse as JSON
-            if cleaned_response.startswith('{'):
-                tool_call = json.loads(cleaned_response)
-                
-                if "tool" in tool_call:
-                    # Confirm with user
-                    if self._confirm_action(tool_call):
-                        print(f"\n{GREEN}✓ Executing...{RESET}")
-                        result = self._execute_tool(tool_call)
-                        
-                        print(f"\n{GREEN}✓ Result:{RESET}")
-                        result_str = ""
-                        if isinstance(result, dict):
-                            for key, value in result.items():
-                                if value:
-                                    print(f"\n{BOLD}{key}:{RESET}")
-                                    print(value)
-                                    result_str += f"{key}: {value}\n"
-                        else:
-                            print(result)
-                            result_str = str(result)
-                        
-                        # Store in conversation history
-                        self.conversation_history.append({
-                            'user': user_input,
-                            'tool': tool_call['tool'],
-                            'tool_result': result_str
-                        })
-                        
-                        return result
+            batch = [i]
+            while batch[-1] + 1 < len(calls):
+                nxt = calls[batch[-1] + 1]
+                nxt_spec = REGISTRY.get(nxt.get("tool"))
+                if nxt_spec is None or not nxt_spec.is_read_only(nxt.get("arguments", {})):
+                    break
+                batch.append(batch[-1] + 1)
+            
+            if len(batch) == 1:
+                results[i] = self._run_in_foreground(calls[i])
+            else:
+                # Output of concurrent commands is printed afterwards, not interleaved
+                with ThreadPoolExecutor(max_workers=min(len(batch), MAX_PARALLEL_TOOLS)) as pool:
+                    # Each worker runs in a copy of this thread's context, so output
+                    # routed per request (agent_daemon) reaches the same client
+                    futures = {j: pool.submit(contextvars.copy_context().run, self._execute_tool, calls[j])
+                               for j in batch}
+                    for j, future in futures.items():
+                        try:
+                            results[j] = (future.result(), False)
+                        except Exception as e:
+                            results[j] = ({"error": str(e)}, False)
+            i = batch[-1] + 1
+        return results
+    
+    def _run_in_foreground(self, call: dict) -> Tuple[Dict[str, Any], bool]:
+        """Run one call with live output; returns (result, output_streamed)"""
+        self._output_streamed = False
+        try:
+            result = self._execute_tool(call, stream_output=True)
+        except Exception as e:
+            result = {"error": str(e)}
+        streamed, self._output_streamed = self._output_streamed, False
+        return result, streamed
+    
+    def _print_result(self, result, output_streamed: bool = False, logs: bool = False) -> Tuple[str, str]:
+        """Print a tool result; returns its full text for history and a compacted digest for the prompt.
+        
+        logs marks the result as log output, which the digest dedupes.
+        """
+        result_str = ""
+        digest = ""
+        if isinstance(result, dict):
+            for key, value in result.items():
+                if value:
+                    if output_streamed and key in ("stdout", "stderr"):
+                        # Already printed live while the command ran
+                        pass
                     else:
-                        print(f"{RED}✗ Action cancelled{RESET}")
-                        return None
-        except json.JSONDecodeError:
-            pass
-        
-        # Not a tool call, just print response
-        print(f"\n{BLUE}💬 Response:{RESET}")
-        print(response)
+                        print(f"\n{BOLD}{key}:{RESET}")
+                        if isinstance(value, (dict, list)):
+                            # Structured data: readable on screen, compact in history
+                            print(json.dumps(value, indent=2))
+                        else:
+                            print(value)
+                    if isinstance(value, (dict, list)):
+                        value = json.dumps(value, separators=(",", ":"))
+                    result_str += f"{key}: {value}\n"
+                    digest += f"{key}: {compact(value, logs)}\n"
+        else:
+            print(result)
+            result_str = str(result)
+            digest = compact(result_str, logs)
+        return result_str, digest
+    
+    def process_request(self, user_input: str):
+        """Process user request, recording where the time goes"""
+        self.trace = Trace(user_input, self.model)
+        # System context is loaded once per agent; count it towards its first request
+        self.trace.phases.extend(self._startup)
+        self._startup = []
+        try:
+            return self._process_request(user_input)
+        finally:
+            self.last_trace = self.trace.finish()
+            self.trace = None
+            if self.profile:
+                print(f"\n{BLUE}{self.last_trace.summary()}{RESET}")
+                self.trace_log.write(self.last_trace.to_dict())
+    
+    def _process_request(self, user_input: str):
+        """Process user request.
+        
+        Plan/act loop: the LLM answers with one tool call, a list of tool
+        calls or plain text. A single call is executed and its result shown,
+        as before. When several calls are planned, their results are fed back
+        so the LLM can plan more calls or write the final answer, for at most
+        max_steps rounds.
+        """
+        self._response_streamed = False
+        self._output_streamed = False
+        
+        self.active_model = self.model
+        self._fresh_request = bool(FRESH_WORDS.search(user_input))
+        route_reason = None
+        phase = None
+        
+        # Repeated requests reuse the tool call the LLM picked last time
+        with self._phase("cache_lookup"):
+            cached_call = self.response_cache.lookup(user_input) if self.response_cache else None
+        if cached_call:
+            print(f"\n{GREEN}⚡ Using cached tool call{RESET}")
+            response = json.dumps(cached_call)
+        else:
+            if self.router:
+                with self._phase("route"):
+                    self.active_model, route_reason = self.router.route(user_input)
+                print(f"\n{BLUE}→ {self.active_model} ({route_reason}){RESET}")
+            if self.prefetcher:
+                self._prefetch(user_input)
+            print(f"\n{GREEN}🤔 Thinking...{RESET}")
+            # Ask LLM
+            phase = "select"
+            response = self._ask_llm(user_input)
+        
+        messages = None
+        tools_used = []
+        tool_results = []
+        digests = []
+        result = None
+        planned = False
+        for step in range(1, self.max_steps + 1):
+            # First tool call JSON anywhere in the reply, repaired and checked against the schemas
+            with self._phase("parse"):
+                tool_calls, errors = extract_tool_calls(response)
+            if self.router and phase:
+                self.router.record(user_input, self.active_model, route_reason, phase, self._turn_seconds,
+                                   ok=tool_calls is not None or not errors)
+            if errors:
+                print(f"{YELLOW}⚠ Invalid tool call: {'; '.join(errors)}{RESET}")
+            if tool_calls is None:
+                if not errors or step == self.max_steps:
+                    break
+                phase = "retry"
+                larger = self.router.escalate(self.active_model) if self.router else None
+                if larger:
+                    # The model got it wrong once; a larger one is more likely to get it right
+                    self.active_model, phase = larger, "escalated"
+                    print(f"{BLUE}→ escalating to {larger}{RESET}")
+                # Ask for a corrected call instead of making the user retry
+                messages = (messages or self._build_messages(user_input)) + [
+                    {"role": "assistant", "content": response},
+                    {"role": "user", "content": f"That tool call is invalid: {'; '.join(errors)}. Respond with a corrected JSON tool call."},
+                ]
+                print(f"\n{GREEN}🤔 Thinking...{RESET}")
+                response = self._complete(messages, select_tool=True)
+                continue
+            
+            # Confirm with user
+            with self._phase("confirm"):
+                approved = [call for call in tool_calls if self._confirm_action(call)]
+            if not approved:
+                print(f"{RED}✗ Action cancelled{RESET}")
+                return None
+            
+            print(f"\n{GREEN}✓ Executing...{RESET}")
+            outcomes = self._run_calls(approved)
+            if self.response_cache and not cached_call and not tools_used:
+                # Only calls the user approved and that worked are worth replaying
+                succeeded = [call for call, (call_result, _) in zip(approved, outcomes)
+                             if "error" not in call_result and call_result.get("returncode", 0) == 0]
+                if succeeded:
+                    self.response_cache.store(user_input, succeeded[0] if len(succeeded) == 1 else succeeded)
+            
+            feedback = []
+            with self._phase("output"):
+                for call, (call_result, streamed) in zip(approved, outcomes):
+                    label = "" if len(approved) == 1 else f" ({call['tool']})"
+                    print(f"\n{GREEN}✓ Result{label}:{RESET}")
+                    result_str, digest = self._print_result(
+                        call_result, streamed, is_log_call(call['tool'], call.get('arguments', {})))
+                    tools_used.append(call['tool'])
+                    tool_results.append(result_str)
+                    digests.append(digest)
+                    feedback.append(f"{call['tool']} {json.dumps(call.get('arguments', {}))}:\n{digest[:FEEDBACK_CHARS]}")
+            result = outcomes[0][0] if len(outcomes) == 1 else [r for r, _ in outcomes]
+            
+            # A single call answers the request directly; plans get a follow-up turn
+            planned = planned or len(approved) > 1
+            if not planned or step == self.max_steps:
+                with self._phase("memory"):
+                    self.memory.add(user_input, tool=", ".join(tools_used), tool_result="\n".join(tool_results),
+                                    digest="\n".join(digests))
+                return result
+            
+            messages = (messages or self._build_messages(user_input)) + [
+                {"role": "assistant", "content": response},
+                {"role": "user", "content": "Tool results:\n\n" + "\n\n".join(feedback) + """
+
+Answer the original request using these results, or respond with more JSON tool calls if you need more information."""},
+            ]
+            if self.router:
+                # Writing the final answer is analysis; never leave it to the fast model
+                self.active_model = self.router.at_least_default(self.active_model)
+            phase = "answer"
+            print(f"\n{GREEN}🤔 Thinking...{RESET}")
+            response = self._complete(messages)
+        
+        # Constrained turns wrap plain answers as {"answer": "..."}
+        answer = self._unwrap_answer(response)
+        if answer is not None:
+            response = answer
+            self._response_streamed = False
+        
+        # Not a tool call, just print response (already on screen if streamed)
+        if not self._response_streamed:
+            print(f"\n{BLUE}💬 Response:{RESET}")
+            print(response)
         
         # Store text response in history
-        self.conversation_history.append({
-            'user': user_input,
-            'response': response
-        })
+        with self._phase("memory"):
+            self.memory.add(user_input, tool=", ".join(tools_used) or None, response=response)
         
         return response
 
-def main():
+def build_parser():
+    """Command line parser, shared with the agent daemon"""
     import argparse
     
     parser = argparse.ArgumentParser(description="LLM Agent with MCP")
@@ -613,10 +750,66 @@ def main():
     parser.add_argument("-m", "--model", default="qwen2.5-coder:3b", help="Ollama model to use")
     parser.add_argument("-y", "--yes", action="store_true", help="Auto-approve all actions (dangerous!)")
     parser.add_argument("-i", "--interactive", action="store_true", help="Interactive mode")
-    
+    parser.add_argument("--no-stream", action="store_true", help="Wait for the full LLM response instead of streaming tokens")
+    parser.add_argument("--refresh-context", action="store_true", help="Re-probe the cached system context before starting")
+    parser.add_argument("--kube-cache", action="store_true",
+                        help="Keep a watched in-memory copy of Kubernetes state (best with -i)")
+    parser.add_argument("--no-cache", action="store_true", help="Always ask the LLM, even for repeated requests")
+    parser.add_argument("--fuzzy-cache", action="store_true", help="Also reuse tool calls of near-identical requests")
+    parser.add_argument("--max-steps", type=int, default=MAX_STEPS,
+                        help="Maximum plan/act rounds per request when the LLM plans several tool calls")
+    parser.add_argument("--history-tokens", type=int, default=HISTORY_TOKENS,
+                        help="Token budget for conversation history in each prompt")
+    parser.add_argument("--no-format", action="store_true",
+                        help="Don't constrain tool selection to a JSON schema (for Ollama < 0.5)")
+    parser.add_argument("--route", action="store_true",
+                        help="Pick the model per request (fast for lookups, larger for analysis) instead of -m")
+    parser.add_argument("--route-models", default=",".join(ROUTE_MODELS),
+                        help="Comma-separated fast,default,strong models for --route")
+    parser.add_argument("--route-score", action="store_true",
+                        help="Let the fast model score requests the keyword rules can't classify")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Always re-run read-only tools instead of reusing recent results")
+    parser.add_argument("--no-prefetch", action="store_true",
+                        help="Don't start likely read-only tool calls while the LLM is thinking")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print where each request's time went and append a JSONL trace")
+    parser.add_argument("-k", "--keep-alive", default=DEFAULT_KEEP_ALIVE,
+                        help="How long Ollama keeps the model loaded between requests (e.g. 30m, -1 for forever)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Run a JSONL file of requests concurrently ('-' for stdin); results are printed as JSONL")
+    parser.add_argument("--llm-workers", type=int, default=2,
+                        help="Concurrent LLM turns in --batch mode (match OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--tool-workers", type=int, default=4,
+                        help="Concurrent tool executions in --batch mode")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Run as a long-lived daemon serving one-shot ./agent calls over a Unix socket")
+    return parser
+
+def agent_options(args) -> Dict[str, Any]:
+    """MCPAgent keyword arguments for parsed command line options"""
+    return dict(model=args.model, auto_approve=args.yes, keep_alive=args.keep_alive,
+                stream=not args.no_stream, refresh_context=args.refresh_context,
+                kube_cache=args.kube_cache, response_cache=not args.no_cache,
+                fuzzy_cache=args.fuzzy_cache, max_steps=args.max_steps,
+                history_tokens=args.history_tokens, constrained=not args.no_format,
+                route=args.route, route_models=args.route_models.split(","), route_score=args.route_score,
+                fresh=args.fresh, prefetch=not args.no_prefetch, profile=args.profile)
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
     
-    agent = MCPAgent(model=args.model, auto_approve=args.yes)
+    if args.daemon:
+        from agent_daemon import serve
+        serve()
+        return
+    
+    if args.batch:
+        from batch_runner import run_batch
+        sys.exit(run_batch(args))
+    
+    agent = MCPAgent(**agent_options(args))
     
     if args.interactive:
         print(f"{BOLD}{GREEN}🤖 LLM Agent with MCP{RESET}")
@@ -635,6 +828,8 @@ def main():
                 break
             except Exception as e:
                 print(f"{RED}Error: {e}{RESET}")
+        if agent.prefetcher:
+            print(f"{BLUE}{agent.prefetcher.summary()}{RESET}")
     else:
         if not args.request:
             parser.print_help()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Agent Thin Client
+Forwards a one-shot `./agent "..."` call to a running agent daemon. Exits with
+FALLBACK_CODE (without doing anything) when the daemon is unavailable, runs
+with another environment, or the call needs the in-process agent, so the
+wrapper script can run agent.py.
+Deliberately imports only cheap stdlib modules.
+"""
+
+import json
+import os
+import socket
+import sys
+import threading
+
+SOCKET_PATH = os.environ.get(
+    "OLLAMA_MCP_AGENT_SOCKET",
+    os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), f"ollama-mcp-agent-{os.getuid()}.sock")
+)
+EXIT_MARKER = b"\0EXIT "
+READY_MARKER = b"\0READY\n"
+FALLBACK_CODE = 75
+# Environment the daemon must share for commands to behave as they would here
+FORWARDED_ENV = ("PATH", "HOME", "USER", "SHELL", "LANG", "LC_ALL", "KUBECONFIG", "KUBECTL",
+                 "DOCKER_HOST", "OLLAMA_HOST")
+# Modes that must run in-process
+IN_PROCESS_FLAGS = {"-i", "--interactive", "--daemon", "--batch", "-h", "--help"}
+
+
+def forward_stdin(sock):
+    # Raw reads: a thread blocked inside sys.stdin's buffered reader would
+    # abort the interpreter at shutdown
+    try:
+        while True:
+            data = os.read(0, 4096)
+            if not data:
+                break
+            sock.sendall(data)
+    except OSError:
+        pass
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    if IN_PROCESS_FLAGS.intersection(arg.split("=", 1)[0] for arg in argv):
+        return FALLBACK_CODE
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        return FALLBACK_CODE
+
+    env = {name: os.environ.get(name) for name in FORWARDED_ENV}
+    sock.sendall(json.dumps({"argv": argv, "cwd": os.getcwd(), "env": env}).encode() + b"\n")
+
+    pending = b""
+    # stdin is only forwarded once the daemon has accepted the request, so a
+    # fallback to the in-process agent still finds it unread
+    while len(pending) < len(READY_MARKER) and READY_MARKER.startswith(pending):
+        data = sock.recv(65536)
+        if not data:
+            return FALLBACK_CODE
+        pending += data
+    if pending.startswith(READY_MARKER):
+        pending = pending[len(READY_MARKER):]
+        threading.Thread(target=forward_stdin, args=(sock,), daemon=True).start()
+
+    out = sys.stdout.buffer
+    while True:
+        marker = pending.find(EXIT_MARKER)
+        if marker != -1:
+            out.write(pending[:marker])
+            out.flush()
+            pending = pending[marker:]
+            if b"\n" in pending:
+                return int(pending[len(EXIT_MARKER):].split(b"\n", 1)[0] or 0)
+        else:
+            # Hold back a possible partial marker, print the rest immediately
+            keep = len(EXIT_MARKER) - 1
+            out.write(pending[:-keep])
+            out.flush()
+            pending = pending[-keep:]
+        data = sock.recv(65536)
+        if not data:
+            out.flush()
+            return 1
+        pending += data
+
+
+if __name__ == "__main__":
+    sys.exit(main())
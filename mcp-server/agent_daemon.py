@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Agent Daemon
+Keeps MCPAgent instances, caches and the Ollama connection pool warm behind a
+Unix socket so one-shot `./agent "..."` calls skip Python startup, argument
+parsing, agent construction and a cold LLM connection.
+
+Protocol (one connection per request): the client sends a JSON header line
+{"argv": [...], "cwd": "...", "env": {...}}. The daemon answers READY_MARKER,
+after which the client forwards its stdin, streams the agent's terminal output
+back and ends with EXIT_MARKER + exit code. A request whose environment differs
+from the daemon's ends straight away with FALLBACK_CODE instead, and the
+client runs it in-process.
+"""
+
+import contextvars
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+SOCKET_PATH = os.environ.get(
+    "OLLAMA_MCP_AGENT_SOCKET",
+    os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), f"ollama-mcp-agent-{os.getuid()}.sock")
+)
+EXIT_MARKER = "\0EXIT "
+READY_MARKER = "\0READY\n"
+FALLBACK_CODE = 75
+# Warm agents kept per daemon; the least recently used one is dropped beyond this
+MAX_AGENTS = 8
+# MCPAgent options applied per request by run_request instead of per warm agent
+PER_REQUEST_OPTIONS = ("auto_approve", "refresh_context", "fresh")
+
+
+class ThreadRouter(io.TextIOBase):
+    """sys.stdout/stderr/stdin replacement that routes each request to its own client.
+
+    The binding is a context variable: every connection's handler thread
+    starts with its own, and the agent runs its worker and prefetch threads
+    in a copy of the request's context, so their output follows it.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.stream = contextvars.ContextVar(f"stream-{id(self)}", default=None)
+
+    def _target(self):
+        return self.stream.get() or self.default
+
+    def bind(self, stream):
+        self.stream.set(stream)
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def readline(self, size=-1):
+        return self._target().readline(size)
+
+    def isatty(self):
+        return False
+
+
+class AgentHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        out = io.TextIOWrapper(self.wfile, encoding="utf-8", errors="replace", write_through=True)
+        inp = io.TextIOWrapper(self.rfile, encoding="utf-8", errors="replace")
+        header = json.loads(inp.readline() or "{}")
+        if self.server.env_differs(header.get("env") or {}):
+            # Commands would see another PATH, kubeconfig, user...: let the client run it
+            out.write(f"{EXIT_MARKER}{FALLBACK_CODE}\n")
+            return
+        out.write(READY_MARKER)
+        sys.stdout.bind(out)
+        sys.stderr.bind(out)
+        sys.stdin.bind(inp)
+        code = 0
+        try:
+            code = self.server.run_request(header.get("argv", []), header.get("cwd"))
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"Error: {e}")
+            code = 1
+        finally:
+            try:
+                out.write(f"{EXIT_MARKER}{code}\n")
+            except OSError:
+                pass
+            sys.stdout.bind(None)
+            sys.stderr.bind(None)
+            sys.stdin.bind(None)
+
+
+class AgentDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str = SOCKET_PATH):
+        from agent import MCPAgent, build_parser
+
+        self.agent_class = MCPAgent
+        self.parser = build_parser()
+        self.clients: Dict[str, object] = {}
+        # Insertion order is the LRU order
+        self.agents: Dict[Tuple, Tuple[object, threading.Lock]] = {}
+        self.kube_cache: Optional[object] = None
+        self.max_agents = MAX_AGENTS
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        # Create the socket owner-only; a chmod after bind leaves a window
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, AgentHandler)
+        finally:
+            os.umask(umask)
+
+    @staticmethod
+    def env_differs(env: Dict[str, Optional[str]]) -> bool:
+        """Whether any variable the client forwarded has another value in the daemon"""
+        return any(os.environ.get(name) != value for name, value in env.items())
+
+    def _agent_for(self, args, cwd: str):
+        """One warm agent per (model, options, working directory); LLM pools are per keep-alive"""
+        from agent import agent_options
+
+        options = {name: value for name, value in agent_options(args).items() if name not in PER_REQUEST_OPTIONS}
+        key = (json.dumps(options, sort_keys=True), cwd)
+        with self._lock:
+            if key in self.agents:
+                self.agents[key] = self.agents.pop(key)
+                return self.agents[key]
+            if args.keep_alive not in self.clients:
+                from ollama_client import OllamaClient
+                self.clients[args.keep_alive] = OllamaClient(keep_alive=args.keep_alive)
+            # All agents share one set of Kubernetes watches
+            if options.get("kube_cache") and self.kube_cache is None:
+                from kube_cache import KubeCache
+                self.kube_cache = KubeCache().start()
+            # The system context describes the client's working directory, not the daemon's
+            agent = self.agent_class(**dict(options, kube_cache=False), llm=self.clients[args.keep_alive], cwd=cwd)
+            if options.get("kube_cache"):
+                agent.kube_cache = self.kube_cache
+            self.agents[key] = agent, threading.Lock()
+            while len(self.agents) > self.max_agents:
+                # A request still running on the evicted agent keeps its own reference
+                del self.agents[next(iter(self.agents))]
+            return self.agents[key]
+
+    def run_request(self, argv, cwd) -> int:
+        args = self.parser.parse_args(argv)
+        if not args.request:
+            self.parser.print_help()
+            return 1
+        cwd = cwd or os.getcwd()
+        agent, lock = self._agent_for(args, cwd)
+        with lock:
+            if args.refresh_context:
+                agent.system_context = agent._get_system_context(force_refresh=True)
+                agent.system_prompt = agent._build_system_prompt()
+            # Each call is independent, exactly like a fresh `./agent "..."` process
+            agent.memory.clear()
+            agent.auto_approve = args.yes
+            agent.fresh = args.fresh
+            agent.process_request(" ".join(args.request))
+        return 0
+
+
+def serve(path: str = SOCKET_PATH):
+    """Run the daemon in the foreground until interrupted"""
+    sys.stdout = ThreadRouter(sys.stdout)
+    sys.stderr = ThreadRouter(sys.stderr)
+    sys.stdin = ThreadRouter(sys.stdin)
+    server = AgentDaemon(path)
+    print(f"Agent daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Batch Runner
+Runs a JSONL file of agent requests concurrently, for scripted sweeps such
+as nightly health checks. Every worker thread has its own MCPAgent (memory,
+trace, model choice); LLM turns and tool executions (speculative prefetches
+included) are bounded separately by --llm-workers and --tool-workers, so
+requests waiting on the model overlap with requests running tools. Results
+are written to stdout as JSONL in completion order; aggregate throughput and
+latency go to stderr.
+
+Input lines are {"id": ..., "request": "..."} objects ("prompt", or "title"
+and "body", also work), bare JSON strings, or plain text; blank lines and
+lines starting with # are skipped.
+
+Usage: ./agent --batch sweep.jsonl [-y] [--llm-workers 2] [--tool-workers 4] > results.jsonl
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Tuple
+
+from ollama_client import OllamaClient
+
+
+def load_requests(lines) -> List[Tuple[Any, str]]:
+    """(id, request text) for every request line"""
+    requests = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            entry = line
+        if isinstance(entry, dict):
+            text = entry.get("request") or entry.get("prompt") or "\n\n".join(
+                part for part in (entry.get("title"), entry.get("body")) if part)
+            request_id = entry.get("id", entry.get("request_id", number))
+        else:
+            text, request_id = str(entry), number
+        if text:
+            requests.append((request_id, text))
+    return requests
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+class BatchRunner:
+    def __init__(self, args, workers: int):
+        from agent import MCPAgent, agent_options
+
+        options = agent_options(args)
+        options["llm"] = OllamaClient(keep_alive=args.keep_alive, pool_size=workers)
+        self.llm_slots = threading.BoundedSemaphore(max(1, args.llm_workers))
+        self.tool_slots = threading.BoundedSemaphore(max(1, args.tool_workers))
+        self.agents: "queue.Queue" = queue.Queue()
+        first = None
+        for _ in range(workers):
+            agent = MCPAgent(**options)
+            if first is None:
+                # Later agents share the first one's caches, router and Kubernetes watches
+                first = agent
+                options.update(refresh_context=False, kube_cache=False, response_cache=False, route=False)
+            else:
+                agent.tool_cache = first.tool_cache
+                agent.response_cache = first.response_cache
+                agent.router = first.router
+                agent.kube_cache = first.kube_cache
+            agent.can_prompt = False
+            agent.llm_slots = self.llm_slots
+            agent.tool_slots = self.tool_slots
+            self.agents.put(agent)
+
+    def run_one(self, request_id, text: str) -> Dict[str, Any]:
+        agent = self.agents.get()
+        try:
+            agent.memory.clear()
+            started = time.monotonic()
+            error = None
+            try:
+                result = agent.process_request(text)
+            except Exception as e:
+                result, error = None, str(e)
+            seconds = time.monotonic() - started
+            if error is None and result is None:
+                error = "cancelled: an action needed confirmation (use -y to allow)"
+            elif isinstance(result, str) and result.startswith("Error talking to Ollama"):
+                error = result
+            record = {"id": request_id, "request": text, "ok": error is None, "seconds": round(seconds, 3),
+                      "model": agent.active_model, "result": result}
+            if error:
+                record["error"] = error
+            if agent.last_trace:
+                phases = agent.last_trace.phases
+                record["llm_seconds"] = round(sum(p["seconds"] for p in phases if p["phase"] == "llm"), 3)
+                record["tool_seconds"] = round(sum(p["seconds"] for p in phases if p["phase"] == "tool"), 3)
+                record["tools"] = [p["tool"] for p in phases if p["phase"] == "tool"]
+                record["prefetch_started"], record["prefetch_hits"] = agent.last_trace.prefetch_counts()
+            return record
+        finally:
+            self.agents.put(agent)
+
+
+def run_batch(args) -> int:
+    """Run args.batch; exit status 0 when every request succeeded"""
+    if args.batch == "-":
+        requests = load_requests(sys.stdin)
+    else:
+        try:
+            with open(args.batch) as f:
+                requests = load_requests(f)
+        except OSError as e:
+            print(f"Cannot read {args.batch}: {e}", file=sys.stderr)
+            return 1
+    if not requests:
+        print(f"No requests in {args.batch}", file=sys.stderr)
+        return 1
+
+    workers = min(len(requests), max(1, args.llm_workers) + max(1, args.tool_workers))
+    out = sys.stdout
+    # Agents print progress from every worker thread; only the JSONL results go to stdout
+    sys.stdout = open(os.devnull, "w")
+    started = time.monotonic()
+    records = []
+    pool = None
+    try:
+        runner = BatchRunner(args, workers)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+        futures = [pool.submit(runner.run_one, request_id, text) for request_id, text in requests]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+    except KeyboardInterrupt:
+        print(f"Interrupted after {len(records)} of {len(requests)} requests", file=sys.stderr)
+        return 130
+    finally:
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+        sys.stdout.close()
+        sys.stdout = out
+    wall = time.monotonic() - started
+
+    latencies = [r["seconds"] for r in records]
+    failed = sum(1 for r in records if not r["ok"])
+    llm = sum(r.get("llm_seconds", 0) for r in records)
+    tools = sum(r.get("tool_seconds", 0) for r in records)
+    prefetched = sum(r.get("prefetch_started", 0) for r in records)
+    prefetch_hits = sum(r.get("prefetch_hits", 0) for r in records)
+    print(f"{len(records)} requests in {wall:.1f}s ({len(records) / wall:.2f} req/s), {failed} failed; "
+          f"latency p50 {_percentile(latencies, 0.5):.2f}s p95 {_percentile(latencies, 0.95):.2f}s "
+          f"max {max(latencies):.2f}s; LLM {llm:.1f}s + tools {tools:.1f}s of work "
+          f"({(llm + tools) / wall:.1f}x overlap, {args.llm_workers} LLM / {args.tool_workers} tool workers); "
+          f"prefetch {prefetch_hits} of {prefetched} used",
+          file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Agent Benchmark Suite
+Runs scripted requests through MCPAgent (and the MCP server's call_tool)
+fully offline: the LLM is the mock Ollama server and kubectl, systemctl,
+journalctl, docker and nmcli are the fixtures from fake_system.py, so a
+10k-pod cluster is one flag away. Reports latency percentiles, throughput
+and peak memory per scenario; --save and --compare turn two runs into a
+regression check.
+
+Usage: python3 benchmarks/bench_agent.py [-n RUNS] [--pods 10000] [--latency 0.2]
+                                         [--scenario NAME] [--phases] [--server]
+                                         [--save FILE] [--compare FILE]
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from mock_ollama import MockOllama
+import fake_system
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, request, scripted LLM replies for that request)
+SCENARIOS = [
+    ("pods-all", "show pods in all namespaces",
+     ['{"tool": "kubernetes", "arguments": {"action": "pods", "namespace": "all"}}']),
+    ("cluster-health", "are there any problems in the cluster?",
+     ['{"tool": "kubernetes", "arguments": {"action": "check-health"}}']),
+    ("deployments", "list deployments in grafana",
+     ['{"tool": "kubernetes", "arguments": {"action": "deployments", "namespace": "grafana"}}']),
+    ("services", "list all services",
+     ['{"tool": "systemd", "arguments": {"action": "list"}}']),
+    ("service-logs", "show the last 1000 sshd log lines",
+     ['{"tool": "systemd", "arguments": {"action": "logs", "service": "sshd", "lines": "1000"}}']),
+    ("containers", "show all docker containers",
+     ['{"tool": "execute_command", "arguments": {"command": "docker ps -a"}}']),
+    ("wifi", "list wifi networks",
+     ['{"tool": "network", "arguments": {"action": "wifi-list"}}']),
+    ("plan", "compare disk, memory and failing pods",
+     ['[{"tool": "system_status", "arguments": {"component": "disk"}}, '
+      '{"tool": "system_status", "arguments": {"component": "memory"}}, '
+      '{"tool": "kubernetes", "arguments": {"action": "check-health"}}]',
+      '{"answer": "Disk and memory are fine; a few pods are crash looping."}']),
+    ("answer", "what does CrashLoopBackOff mean?",
+     # Streamed answers are cancelled after {"answer": and re-asked as plain text
+     ['{"answer": "The container keeps exiting and Kubernetes backs off before restarting it."}',
+      "The container keeps exiting and Kubernetes backs off before restarting it."]),
+]
+
+# Tool calls replayed against server.py's call_tool
+SERVER_CALLS = [
+    ("kubernetes", {"action": "pods", "namespace": "all"}),
+    ("kubernetes", {"action": "check-health"}),
+    ("systemd", {"action": "list"}),
+    ("execute_command", {"command": "docker ps -a"}),
+    ("system_status", {"component": "all"}),
+    ("network_info", {}),
+]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def stats(name, samples, wall, peak_bytes):
+    return {"scenario": name, "runs": len(samples), "p50": percentile(samples, 0.5),
+            "p95": percentile(samples, 0.95), "p99": percentile(samples, 0.99), "max": max(samples),
+            "throughput": len(samples) / wall if wall else 0.0, "peak_mb": peak_bytes / 1e6}
+
+
+def run_agent(agent, mock, request, replies):
+    """One request through the agent with its scripted replies; returns seconds"""
+    mock.responses = replies
+    mock.requests = 0
+    agent.memory.clear()
+    start = time.perf_counter()
+    agent.process_request(request)
+    return time.perf_counter() - start
+
+
+def bench_agent(args, mock, scenarios):
+    from ollama_client import OllamaClient
+    from agent import MCPAgent
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        agent = MCPAgent(llm=OllamaClient(host=mock.host), auto_approve=True, response_cache=False,
+                         stream=not args.no_stream, fresh=not args.warm, prefetch=args.prefetch)
+    results, traces = [], []
+    for name, request, replies in scenarios:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            run_agent(agent, mock, request, replies)  # warm-up
+            samples = []
+            started = time.perf_counter()
+            for _ in range(args.runs):
+                samples.append(run_agent(agent, mock, request, replies))
+                traces.append(agent.last_trace.to_dict())
+            wall = time.perf_counter() - started
+            # Python-side peak allocation of one more run (tracemalloc slows it, so it is not timed)
+            tracemalloc.start()
+            run_agent(agent, mock, request, replies)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append(stats(name, samples, wall, peak))
+    return results, traces
+
+
+def bench_server(args):
+    """call_tool latency with all calls in flight at once, as a busy MCP client would do"""
+    try:
+        import server
+    except ImportError as e:
+        print(f"\nserver.py: skipped ({e})")
+        return []
+
+    async def timed(name, arguments):
+        start = time.perf_counter()
+        await server.call_tool(name, arguments)
+        return name, time.perf_counter() - start
+
+    async def run_all():
+        samples = {}
+        started = time.perf_counter()
+        for _ in range(args.runs):
+            for name, seconds in await asyncio.gather(*(timed(n, a) for n, a in SERVER_CALLS)):
+                samples.setdefault(name, []).append(seconds)
+        return samples, time.perf_counter() - started
+
+    samples, wall = asyncio.run(run_all())
+    results = [stats(f"server {name}", values, wall, 0) for name, values in samples.items()]
+    return results + [stats("server (all calls)", [v for values in samples.values() for v in values], wall, 0)]
+
+
+def print_results(results, baseline=None, threshold=10.0):
+    print(f"{'scenario':<28} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'peak MB':>8}")
+    previous = {r["scenario"]: r for r in baseline or []}
+    for r in results:
+        line = (f"{r['scenario']:<28} {r['runs']:>5} {r['p50'] * 1000:>9.1f} {r['p95'] * 1000:>9.1f} "
+                f"{r['p99'] * 1000:>9.1f} {r['throughput']:>8.1f} {r['peak_mb']:>8.1f}")
+        old = previous.get(r["scenario"])
+        if old and old["p50"]:
+            change = 100 * (r["p50"] - old["p50"]) / old["p50"]
+            line += f"   p50 {change:+.0f}%" + ("  <-- slower" if change > threshold else "")
+        print(line)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline agent benchmarks against a mock LLM and fake system tools")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="Timed requests per scenario")
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable)")
+    parser.add_argument("--pods", type=int, default=1000, help="Pods in the fake cluster")
+    parser.add_argument("--namespaces", type=int, default=20, help="Namespaces in the fake cluster")
+    parser.add_argument("--units", type=int, default=300, help="Systemd units")
+    parser.add_argument("--containers", type=int, default=50, help="Docker containers")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock LLM time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Mock LLM seconds per streamed token")
+    parser.add_argument("--no-stream", action="store_true", help="Use non-streaming LLM calls")
+    parser.add_argument("--warm", action="store_true", help="Let repeated requests reuse cached tool results")
+    parser.add_argument("--prefetch", action="store_true", help="Enable speculative prefetch")
+    parser.add_argument("--server", action="store_true", help="Also benchmark server.py's call_tool (needs mcp)")
+    parser.add_argument("--phases", action="store_true", help="Print per-phase p50/p95 from the agent traces")
+    parser.add_argument("--save", help="Write results as JSON")
+    parser.add_argument("--compare", help="Show p50 change against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Flag p50 regressions above this percent")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s[0] in args.scenario]
+    if not scenarios:
+        sys.exit(f"No such scenario; choose from: {', '.join(s[0] for s in SCENARIOS)}")
+
+    workdir = tempfile.mkdtemp(prefix="agent-bench-")
+    os.environ.update({
+        "PATH": fake_system.install(os.path.join(workdir, "bin")) + os.pathsep + os.environ["PATH"],
+        "OLLAMA_MCP_CACHE_DIR": os.path.join(workdir, "cache"),
+        "FAKE_PODS": str(args.pods), "FAKE_NAMESPACES": str(args.namespaces),
+        "FAKE_UNITS": str(args.units), "FAKE_CONTAINERS": str(args.containers),
+    })
+    sys.path.insert(0, SERVER_DIR)
+
+    mock = MockOllama(latency=args.latency, token_delay=args.token_delay).start()
+    try:
+        results, traces = bench_agent(args, mock, scenarios)
+    finally:
+        mock.stop()
+    if args.server:
+        results += bench_server(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print(f"{args.runs} runs per scenario, {args.pods} pods, mock LLM latency {args.latency}s"
+          f" + {args.token_delay}s/token\n")
+    print_results(results, baseline, args.threshold)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in kilobytes on Linux
+    print(f"\nPeak RSS: agent process {usage.ru_maxrss / 1024:.0f} MB, "
+          f"largest tool subprocess {children.ru_maxrss / 1024:.0f} MB")
+
+    if args.phases:
+        from tracing import summarize
+        print()
+        print(summarize(traces))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
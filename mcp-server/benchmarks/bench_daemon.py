@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Daemon Benchmark
+End-to-end latency of one-shot `./agent -y "..."` calls run in-process
+(cold) versus handed to a running agent daemon, against the mock Ollama.
+
+Usage: python3 benchmarks/bench_daemon.py [-n RUNS] [--latency SECONDS]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_ollama import MockOllama
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT = os.path.join(SERVER_DIR, "..", "agent")
+
+
+def time_request(env) -> float:
+    start = time.perf_counter()
+    result = subprocess.run([AGENT, "-y", "check something"], env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - start
+    if b"ok" not in result.stdout:
+        sys.exit(f"Unexpected agent output:\n{result.stdout.decode(errors='replace')}")
+    return elapsed
+
+
+def report(label, samples):
+    print(f"{label:<22} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark cold vs daemon-backed one-shot requests")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="Requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock LLM time to first token")
+    args = parser.parse_args()
+
+    mock = MockOllama(latency=args.latency).start()
+    workdir = tempfile.mkdtemp(prefix="agent-daemon-bench-")
+    socket_path = os.path.join(workdir, "agent.sock")
+    env = dict(os.environ, OLLAMA_HOST=mock.host, OLLAMA_MCP_AGENT_SOCKET=socket_path,
+               OLLAMA_MCP_CACHE_DIR=os.path.join(workdir, "cache"))
+
+    time_request(env)  # warm the system context cache so only process startup differs
+    cold = [time_request(env) for _ in range(args.runs)]
+
+    daemon = subprocess.Popen([sys.executable, os.path.join(SERVER_DIR, "agent.py"), "--daemon"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 10
+        while not os.path.exists(socket_path):
+            if time.time() > deadline or daemon.poll() is not None:
+                sys.exit("Agent daemon did not start")
+            time.sleep(0.05)
+        time_request(env)  # first request builds the warm agent
+        warm = [time_request(env) for _ in range(args.runs)]
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        mock.stop()
+
+    print(f"One-shot request latency ({args.runs} runs each, mock LLM latency {args.latency}s)\n")
+    report("in-process (cold)", cold)
+    report("daemon-backed", warm)
+    print(f"\nSpeedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
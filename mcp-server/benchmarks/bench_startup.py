@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Compares agent startup with the old get-system-context.sh path against the
+on-disk context cache (cold = empty cache, cached = warm cache).
+
+Usage: python3 benchmarks/bench_startup.py [-n RUNS]
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTEXT_SCRIPT = os.path.join(SERVER_DIR, "..", "get-system-context.sh")
+
+# Construct the agent exactly as a one-shot `./agent "..."` call would
+STARTUP_SNIPPET = f"""
+import sys
+sys.path.insert(0, {SERVER_DIR!r})
+from agent import MCPAgent
+MCPAgent()
+"""
+
+
+def time_run(cmd, env=None) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def report(label, samples):
+    print(f"{label:<28} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark agent startup")
+    parser.add_argument("-n", "--runs", type=int, default=10, help="Runs per scenario")
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="agent-ctx-bench-")
+    env = dict(os.environ, OLLAMA_MCP_CACHE_DIR=cache_dir)
+    startup = [sys.executable, "-c", STARTUP_SNIPPET]
+
+    try:
+        script = [time_run(["bash", CONTEXT_SCRIPT]) for _ in range(args.runs)]
+
+        cold = []
+        for _ in range(args.runs):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            cold.append(time_run(startup, env))
+
+        time_run(startup, env)  # make sure the cache is warm
+        cached = [time_run(startup, env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"Agent startup ({args.runs} runs each)\n")
+    report("get-system-context.sh only", script)
+    report("agent, cold cache", cold)
+    report("agent, cached context", cached)
+    print(f"\nSpeedup cached vs cold: {statistics.median(cold) / statistics.median(cached):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
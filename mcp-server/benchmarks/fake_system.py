@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Fake System Binaries
+Stand-ins for kubectl, systemctl, journalctl, docker and nmcli that print
+deterministic fixture output at any scale, for offline benchmarks. install()
+writes small wrappers into a directory that is then put first on PATH; each
+wrapper runs this file with the command name. Scale is read from the
+environment on every call:
+
+    FAKE_PODS (default 50)       FAKE_NAMESPACES (10)    FAKE_NODES (3)
+    FAKE_UNITS (150)             FAKE_CONTAINERS (20)    FAKE_LOG_LINES (500)
+    FAKE_BROKEN_EVERY (97)       every Nth pod/unit/container is unhealthy
+
+A pod watch (`kubectl get --raw /api/v1/pods?watch=1`) adds, breaks and
+deletes one extra pod, an event every FAKE_WATCH_INTERVAL (2) seconds. With
+FAKE_WATCH_GATE=FILE it instead sends event N once FILE holds a number >= N.
+
+Usage: python3 benchmarks/fake_system.py install DIR
+"""
+
+import json
+import os
+import sys
+import time
+
+COMMANDS = ("kubectl", "systemctl", "journalctl", "docker", "nmcli")
+FIRST_NAMESPACES = ["default", "kube-system", "monitoring", "grafana", "ingress-nginx"]
+POD_FAILURES = [("CrashLoopBackOff", "Running"), ("ImagePullBackOff", "Pending"), ("Error", "Failed")]
+
+
+def _scale(name: str, default: int) -> int:
+    return int(os.environ.get(f"FAKE_{name}", default))
+
+
+def install(directory: str) -> str:
+    """Write one wrapper per fake command into directory and return it"""
+    os.makedirs(directory, exist_ok=True)
+    for command in COMMANDS:
+        path = os.path.join(directory, command)
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" {command} "$@"\n')
+        os.chmod(path, 0o755)
+    return directory
+
+
+def _table(rows, columns) -> str:
+    """Left-aligned columns separated by three spaces, like kubectl and docker"""
+    widths = [max(len(str(r[i])) for r in [columns] + rows) for i in range(len(columns))]
+    return "\n".join("   ".join(str(v).ljust(w) for v, w in zip(row, widths)).rstrip()
+                     for row in [columns] + rows)
+
+
+# kubectl
+
+def _namespaces():
+    count = _scale("NAMESPACES", 10)
+    return (FIRST_NAMESPACES + [f"app-{i}" for i in range(count)])[:max(count, 1)]
+
+
+def _pods():
+    """(namespace, name, ready, status, phase, restarts) for every pod"""
+    namespaces = _namespaces()
+    broken = _scale("BROKEN_EVERY", 97)
+    pods = []
+    for i in range(_scale("PODS", 50)):
+        namespace = namespaces[i % len(namespaces)]
+        # About 40 deployments per namespace, several replicas each
+        name = f"{namespace}-app-{i // len(namespaces) % 40:02d}-7d9f8c6b5-{i:05x}"
+        if broken and i % broken == broken - 1:
+            reason, phase = POD_FAILURES[(i // broken) % len(POD_FAILURES)]
+            pods.append((namespace, name, "0/1", reason, phase, 20 + i % 30))
+        else:
+            pods.append((namespace, name, "1/1", "Running", "Running", i % 3))
+    return pods
+
+
+def _pod_json(pod):
+    namespace, name, ready, status, phase, restarts = pod
+    container = {"name": "app", "ready": ready == "1/1", "restartCount": restarts,
+                 "state": {"running": {}} if status == "Running" else
+                 {"waiting": {"reason": status, "message": f"{status} for container app"}}}
+    return {"kind": "Pod", "metadata": {"name": name, "namespace": namespace,
+                                        "creationTimestamp": "2026-10-01T00:00:00Z"},
+            "spec": {"containers": [{"name": "app"}], "nodeName": "node-0"},
+            "status": {"phase": phase, "containerStatuses": [container]}}
+
+
+def _node_json(i):
+    return {"kind": "Node", "metadata": {"name": f"node-{i}", "creationTimestamp": "2026-10-01T00:00:00Z",
+                                         "labels": {"node-role.kubernetes.io/control-plane": ""} if i == 0 else {}},
+            "status": {"conditions": [{"type": "Ready", "status": "True"},
+                                      {"type": "DiskPressure", "status": "False"}],
+                       "nodeInfo": {"kubeletVersion": "v1.30.4"}}}
+
+
+WATCHED_POD = ("default", "watched-pod", "1/1", "Running", "Running", 0)
+WATCH_EVENTS = [("ADDED", WATCHED_POD),
+                ("MODIFIED", WATCHED_POD[:2] + ("0/1", "CrashLoopBackOff", "Running", 1)),
+                ("DELETED", WATCHED_POD[:2] + ("0/1", "CrashLoopBackOff", "Running", 1))]
+
+
+def _raw(path):
+    """`kubectl get --raw` for the list and watch endpoints the kube cache uses"""
+    path, _, query = path.partition("?")
+    resource = path.rsplit("/", 1)[-1]
+    if "watch=1" not in query:
+        items = []
+        if resource == "pods":
+            items = [_pod_json(p) for p in _pods()]
+        elif resource == "nodes":
+            items = [_node_json(i) for i in range(_scale("NODES", 3))]
+        elif resource == "namespaces":
+            items = [{"metadata": {"name": n, "creationTimestamp": "2026-10-01T00:00:00Z"},
+                      "status": {"phase": "Active"}} for n in _namespaces()]
+        print(json.dumps({"kind": "List", "metadata": {"resourceVersion": "1000"}, "items": items}))
+        return 0
+    if resource == "pods":
+        gate = os.environ.get("FAKE_WATCH_GATE")
+        for n, (kind, pod) in enumerate(WATCH_EVENTS, 1):
+            if gate:
+                while not _gate_open(gate, n):
+                    time.sleep(0.01)
+            else:
+                time.sleep(float(os.environ.get("FAKE_WATCH_INTERVAL", 2)))
+            print(json.dumps({"type": kind, "object": _pod_json(pod)}), flush=True)
+    # Watches never end on their own
+    time.sleep(3600)
+    return 0
+
+
+def _gate_open(path, n):
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0) >= n
+    except (OSError, ValueError):
+        return False
+
+
+def _namespace_of(args):
+    if "--all-namespaces" in args or "-A" in args:
+        return None
+    if "-n" in args:
+        return args[args.index("-n") + 1]
+    return "default"
+
+
+def kubectl(args):
+    if args[:2] == ["config", "current-context"]:
+        print("bench-cluster")
+        return 0
+    if args[:2] == ["config", "view"]:
+        print("default")
+        return 0
+    if args[:2] == ["get", "--raw"]:
+        return _raw(args[2])
+    if "-w" in args:
+        # Watches never end on their own
+        time.sleep(3600)
+        return 0
+    if args[:1] == ["logs"]:
+        tail = next((int(a.split("=", 1)[1]) for a in args if a.startswith("--tail=")), _scale("LOG_LINES", 500))
+        print(_log_lines(args[1], tail))
+        return 0
+    if args[:2] == ["describe", "pod"]:
+        print(f"Name:         {args[2]}\nNamespace:    {_namespace_of(args)}\nStatus:       Running\n"
+              f"Containers:\n  app:\n    State:          Running\n    Restart Count:  0\nEvents:       <none>")
+        return 0
+    if args[:1] != ["get"] or len(args) < 2:
+        print(f"error: unknown command {' '.join(args)!r} for kubectl (fake)", file=sys.stderr)
+        return 1
+
+    resource = args[1]
+    namespace = _namespace_of(args)
+    pods = [p for p in _pods() if namespace is None or p[0] == namespace]
+    if "-o" in args and args[args.index("-o") + 1] == "json":
+        items = []
+        if resource in ("pods", "pods,nodes"):
+            items += [_pod_json(p) for p in pods]
+        if resource in ("nodes", "pods,nodes"):
+            items += [_node_json(i) for i in range(_scale("NODES", 3))]
+        print(json.dumps({"kind": "List", "apiVersion": "v1", "items": items}))
+        return 0
+
+    prefix = ["NAMESPACE"] if namespace is None else []
+    if resource == "pods":
+        rows = [([p[0]] if namespace is None else []) + [p[1], p[2], p[3], str(p[5]), "15d"] for p in pods]
+        print(_table(rows, prefix + ["NAME", "READY", "STATUS", "RESTARTS", "AGE"]))
+    elif resource == "nodes":
+        rows = [[f"node-{i}", "Ready", "control-plane" if i == 0 else "<none>", "15d", "v1.30.4"]
+                for i in range(_scale("NODES", 3))]
+        print(_table(rows, ["NAME", "STATUS", "ROLES", "AGE", "VERSION"]))
+    elif resource == "namespaces":
+        print(_table([[n, "Active", "15d"] for n in _namespaces()], ["NAME", "STATUS", "AGE"]))
+    elif resource in ("deployments", "services", "all"):
+        deployments = sorted({(p[0], p[1].rsplit("-", 2)[0]) for p in pods})
+        if resource in ("deployments", "all"):
+            rows = [([ns] if namespace is None else []) + [name, "1/1", "1", "1", "15d"] for ns, name in deployments]
+            print(_table(rows, prefix + ["NAME", "READY", "UP-TO-DATE", "AVAILABLE", "AGE"]))
+        if resource == "all":
+            print()
+        if resource in ("services", "all"):
+            rows = [([ns] if namespace is None else []) + [name, "ClusterIP", f"10.96.{i // 250}.{i % 250}",
+                                                           "<none>", "80/TCP", "15d"]
+                    for i, (ns, name) in enumerate(deployments)]
+            print(_table(rows, prefix + ["NAME", "TYPE", "CLUSTER-IP", "EXTERNAL-IP", "PORT(S)", "AGE"]))
+    else:
+        print(f"No resources found in {namespace or 'any'} namespace.")
+    return 0
+
+
+# systemd
+
+def _units():
+    broken = _scale("BROKEN_EVERY", 97)
+    units = []
+    for i in range(_scale("UNITS", 150)):
+        name = f"bench-service-{i:04d}.service"
+        if broken and i % broken == broken - 1:
+            units.append((name, "loaded", "failed", "failed"))
+        elif i % 4 == 3:
+            units.append((name, "loaded", "inactive", "dead"))
+        else:
+            units.append((name, "loaded", "active", "running"))
+    return units
+
+
+def _log_lines(source: str, count: int) -> str:
+    lines = []
+    for i in range(count):
+        stamp = f"Oct 16 {10 + i // 3600 % 14:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        if i % 50 == 49:
+            message = f"error: upstream request {i} failed: connection refused"
+        else:
+            message = f"handled request id={i} in {i % 17}ms"
+        lines.append(f"{stamp} bench-host {source}[{1000 + i % 7}]: {message}")
+    return "\n".join(lines)
+
+
+def systemctl(args):
+    if args[:1] == ["list-units"]:
+        units = _units()
+        print(_table([[u, load, active, sub, f"Bench service {u[14:18]}"] for u, load, active, sub in units],
+                     ["UNIT", "LOAD", "ACTIVE", "SUB", "DESCRIPTION"]))
+        print("\nLOAD   = Reflects whether the unit definition was properly loaded.\n"
+              "ACTIVE = The high-level unit activation state, i.e. generalization of SUB.\n"
+              "SUB    = The low-level unit activation state, values depend on unit type.\n"
+              f"{len(units)} loaded units listed.")
+        return 0
+    if args[:1] == ["status"]:
+        service = args[1] if len(args) > 1 else "unknown"
+        print(f"● {service}.service - {service}\n     Loaded: loaded (/usr/lib/systemd/system/{service}.service; enabled)\n"
+              f"     Active: active (running) since Thu 2026-10-01 00:00:00 UTC; 2 weeks ago\n"
+              f"   Main PID: 1234 ({service})\n\n{_log_lines(service, 10)}")
+        return 0
+    if args[:1] in (["restart"], ["enable"], ["disable"], ["start"], ["stop"]):
+        return 0
+    if args[:1] == ["is-active"]:
+        print("active")
+        return 0
+    print(f"Unknown command verb {args[0] if args else ''} (fake)", file=sys.stderr)
+    return 1
+
+
+def journalctl(args):
+    unit = args[args.index("-u") + 1] if "-u" in args else "system"
+    count = int(args[args.index("-n") + 1]) if "-n" in args else _scale("LOG_LINES", 500)
+    print(_log_lines(unit, count))
+    return 0
+
+
+# docker
+
+def docker(args):
+    if args[:1] == ["--version"]:
+        print("Docker version 27.3.1, build fake")
+        return 0
+    if args[:1] != ["ps"]:
+        print(f"docker: '{args[0] if args else ''}' is not a docker command (fake)", file=sys.stderr)
+        return 1
+    broken = _scale("BROKEN_EVERY", 97)
+    count = _scale("CONTAINERS", 20)
+    names = [f"bench-container-{i:03d}" for i in range(count)]
+    if "--format" in args:
+        print("\n".join(names))
+        return 0
+    rows = []
+    for i, name in enumerate(names):
+        if broken and i % broken == broken - 1:
+            status = "Restarting (1) 5 seconds ago"
+        elif "-a" in args and i % 5 == 4:
+            status = "Exited (0) 2 days ago"
+        else:
+            status = "Up 2 weeks (healthy)"
+        rows.append([f"{i:012x}", f"bench/image-{i % 7}:latest", '"/entrypoint.sh"', "2 weeks ago", status,
+                     "", name])
+    print(_table(rows, ["CONTAINER ID", "IMAGE", "COMMAND", "CREATED", "STATUS", "PORTS", "NAMES"]))
+    return 0
+
+
+# nmcli
+
+def nmcli(args):
+    if args[:2] == ["device", "status"]:
+        print(_table([["eth0", "ethernet", "connected", "Wired connection 1"],
+                      ["wlan0", "wifi", "connected", "bench-wifi"],
+                      ["lo", "loopback", "connected (externally)", "lo"]],
+                     ["DEVICE", "TYPE", "STATE", "CONNECTION"]))
+    elif args[:2] == ["connection", "show"]:
+        print(_table([["Wired connection 1", "6f1c2c0e-0000-4000-8000-000000000001", "ethernet", "eth0"],
+                      ["bench-wifi", "6f1c2c0e-0000-4000-8000-000000000002", "wifi", "wlan0"]],
+                     ["NAME", "UUID", "TYPE", "DEVICE"]))
+    elif args[:3] == ["device", "wifi", "list"]:
+        print(_table([["", f"00:11:22:33:44:{i:02X}", f"network-{i}", "Infra", str(1 + i % 11), "270 Mbit/s",
+                       str(90 - i * 3), "WPA2"] for i in range(20)],
+                     ["IN-USE", "BSSID", "SSID", "MODE", "CHAN", "RATE", "SIGNAL", "SECURITY"]))
+    elif args[:1] == ["connection"]:
+        print("Connection successfully activated (fake)")
+    else:
+        print(f"Error: argument '{' '.join(args)}' not understood (fake)", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "install":
+        print(install(sys.argv[2]))
+        return 0
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    return globals()[sys.argv[1]](sys.argv[2:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
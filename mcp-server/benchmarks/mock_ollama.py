@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama Server
+Minimal stand-in for the Ollama REST API (/api/chat, /api/generate) that
+replies with scripted responses after a configurable delay, for offline
+benchmarks.
+
+Usage: python3 benchmarks/mock_ollama.py [--port 11435] [--latency 0.2] [--token-delay 0.01]
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+DEFAULT_RESPONSE = '{"tool": "execute_command", "arguments": {"command": "echo ok"}, "explanation": "Benchmark"}'
+
+
+class MockOllama:
+    """Scripted Ollama API on a background thread.
+
+    Responses are served round-robin; latency is added before the first token
+    (prompt evaluation) and token_delay between streamed tokens. Like Ollama,
+    options.num_predict cuts a response short with done_reason "length"
+    (a mock token is 4 characters).
+    """
+
+    def __init__(self, responses: Optional[List[str]] = None, latency: float = 0.0,
+                 token_delay: float = 0.0, port: int = 0):
+        self.responses = responses or [DEFAULT_RESPONSE]
+        self.latency = latency
+        self.token_delay = token_delay
+        self.requests = 0
+        self.last_request: Optional[dict] = None
+        self.request_log: List[dict] = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.server.server_port}"
+
+    def next_response(self) -> str:
+        with self._lock:
+            response = self.responses[self.requests % len(self.responses)]
+            self.requests += 1
+        return response
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # The client dropped a keep-alive connection after cancelling a stream
+                    pass
+
+            def _chunk(self, path: str, text: str, done: bool, stats: Optional[dict] = None) -> bytes:
+                if path == "/api/chat":
+                    body = {"message": {"role": "assistant", "content": text}, "done": done}
+                else:
+                    body = {"response": text, "done": done}
+                if done:
+                    body.update(stats or {})
+                return json.dumps(body).encode()
+
+            def do_POST(self):
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self.send_error(404)
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                mock.last_request = request
+                mock.request_log.append(request)
+                response = mock.next_response()
+                time.sleep(mock.latency)
+                tokens = [response[i:i + 4] for i in range(0, len(response), 4)]
+                limit = (request.get("options") or {}).get("num_predict")
+                done_reason = "stop"
+                if limit and len(tokens) > limit:
+                    tokens, done_reason = tokens[:limit], "length"
+                    response = "".join(tokens)
+                # Same shape as Ollama's final chunk; prompt size is estimated at 4 characters per token
+                prompt = json.dumps(request.get("messages") or request.get("prompt", ""))
+                stats = {"done_reason": done_reason, "load_duration": 0, "prompt_eval_count": len(prompt) // 4,
+                         "prompt_eval_duration": int(mock.latency * 1e9), "eval_count": len(tokens),
+                         "eval_duration": int(mock.token_delay * len(tokens) * 1e9)}
+                stats["total_duration"] = stats["prompt_eval_duration"] + stats["eval_duration"]
+
+                if not request.get("stream", True):
+                    payload = self._chunk(self.path, response, True, stats)
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in tokens:
+                        self._write_chunk(self._chunk(self.path, token, False) + b"\n")
+                        if mock.token_delay:
+                            time.sleep(mock.token_delay)
+                    self._write_chunk(self._chunk(self.path, "", True, stats) + b"\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The agent cancels the stream once it has a complete tool call
+                    self.close_connection = True
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mock Ollama API server")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--responses", help="JSON file with a list of scripted response strings")
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    mock = MockOllama(responses, args.latency, args.token_delay, args.port)
+    print(f"Mock Ollama listening on {mock.host}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
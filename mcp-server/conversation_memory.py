@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Conversation Memory
+Token-budgeted history for the agent's prompt. Recent turns are kept verbatim
+within a token budget, older turns are folded into a rolling one-line-per-turn
+summary, and large tool outputs are stored out-of-band behind short handles
+("out-3") that the model can page through with the recall_output tool.
+Prompt size therefore stays flat over long interactive sessions.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+# Tokens of history (summary + recent turns) sent with each request
+HISTORY_TOKENS = 1536
+# Tool outputs larger than this are stored out-of-band; the prompt gets a preview
+INLINE_TOKENS = 300
+# Cap on the rolling summary; the oldest summary lines are dropped first
+SUMMARY_TOKENS = 256
+# Out-of-band outputs kept for recall (least recently used are dropped)
+MAX_OUTPUTS = 20
+# Lines returned by recall_output when no range is given
+RECALL_LINES = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English and code)"""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    def __init__(self, budget: int = HISTORY_TOKENS, inline_tokens: int = INLINE_TOKENS,
+                 summary_tokens: int = SUMMARY_TOKENS, max_outputs: int = MAX_OUTPUTS):
+        self.budget = budget
+        self.inline_tokens = inline_tokens
+        self.summary_tokens = summary_tokens
+        self.max_outputs = max_outputs
+        self.entries: List[Dict[str, Any]] = []
+        self.summary: List[str] = []
+        self.outputs: "OrderedDict[str, str]" = OrderedDict()
+        self._next_handle = 1
+
+    def clear(self):
+        self.entries = []
+        self.summary = []
+        self.outputs.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _store_output(self, text: str) -> str:
+        handle = f"out-{self._next_handle}"
+        self._next_handle += 1
+        self.outputs[handle] = text
+        while len(self.outputs) > self.max_outputs:
+            self.outputs.popitem(last=False)
+        return handle
+
+    def _inline(self, tool_result: str, digest: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Prompt text for a tool result, spilling large or compacted ones out-of-band"""
+        text = tool_result if digest is None else digest
+        tokens = estimate_tokens(text)
+        if text == tool_result and tokens <= self.inline_tokens:
+            return tool_result, None
+        handle = self._store_output(tool_result)
+        if tokens <= self.inline_tokens:
+            return f"{text}\n[full output stored as {handle}]", handle
+        preview = text[:self.inline_tokens * 4]
+        preview = preview[:preview.rfind("\n")] if "\n" in preview else preview
+        lines = tool_result.count("\n") + 1
+        return (f"{preview}\n[... {estimate_tokens(tool_result)} tokens, {lines} lines stored as {handle}; "
+                f"use recall_output to read more]"), handle
+
+    def add(self, user: str, tool: Optional[str] = None, tool_result: Optional[str] = None,
+            response: Optional[str] = None, digest: Optional[str] = None):
+        """Record one finished turn; digest is a compacted form of tool_result for the prompt"""
+        entry = {"user": user}
+        if tool:
+            entry["tool"] = tool
+        if tool_result is not None:
+            entry["tool_result"], entry["handle"] = self._inline(tool_result, digest)
+        if response is not None:
+            entry["response"] = response
+        entry["tokens"] = estimate_tokens(user) + estimate_tokens(self._assistant_text(entry))
+        self.entries.append(entry)
+        self._fold()
+
+    @staticmethod
+    def _assistant_text(entry: Dict[str, Any]) -> str:
+        if "response" in entry:
+            return entry["response"]
+        if "tool_result" in entry:
+            return f"Tool result: {entry['tool_result']}"
+        return ""
+
+    def _fold(self):
+        """Move the oldest turns into the summary until the rest fits the budget"""
+        budget = self.budget - self.summary_cost
+        while len(self.entries) > 1 and sum(e["tokens"] for e in self.entries) > budget:
+            self.summary.append(self._summarize(self.entries.pop(0)))
+            while len(self.summary) > 1 and self.summary_cost > self.summary_tokens:
+                self.summary.pop(0)
+            budget = self.budget - self.summary_cost
+
+    @staticmethod
+    def _summarize(entry: Dict[str, Any]) -> str:
+        line = f"- {entry['user'][:100]}"
+        if entry.get("tool"):
+            line += f" -> {entry['tool']}"
+        if entry.get("handle"):
+            line += f" (output {entry['handle']})"
+        elif entry.get("response"):
+            line += f": {' '.join(entry['response'].split())[:100]}"
+        elif entry.get("tool_result"):
+            line += f": {' '.join(entry['tool_result'].split())[:100]}"
+        return line
+
+    @property
+    def summary_cost(self) -> int:
+        return estimate_tokens("\n".join(self.summary)) if self.summary else 0
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Chat messages for the history part of the prompt"""
+        messages = []
+        if self.summary:
+            messages.append({"role": "user", "content": "Earlier in this session:\n" + "\n".join(self.summary)})
+            messages.append({"role": "assistant", "content": "Noted."})
+        for entry in self.entries:
+            messages.append({"role": "user", "content": entry["user"]})
+            assistant = self._assistant_text(entry)
+            if assistant:
+                messages.append({"role": "assistant", "content": assistant})
+        return messages
+
+    def recall(self, handle: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> Dict[str, Any]:
+        """Lines of an out-of-band tool output"""
+        if handle not in self.outputs:
+            available = ", ".join(self.outputs) or "none"
+            return {"error": f"Unknown or expired output handle: {handle} (available: {available})"}
+        self.outputs.move_to_end(handle)
+        lines = self.outputs[handle].split("\n")
+        start = max(1, int(start_line or 1))
+        end = min(len(lines), int(end_line or start + RECALL_LINES - 1))
+        if start > len(lines):
+            return {"error": f"line {start} is past the end of {handle} ({len(lines)} lines)"}
+        return {"lines": f"{start}-{end} of {len(lines)}", "output": "\n".join(lines[start - 1:end])}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Ranged File Reader
+Size-aware read_file backend: byte ranges, line ranges and tails served via
+mmap, with a cached sparse newline index so repeated line lookups on huge
+files do not rescan them.
+"""
+
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Files at least this big are accessed through mmap instead of read()
+MMAP_THRESHOLD = 1024 * 1024
+# Most bytes of content returned by a single read (keeps the model's context sane)
+MAX_READ_BYTES = 64 * 1024
+# A checkpoint is stored every INDEX_STRIDE lines, so a lookup scans at most that many
+INDEX_STRIDE = 256
+# Number of files whose newline index is kept in memory
+INDEX_CACHE_SIZE = 32
+
+
+class NewlineIndex:
+    """Byte offset of the start of every INDEX_STRIDE-th line of a file"""
+
+    def __init__(self, mm, size: int):
+        self.checkpoints = array('Q', [0])
+        count = 0
+        pos = mm.find(b"\n")
+        while pos != -1:
+            count += 1
+            if count % INDEX_STRIDE == 0:
+                self.checkpoints.append(pos + 1)
+            pos = mm.find(b"\n", pos + 1)
+        # A final line without a trailing newline still counts as a line
+        last_newline = mm.rfind(b"\n")
+        self.line_count = count + (1 if size and last_newline != size - 1 else 0)
+
+    def line_offset(self, mm, line: int) -> int:
+        """Byte offset where 0-based line starts (or EOF if past the end)"""
+        checkpoint = min(line // INDEX_STRIDE, len(self.checkpoints) - 1)
+        pos = self.checkpoints[checkpoint]
+        for _ in range(line - checkpoint * INDEX_STRIDE):
+            nl = mm.find(b"\n", pos)
+            if nl == -1:
+                return len(mm)
+            pos = nl + 1
+        return pos
+
+
+_index_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _cached_index(path: str, st: os.stat_result) -> Optional[NewlineIndex]:
+    with _index_lock:
+        entry = _index_cache.get(path)
+        if entry and entry[0] == (st.st_size, st.st_mtime_ns):
+            _index_cache.move_to_end(path)
+            return entry[1]
+    return None
+
+
+def _get_index(path: str, st: os.stat_result, mm) -> NewlineIndex:
+    index = _cached_index(path, st)
+    if index is None:
+        index = NewlineIndex(mm, st.st_size)
+        with _index_lock:
+            _index_cache[path] = ((st.st_size, st.st_mtime_ns), index)
+            _index_cache.move_to_end(path)
+            while len(_index_cache) > INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+    return index
+
+
+def _tail_offset(mm, lines: int) -> int:
+    """Byte offset where the last `lines` lines start"""
+    end = len(mm)
+    if end and mm[end - 1:end] == b"\n":
+        end -= 1
+    pos = end
+    for _ in range(lines):
+        nl = mm.rfind(b"\n", 0, pos)
+        if nl == -1:
+            return 0
+        pos = nl
+    return pos + 1
+
+
+def _as_int(value, name: str) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer, got {value!r}")
+
+
+def read_file(path: str, offset=None, length=None, start_line=None, end_line=None,
+              tail=None, max_bytes: int = MAX_READ_BYTES) -> Dict[str, Any]:
+    """Read all or part of a file.
+
+    offset/length select a byte range, start_line/end_line a 1-based inclusive
+    line range and tail the last N lines. Without any of them the whole file
+    is returned, capped at max_bytes.
+    """
+    offset, length = _as_int(offset, "offset"), _as_int(length, "length")
+    start_line, end_line = _as_int(start_line, "start_line"), _as_int(end_line, "end_line")
+    tail = _as_int(tail, "tail")
+
+    st = os.stat(path)
+    size = st.st_size
+    result: Dict[str, Any] = {"size": size}
+    ranged = any(v is not None for v in (offset, length, start_line, end_line, tail))
+
+    # Small whole-file reads keep the old simple path
+    if not ranged and size <= max_bytes:
+        with open(path, 'r', errors="replace") as f:
+            result["content"] = f.read()
+        return result
+
+    if size == 0:
+        result.update(content="", lines=0)
+        return result
+
+    with open(path, 'rb') as f:
+        if size < MMAP_THRESHOLD:
+            data = f.read()
+        else:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if start_line is not None or end_line is not None:
+                index = _get_index(path, st, data)
+                first = max(start_line or 1, 1)
+                last = min(end_line if end_line is not None else first + 99, index.line_count)
+                start = index.line_offset(data, first - 1)
+                end = index.line_offset(data, last) if last >= first else start
+                result["lines"] = index.line_count
+                if last >= first:
+                    result["range"] = f"lines {first}-{last}"
+                else:
+                    result["range"] = f"line {first} is past the end of the file"
+            elif tail is not None:
+                start, end = _tail_offset(data, max(tail, 0)), size
+                result["range"] = f"last {tail} lines"
+            else:
+                start = min(max(offset or 0, 0), size)
+                end = size if length is None else min(start + max(length, 0), size)
+                result["range"] = f"bytes {start}-{end}"
+
+            # Line count is only reported when it is free (cached index or small file)
+            if "lines" not in result:
+                index = _cached_index(path, st)
+                if index is None and size < MMAP_THRESHOLD:
+                    index = _get_index(path, st, data)
+                if index is not None:
+                    result["lines"] = index.line_count
+
+            if end - start > max_bytes:
+                end = start + max_bytes
+                result["truncated"] = f"content capped at {max_bytes} bytes; request a smaller range for more"
+            result["content"] = data[start:end].decode(errors="replace")
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    return result
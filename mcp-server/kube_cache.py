@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Kubernetes State Cache
+Informer-style in-memory copy of pods, deployments, services, namespaces and nodes,
+kept fresh by API watches (through `kubectl get --raw`) that resume from the
+listing's resourceVersion, so questions are answered without a fresh cluster
+listing every time.
+"""
+
+import atexit
+import codecs
+import json
+import os
+import subprocess
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+RESOURCES = ["pods", "deployments", "services", "namespaces", "nodes"]
+CLUSTER_SCOPED = {"namespaces", "nodes"}
+# Cluster-wide API paths; namespaced resources are listed across all namespaces
+API_PATHS = {
+    "pods": "/api/v1/pods",
+    "deployments": "/apis/apps/v1/deployments",
+    "services": "/api/v1/services",
+    "namespaces": "/api/v1/namespaces",
+    "nodes": "/api/v1/nodes",
+}
+# Seconds to wait before re-listing after a watch exits, doubling up to the max
+WATCH_BACKOFF = 1
+WATCH_BACKOFF_MAX = 60
+# How long a query waits for the initial listing before falling back to kubectl
+SYNC_WAIT = 2
+
+
+def _age(timestamp: Optional[str]) -> str:
+    """Render an RFC3339 creationTimestamp like kubectl's AGE column"""
+    if not timestamp:
+        return "<unknown>"
+    created = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    seconds = int((datetime.now(timezone.utc) - created).total_seconds())
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds // size}{unit}"
+    return f"{max(seconds, 0)}s"
+
+
+def pod_ready(pod: dict) -> Tuple[int, int]:
+    """(ready containers, total containers)"""
+    statuses = pod.get("status", {}).get("containerStatuses", [])
+    total = len(pod.get("spec", {}).get("containers", [])) or len(statuses)
+    return sum(1 for c in statuses if c.get("ready")), total
+
+
+def pod_restarts(pod: dict) -> int:
+    return sum(c.get("restartCount", 0) for c in pod.get("status", {}).get("containerStatuses", []))
+
+
+def pod_status(pod: dict) -> str:
+    """The STATUS column kubectl would show for a pod"""
+    if pod.get("metadata", {}).get("deletionTimestamp"):
+        return "Terminating"
+    status = pod.get("status", {})
+    reason = status.get("reason") or status.get("phase", "Unknown")
+    for container in status.get("initContainerStatuses", []):
+        state = container.get("state", {})
+        if "waiting" in state and state["waiting"].get("reason") not in (None, "PodInitializing"):
+            return f"Init:{state['waiting']['reason']}"
+        if "terminated" in state and state["terminated"].get("exitCode", 0) != 0:
+            return f"Init:{state['terminated'].get('reason', 'Error')}"
+    for container in status.get("containerStatuses", []):
+        state = container.get("state", {})
+        if "waiting" in state and state["waiting"].get("reason"):
+            reason = state["waiting"]["reason"]
+        elif "terminated" in state and state["terminated"].get("reason"):
+            reason = state["terminated"]["reason"]
+    return reason
+
+
+def _table(rows: List[List[str]]) -> str:
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("   ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip()
+                     for row in rows) + "\n"
+
+
+class KubeCache:
+    """Background list+watch of core resources with kubectl-like table output"""
+
+    def __init__(self, kubectl: Optional[str] = None, resources: Optional[List[str]] = None):
+        self.kubectl = kubectl or os.environ.get("KUBECTL", "kubectl")
+        self.resources = resources or RESOURCES
+        self.store: Dict[str, Dict[Tuple[str, str], dict]] = {r: {} for r in self.resources}
+        self.synced = {r: threading.Event() for r in self.resources}
+        self.errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._procs: Dict[str, subprocess.Popen] = {}
+        self._threads: List[threading.Thread] = []
+        self.namespace = "default"
+
+    # --- Informer loop ----------------------------------------------------
+
+    def start(self):
+        """Start one list+watch thread per resource"""
+        try:
+            ns = subprocess.run(
+                [self.kubectl, "config", "view", "--minify", "--output", "jsonpath={..namespace}"],
+                capture_output=True, text=True, timeout=5
+            )
+            if ns.returncode == 0 and ns.stdout.strip():
+                self.namespace = ns.stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            pass
+        # Don't leave kubectl watches running after the agent exits
+        atexit.register(self.stop)
+        for resource in self.resources:
+            thread = threading.Thread(target=self._run, args=(resource,), daemon=True,
+                                      name=f"kube-watch-{resource}")
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        for proc in list(self._procs.values()):
+            proc.terminate()
+
+    def _run(self, resource: str):
+        backoff = WATCH_BACKOFF
+        while not self._stopping.is_set():
+            try:
+                resource_version = self._list(resource)
+                backoff = WATCH_BACKOFF
+                self._watch(resource, resource_version)
+            except Exception as e:
+                self.errors[resource] = str(e)
+            if self._stopping.wait(backoff):
+                break
+            backoff = min(backoff * 2, WATCH_BACKOFF_MAX)
+
+    def _list(self, resource: str) -> str:
+        """Full listing; replaces the store so objects deleted while unwatched disappear.
+
+        Returns the list's resourceVersion, which the watch resumes from.
+        """
+        # `kubectl get -o json` wraps items in a List without the server's
+        # resourceVersion, so ask the API directly
+        cmd = [self.kubectl, "get", "--raw", API_PATHS[resource]]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"kubectl get {resource} failed")
+        listing = json.loads(result.stdout)
+        with self._lock:
+            self.store[resource] = {self._key(obj): obj for obj in listing.get("items") or []}
+        self.errors.pop(resource, None)
+        self.synced[resource].set()
+        return listing.get("metadata", {}).get("resourceVersion", "")
+
+    def _watch(self, resource: str, resource_version: str):
+        """Apply watch events until kubectl exits (server-side watch timeout, error, stop)"""
+        # Starting at the listing's resourceVersion replays every change made
+        # since the list, so nothing falls between the two
+        cmd = [self.kubectl, "get", "--raw",
+               f"{API_PATHS[resource]}?watch=1&resourceVersion={resource_version}"]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                stdin=subprocess.DEVNULL)
+        self._procs[resource] = proc
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        buffer = ""
+        try:
+            # The API streams one JSON event per line; decode without relying on the newlines
+            while True:
+                chunk = os.read(proc.stdout.fileno(), 65536)
+                if not chunk:
+                    break
+                buffer += utf8.decode(chunk)
+                while True:
+                    buffer = buffer.lstrip()
+                    if not buffer:
+                        break
+                    try:
+                        event, end = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError:
+                        break
+                    buffer = buffer[end:]
+                    self._apply(resource, event)
+        finally:
+            if proc.poll() is None:
+                # An ERROR event ends the watch before kubectl does
+                proc.terminate()
+            proc.stdout.close()
+            proc.wait()
+            self._procs.pop(resource, None)
+
+    def _apply(self, resource: str, event: dict):
+        kind, obj = event.get("type"), event.get("object", {})
+        if kind == "ERROR":
+            # Usually 410 Gone: the resourceVersion is too old to resume from, so relist
+            raise RuntimeError(obj.get("message") or f"watch on {resource} failed")
+        with self._lock:
+            if kind == "DELETED":
+                self.store[resource].pop(self._key(obj), None)
+            elif kind in ("ADDED", "MODIFIED"):
+                self.store[resource][self._key(obj)] = obj
+
+    @staticmethod
+    def _key(obj: dict) -> Tuple[str, str]:
+        meta = obj.get("metadata", {})
+        return meta.get("namespace", ""), meta.get("name", "")
+
+    # --- Queries ----------------------------------------------------------
+
+    def ready(self, resource: str, wait: float = SYNC_WAIT) -> bool:
+        """Whether the resource has been listed at least once (waiting briefly if not)"""
+        return resource in self.synced and self.synced[resource].wait(wait)
+
+    def items(self, resource: str, namespace: Optional[str] = None) -> List[dict]:
+        """Cached objects, optionally filtered by namespace ("" = current, "all" = every)"""
+        if namespace == "":
+            namespace = self.namespace
+        with self._lock:
+            objects = list(self.store[resource].values())
+        if namespace and namespace != "all" and resource not in CLUSTER_SCOPED:
+            objects = [o for o in objects if o.get("metadata", {}).get("namespace") == namespace]
+        return sorted(objects, key=self._key)
+
+    def get(self, resource: str, namespace: Optional[str] = "") -> str:
+        """Render cached objects as a kubectl-style table"""
+        objects = self.items(resource, namespace)
+        all_ns = namespace == "all" and resource not in CLUSTER_SCOPED
+        if not objects:
+            where = "" if all_ns or resource in CLUSTER_SCOPED else f" in {namespace or self.namespace} namespace"
+            return f"No resources found{where}.\n"
+
+        if resource == "pods":
+            rows = [["NAME", "READY", "STATUS", "RESTARTS", "AGE"]]
+            for pod in objects:
+                ready, total = pod_ready(pod)
+                rows.append([pod["metadata"]["name"], f"{ready}/{total}", pod_status(pod),
+                             str(pod_restarts(pod)), _age(pod["metadata"].get("creationTimestamp"))])
+        elif resource == "deployments":
+            rows = [["NAME", "READY", "UP-TO-DATE", "AVAILABLE", "AGE"]]
+            for dep in objects:
+                status = dep.get("status", {})
+                rows.append([dep["metadata"]["name"],
+                             f"{status.get('readyReplicas', 0)}/{dep.get('spec', {}).get('replicas', 0)}",
+                             str(status.get("updatedReplicas", 0)), str(status.get("availableReplicas", 0)),
+                             _age(dep["metadata"].get("creationTimestamp"))])
+        elif resource == "services":
+            rows = [["NAME", "TYPE", "CLUSTER-IP", "EXTERNAL-IP", "PORT(S)", "AGE"]]
+            for svc in objects:
+                spec = svc.get("spec", {})
+                ingress = svc.get("status", {}).get("loadBalancer", {}).get("ingress", [])
+                external = ",".join(i.get("ip") or i.get("hostname", "") for i in ingress) or \
+                    ",".join(spec.get("externalIPs", [])) or ("<pending>" if spec.get("type") == "LoadBalancer" else "<none>")
+                ports = ",".join(
+                    f"{p['port']}" + (f":{p['nodePort']}" if p.get("nodePort") else "") + f"/{p.get('protocol', 'TCP')}"
+                    for p in spec.get("ports", [])
+                ) or "<none>"
+                rows.append([svc["metadata"]["name"], spec.get("type", ""), spec.get("clusterIP", ""),
+                             external, ports, _age(svc["metadata"].get("creationTimestamp"))])
+        elif resource == "nodes":
+            rows = [["NAME", "STATUS", "ROLES", "AGE", "VERSION"]]
+            for node in objects:
+                meta = node["metadata"]
+                conditions = {c.get("type"): c.get("status") for c in node.get("status", {}).get("conditions", [])}
+                status = "Ready" if conditions.get("Ready") == "True" else "NotReady"
+                if node.get("spec", {}).get("unschedulable"):
+                    status += ",SchedulingDisabled"
+                roles = ",".join(sorted(label.split("/", 1)[1] for label in meta.get("labels", {})
+                                        if label.startswith("node-role.kubernetes.io/"))) or "<none>"
+                rows.append([meta["name"], status, roles, _age(meta.get("creationTimestamp")),
+                             node.get("status", {}).get("nodeInfo", {}).get("kubeletVersion", "")])
+        else:
+            rows = [["NAME", "STATUS", "AGE"]]
+            for ns in objects:
+                rows.append([ns["metadata"]["name"], ns.get("status", {}).get("phase", ""),
+                             _age(ns["metadata"].get("creationTimestamp"))])
+
+        if all_ns:
+            rows[0].insert(0, "NAMESPACE")
+            for row, obj in zip(rows[1:], objects):
+                row.insert(0, obj["metadata"].get("namespace", ""))
+        return _table(rows)
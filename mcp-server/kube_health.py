@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Kubernetes Health Engine
+Evaluates pods and nodes from a single JSON listing (phase, readiness,
+restarts, waiting reasons, node conditions) and returns a compact,
+ranked summary instead of raw kubectl tables.
+"""
+
+import json
+import os
+import subprocess
+from typing import Dict, List, Optional
+
+from kube_cache import pod_ready, pod_restarts, pod_status
+
+CRITICAL = "CRITICAL"
+WARNING = "WARNING"
+SEVERITY_RANK = {CRITICAL: 0, WARNING: 1}
+
+# Container waiting reasons that mean the pod cannot start without intervention
+CRITICAL_REASONS = {
+    "CrashLoopBackOff", "ImagePullBackOff", "ErrImagePull", "InvalidImageName",
+    "CreateContainerConfigError", "CreateContainerError", "RunContainerError",
+}
+# Restart count above which a running pod is flagged as flapping
+RESTART_WARNING = 5
+# Node conditions that are problems when "True"
+NODE_PRESSURE = ["MemoryPressure", "DiskPressure", "PIDPressure", "NetworkUnavailable"]
+# Issues listed in the summary before the rest are only counted
+MAX_LISTED = 25
+
+
+def _issue(severity: str, kind: str, name: str, problem: str, detail: str = "") -> Dict[str, str]:
+    return {"severity": severity, "kind": kind, "name": name, "problem": problem, "detail": detail}
+
+
+def evaluate_pod(pod: dict) -> Optional[Dict[str, str]]:
+    """Return the most severe problem with a pod, or None if it is healthy"""
+    meta = pod.get("metadata", {})
+    name = f"{meta.get('namespace', '')}/{meta.get('name', '')}"
+    status = pod.get("status", {})
+    phase = status.get("phase", "Unknown")
+    ready, total = pod_ready(pod)
+    restarts = pod_restarts(pod)
+    detail = f"ready {ready}/{total}, restarts {restarts}"
+
+    if phase == "Succeeded":
+        return None
+
+    containers = status.get("initContainerStatuses", []) + status.get("containerStatuses", [])
+    for container in containers:
+        waiting = container.get("state", {}).get("waiting", {})
+        if waiting.get("reason") in CRITICAL_REASONS:
+            message = waiting.get("message", "")
+            container_detail = f"container {container.get('name')}, {detail}"
+            if message:
+                container_detail += f": {message[:120]}"
+            return _issue(CRITICAL, "pod", name, waiting["reason"], container_detail)
+        terminated = container.get("lastState", {}).get("terminated", {})
+        if terminated.get("reason") == "OOMKilled" and restarts:
+            return _issue(CRITICAL, "pod", name, "OOMKilled", f"container {container.get('name')}, {detail}")
+
+    if phase == "Failed":
+        return _issue(CRITICAL, "pod", name, status.get("reason") or "Failed", detail)
+    if phase in ("Pending", "Unknown"):
+        reason = pod_status(pod)
+        for condition in status.get("conditions", []):
+            if condition.get("type") == "PodScheduled" and condition.get("status") == "False":
+                reason = condition.get("reason", "Unschedulable")
+                detail = condition.get("message", detail)[:160]
+        return _issue(WARNING if phase == "Pending" else CRITICAL, "pod", name, reason, detail)
+    if meta.get("deletionTimestamp"):
+        return _issue(WARNING, "pod", name, "Terminating", detail)
+    if ready != total:
+        return _issue(WARNING, "pod", name, "NotReady", detail)
+    if restarts >= RESTART_WARNING:
+        return _issue(WARNING, "pod", name, "Restarting", detail)
+    return None
+
+
+def evaluate_node(node: dict) -> List[Dict[str, str]]:
+    """Problems with a node's Ready and pressure conditions"""
+    name = node.get("metadata", {}).get("name", "")
+    issues = []
+    conditions = {c.get("type"): c for c in node.get("status", {}).get("conditions", [])}
+    ready = conditions.get("Ready")
+    if ready is not None and ready.get("status") != "True":
+        issues.append(_issue(CRITICAL, "node", name, "NotReady", ready.get("message", "")[:160]))
+    for condition in NODE_PRESSURE:
+        if conditions.get(condition, {}).get("status") == "True":
+            issues.append(_issue(WARNING, "node", name, condition, conditions[condition].get("message", "")[:160]))
+    if node.get("spec", {}).get("unschedulable"):
+        issues.append(_issue(WARNING, "node", name, "Cordoned"))
+    return issues
+
+
+def evaluate(pods: List[dict], nodes: List[dict]) -> List[Dict[str, str]]:
+    """All issues, most severe first (nodes before pods at the same severity)"""
+    issues = []
+    for node in nodes:
+        issues.extend(evaluate_node(node))
+    for pod in pods:
+        issue = evaluate_pod(pod)
+        if issue:
+            issues.append(issue)
+    issues.sort(key=lambda i: (SEVERITY_RANK[i["severity"]], i["kind"] != "node", i["problem"], i["name"]))
+    return issues
+
+
+def summarize(pods: List[dict], nodes: List[dict]) -> str:
+    """Compact ranked health report"""
+    issues = evaluate(pods, nodes)
+    header = f"Cluster: {len(nodes)} nodes, {len(pods)} pods"
+    if not issues:
+        return f"{header}. All pods are healthy!"
+
+    counts: Dict[str, int] = {}
+    for issue in issues:
+        counts[issue["problem"]] = counts.get(issue["problem"], 0) + 1
+    breakdown = ", ".join(f"{problem} x{n}" for problem, n in sorted(counts.items(), key=lambda c: -c[1]))
+
+    lines = [f"{header}. {len(issues)} issues: {breakdown}"]
+    for issue in issues[:MAX_LISTED]:
+        line = f"{issue['severity']} {issue['kind']} {issue['name']}: {issue['problem']}"
+        if issue["detail"]:
+            line += f" ({issue['detail']})"
+        lines.append(line)
+    if len(issues) > MAX_LISTED:
+        lines.append(f"... and {len(issues) - MAX_LISTED} more")
+    return "\n".join(lines)
+
+
+def check_health(kubectl: Optional[str] = None, timeout: float = 60) -> str:
+    """Fetch pods and nodes in one kubectl call and summarize their health"""
+    kubectl = kubectl or os.environ.get("KUBECTL", "kubectl")
+    result = subprocess.run(
+        [kubectl, "get", "pods,nodes", "--all-namespaces", "-o", "json"],
+        capture_output=True, text=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "kubectl get pods,nodes failed")
+    items = json.loads(result.stdout).get("items", [])
+    pods = [i for i in items if i.get("kind") == "Pod"]
+    nodes = [i for i in items if i.get("kind") == "Node"]
+    return summarize(pods, nodes)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Model Router
+Picks a model size per request: simple tool selection goes to the fastest
+model, analysis and troubleshooting to the largest, everything else to the
+default. Cheap keyword rules decide first; ambiguous requests can optionally
+be scored by the fast model. Parse failures escalate to the next larger
+model. Every LLM turn is appended to a JSONL log so thresholds can be tuned.
+
+Usage: python3 model_router.py [--log FILE]   # summarize the routing log
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from system_context import CACHE_DIR
+
+DEFAULT_MODELS = ["qwen2.5-coder:1.5b", "qwen2.5-coder:3b", "qwen2.5-coder:7b"]
+LOG_FILE = "routing.jsonl"
+FAST, DEFAULT, STRONG = 0, 1, 2
+
+# Requests that need reasoning over output rather than picking a tool
+COMPLEX = re.compile(
+    r"\b(why|explain|analy[sz]e|diagnos\w*|troubleshoot\w*|debug\w*|root cause|compare|investigate|"
+    r"recommend\w*|optimi[sz]e|plan|script|refactor|summari[sz]e|what went wrong|figure out)\b",
+    re.IGNORECASE
+)
+# Single, well-known lookups that map directly to one tool call
+SIMPLE = re.compile(
+    r"\b(disk|memory|ram|cpu|uptime|hostname|os version|pods?|deployments?|services?|namespaces?|"
+    r"status|logs?|list|show|restart|reload|dns|wifi|keybindings?|config|ip address|date|time)\b",
+    re.IGNORECASE
+)
+# Longer requests are usually multi-part or need context
+LONG_REQUEST_WORDS = 25
+SIMPLE_REQUEST_WORDS = 8
+
+SCORE_PROMPT = """Rate how hard this request to a Linux system assistant is.
+1 = a single lookup or command, 2 = a few steps, 3 = needs analysis or reasoning.
+Reply with just the number.
+
+Request: {request}"""
+
+
+class ModelRouter:
+    def __init__(self, models: Optional[List[str]] = None, llm=None, score: bool = False,
+                 log_path: Optional[str] = os.path.join(CACHE_DIR, LOG_FILE)):
+        self.models = list(models or DEFAULT_MODELS)
+        if len(self.models) != 3:
+            raise ValueError("expected three models: fast, default, strong")
+        self.llm = llm
+        self.score = score and llm is not None
+        self.log_path = log_path
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, request: str) -> Tuple[int, str]:
+        """(tier, reason) from keyword rules alone"""
+        words = len(request.split())
+        if COMPLEX.search(request):
+            return STRONG, f"complex keyword '{COMPLEX.search(request).group(0).lower()}'"
+        if words > LONG_REQUEST_WORDS:
+            return STRONG, f"long request ({words} words)"
+        if words <= SIMPLE_REQUEST_WORDS and SIMPLE.search(request) and request.count(" and ") == 0:
+            return FAST, f"simple lookup '{SIMPLE.search(request).group(0).lower()}'"
+        return DEFAULT, "no rule matched"
+
+    def _score(self, request: str) -> Optional[int]:
+        """Ask the fast model for a 1-3 difficulty score"""
+        try:
+            result = self.llm.generate(self.models[FAST], SCORE_PROMPT.format(request=request),
+                                       options={"num_predict": 2, "temperature": 0})
+        except Exception:
+            return None
+        match = re.search(r"[123]", result.get("response", ""))
+        return int(match.group()) - 1 if match else None
+
+    def route(self, request: str) -> Tuple[str, str]:
+        """(model, reason) for a new request"""
+        tier, reason = self.classify(request)
+        if tier == DEFAULT and self.score:
+            scored = self._score(request)
+            if scored is not None:
+                tier, reason = scored, f"scored {scored + 1}/3 by {self.models[FAST]}"
+        return self.models[tier], reason
+
+    def escalate(self, model: str) -> Optional[str]:
+        """Next larger model, or None if already at the largest"""
+        tier = self.models.index(model) if model in self.models else DEFAULT
+        return self.models[tier + 1] if tier + 1 < len(self.models) else None
+
+    def at_least_default(self, model: str) -> str:
+        """Model for free-form answer turns (never the fast tier)"""
+        if model in self.models and self.models.index(model) < DEFAULT:
+            return self.models[DEFAULT]
+        return model
+
+    def record(self, request: str, model: str, reason: str, phase: str, latency: float, ok: bool):
+        """Log one LLM turn"""
+        with self._lock:
+            stats = self.stats.setdefault(model, {"turns": 0, "failures": 0, "seconds": 0.0})
+            stats["turns"] += 1
+            stats["failures"] += 0 if ok else 1
+            stats["seconds"] += latency
+            if not self.log_path:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps({"ts": round(time.time(), 3), "request": request[:200], "model": model,
+                                        "reason": reason, "phase": phase, "latency": round(latency, 3),
+                                        "ok": ok}) + "\n")
+            except OSError:
+                pass
+
+
+def summarize(entries: List[Dict[str, Any]]) -> str:
+    """Per-model turn counts, failure rates and latencies from routing log entries"""
+    by_model: Dict[str, List[dict]] = {}
+    for entry in entries:
+        by_model.setdefault(entry["model"], []).append(entry)
+    lines = [f"{'model':<24} {'turns':>6} {'fail%':>6} {'p50 s':>7} {'p95 s':>7}  escalations"]
+    for model, turns in sorted(by_model.items()):
+        latencies = sorted(t["latency"] for t in turns)
+        failures = sum(1 for t in turns if not t["ok"])
+        escalations = sum(1 for t in turns if t["phase"] == "escalated")
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        lines.append(f"{model:<24} {len(turns):>6} {100 * failures / len(turns):>5.1f}% {p50:>7.2f} {p95:>7.2f}  {escalations}")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize the model routing log")
+    parser.add_argument("--log", default=os.path.join(CACHE_DIR, LOG_FILE))
+    args = parser.parse_args()
+    try:
+        with open(args.log) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"No routing log at {args.log}")
+        return
+    print(summarize(entries) if entries else "Routing log is empty")
+
+
+if __name__ == "__main__":
+    main()
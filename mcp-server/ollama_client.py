@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Ollama HTTP Client
+Persistent, connection-pooled client for the Ollama REST API
+"""
+
+import http.client
+import json
+import os
+import threading
+from typing import Optional, Dict, Any, List, Iterator
+from urllib.parse import urlsplit
+
+DEFAULT_HOST = "http://127.0.0.1:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+
+
+class OllamaError(Exception):
+    """Raised when the Ollama API returns an error or cannot be reached"""
+
+
+class OllamaClient:
+    """Talks to /api/generate and /api/chat over pooled keep-alive connections"""
+
+    def __init__(self, host: Optional[str] = None, keep_alive: str = DEFAULT_KEEP_ALIVE,
+                 timeout: float = 120, pool_size: int = 4):
+        host = host or os.environ.get("OLLAMA_HOST") or DEFAULT_HOST
+        if "://" not in host:
+            host = "http://" + host
+        parts = urlsplit(host)
+        self.scheme = parts.scheme
+        self.hostname = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if self.scheme == "https" else 11434)
+        self.keep_alive = self._parse_keep_alive(keep_alive)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pool: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_keep_alive(value):
+        """Ollama wants bare numbers (seconds, -1 = forever) as ints, not strings"""
+        if isinstance(value, str):
+            try:
+                return int(value)
+            except ValueError:
+                return value
+        return value
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.hostname, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.hostname, self.port, timeout=self.timeout)
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._pool:
+                return self._pool.pop()
+        return self._new_connection()
+
+    def _release(self, conn: http.client.HTTPConnection):
+        with self._lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
+            conn.close()
+
+    def _send(self, path: str, payload: Dict[str, Any]):
+        """POST payload and return (connection, response) with headers read"""
+        body = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+        # A pooled connection may have been closed by the server while idle,
+        # so retry once on a fresh connection before giving up.
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.HTTPException, ConnectionError, OSError) as e:
+                conn.close()
+                if attempt == 0:
+                    continue
+                raise OllamaError(f"Cannot reach Ollama at {self.hostname}:{self.port}: {e}")
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        conn, response = self._send(path, payload)
+        try:
+            data = response.read()
+        except (http.client.HTTPException, ConnectionError, OSError) as e:
+            conn.close()
+            raise OllamaError(f"Connection to Ollama lost: {e}")
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        try:
+            result = json.loads(data)
+        except json.JSONDecodeError:
+            raise OllamaError(f"Invalid response from Ollama ({response.status})")
+        if response.status != 200 or "error" in result:
+            raise OllamaError(result.get("error", f"HTTP {response.status}"))
+        return result
+
+    def _stream(self, path: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """POST payload and yield each NDJSON chunk as it arrives.
+
+        Closing the generator early drops the connection, which makes Ollama
+        abort the rest of the generation.
+        """
+        conn, response = self._send(path, payload)
+        if response.status != 200:
+            data = response.read()
+            conn.close()
+            try:
+                error = json.loads(data).get("error")
+            except json.JSONDecodeError:
+                error = None
+            raise OllamaError(error or f"HTTP {response.status}")
+
+        finished = False
+        try:
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise OllamaError(chunk["error"])
+                yield chunk
+                if chunk.get("done"):
+                    # Drain the terminating chunk so the connection can be reused
+                    response.read()
+                    finished = True
+                    break
+        except (http.client.HTTPException, ConnectionError, OSError) as e:
+            raise OllamaError(f"Connection to Ollama lost: {e}")
+        finally:
+            if finished and not response.will_close:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def generate(self, model: str, prompt: str, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None, **extra) -> Dict[str, Any]:
+        """Run a single completion via /api/generate"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        return self._post("/api/generate", payload)
+
+    def generate_stream(self, model: str, prompt: str, system: Optional[str] = None,
+                        options: Optional[Dict[str, Any]] = None, **extra) -> Iterator[Dict[str, Any]]:
+        """Stream a completion via /api/generate, yielding chunks as they arrive"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        return self._stream("/api/generate", payload)
+
+    def chat(self, model: str, messages: List[Dict[str, str]],
+             options: Optional[Dict[str, Any]] = None, **extra) -> Dict[str, Any]:
+        """Run a chat completion via /api/chat"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        return self._post("/api/chat", payload)
+
+    def chat_stream(self, model: str, messages: List[Dict[str, str]],
+                    options: Optional[Dict[str, Any]] = None, **extra) -> Iterator[Dict[str, Any]]:
+        """Stream a chat completion via /api/chat, yielding chunks as they arrive"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        if options:
+            payload["options"] = options
+        payload.update(extra)
+        return self._stream("/api/chat", payload)
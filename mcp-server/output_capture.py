@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Bounded Command Output Capture
+Reads subprocess pipes in chunks and keeps only the head and tail of very
+large outputs, so noisy commands (journalctl, kubectl logs) keep memory flat.
+"""
+
+import os
+import selectors
+import subprocess
+import time
+from typing import Callable, Dict, Any, Optional
+
+CHUNK_SIZE = 64 * 1024
+# Bytes retained per stream: first half of the cap from the start, second half from the end
+MAX_OUTPUT_BYTES = 256 * 1024
+
+
+class HeadTailBuffer:
+    """Byte buffer that keeps the first and last bytes written once over the cap"""
+
+    def __init__(self, limit: int = MAX_OUTPUT_BYTES):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes):
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            excess = len(self.tail) - self.tail_limit
+            if excess > 0:
+                del self.tail[:excess]
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def getvalue(self) -> str:
+        if not self.dropped:
+            return (self.head + self.tail).decode(errors="replace")
+        return (self.head.decode(errors="replace")
+                + f"\n... [{self.dropped} bytes omitted] ...\n"
+                + self.tail.decode(errors="replace"))
+
+
+def build_result(buffers: Dict[str, HeadTailBuffer], returncode: Optional[int],
+                 error: Optional[str] = None) -> Dict[str, Any]:
+    """Assemble the execute_command result dict from the captured streams"""
+    result = {
+        "stdout": buffers["stdout"].getvalue(),
+        "stderr": buffers["stderr"].getvalue(),
+        "returncode": returncode,
+    }
+    dropped = buffers["stdout"].dropped + buffers["stderr"].dropped
+    if dropped:
+        result["truncated"] = f"{dropped} bytes of output omitted (kept first and last {MAX_OUTPUT_BYTES // 2} bytes per stream)"
+    if error:
+        result["error"] = error
+    return result
+
+
+def run_streaming(cmd, shell: bool = False, cwd: Optional[str] = None, timeout: float = 30,
+                  on_output: Optional[Callable[[str, bytes], None]] = None,
+                  limit: int = MAX_OUTPUT_BYTES) -> Dict[str, Any]:
+    """Run a command, handing each chunk to on_output as it arrives.
+
+    On timeout the process is killed and the partial output is returned with
+    an "error" entry instead of raising.
+    """
+    proc = subprocess.Popen(cmd, shell=shell, cwd=cwd, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    buffers = {"stdout": HeadTailBuffer(limit), "stderr": HeadTailBuffer(limit)}
+    deadline = time.monotonic() + timeout
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                proc.kill()
+                proc.wait()
+                proc.stdout.close()
+                proc.stderr.close()
+                return build_result(buffers, proc.returncode,
+                                    f"Command timed out after {timeout} seconds")
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, CHUNK_SIZE)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+                buffers[key.data].write(chunk)
+                if on_output:
+                    on_output(key.data, chunk)
+
+    try:
+        returncode = proc.wait(timeout=max(deadline - time.monotonic(), 0.01))
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        return build_result(buffers, proc.returncode, f"Command timed out after {timeout} seconds")
+    return build_result(buffers, returncode)
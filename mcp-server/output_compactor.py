@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Output Compactor
+Shrinks tool output before it is stored in conversation memory or fed back
+to the LLM; the user still sees the full output. Understands the column
+tables printed by kubectl get (including `get all` sections), systemctl
+list-units and docker ps, keeping headers and anomalous rows while
+collapsing healthy rows into counts, and dedupes repeated journalctl/log
+lines. Dedupe only applies to known log output (systemd/kubectl/docker logs,
+journalctl) or lines that look like log records; anything else, such as
+config files and code, passes through unchanged.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Outputs with fewer lines than this are left alone
+MIN_LINES = 15
+# Healthy rows kept verbatim per table before the rest are collapsed
+KEEP_ROWS = 10
+# Log lines kept after deduplication (important lines first, then the newest)
+MAX_LOG_LINES = 60
+# A pod restarting at least this often is reported even when Running
+RESTART_THRESHOLD = 5
+
+HEALTHY_STATUS = {"Running", "Completed", "Succeeded", "Ready", "Active", "Bound", "Available"}
+IMPORTANT_LOG = re.compile(
+    r"error|fail|fatal|panic|warn|denied|refused|timeout|timed out|oom|killed|exception|critical|segfault",
+    re.IGNORECASE
+)
+# Leading "Oct 16 10:00:01 host unit[123]: " or ISO timestamps
+LOG_PREFIX = re.compile(
+    r"^(?:\w{3} [ \d]\d \d\d:\d\d:\d\d|\d{4}-\d\d-\d\d[T ][\d:.]+(?:Z|[+-]\d\d:?\d\d)?)\s+(?:\S+\s+\S+?(?:\[\d+\])?:\s*)?"
+)
+# "INFO ...", "[error] ...", "level=warn ...", klog's "E1016 10:00:01.123 ..."
+LOG_LEVEL = re.compile(
+    r"^\s*(?:\[?(?:trace|debug|info|notice|warn(?:ing)?|err(?:or)?|fatal|crit(?:ical)?)\]?[:\s]|level=\w+|"
+    r"[IWEF]\d{4} \d\d:\d\d:\d\d)",
+    re.IGNORECASE
+)
+# Commands whose output is a log, whatever its lines look like
+LOG_COMMANDS = re.compile(r"\b(?:journalctl|(?:kubectl|docker|podman)\s+(?:\S+\s+)*?logs)\b")
+NUMBERS = re.compile(r"0x[0-9a-f]+|\d+", re.IGNORECASE)
+SYSTEMD_LEGEND = re.compile(r"^(LOAD|ACTIVE|SUB)\s+=")
+# Column names that contain a space in kubectl/docker headers
+TWO_WORD_COLUMNS = {"CONTAINER ID", "NOMINATED NODE", "READINESS GATES"}
+
+
+def _columns(header: str) -> Optional[List[tuple]]:
+    """(name, start) for each column of an aligned table header, or None"""
+    stripped = header.strip()
+    if not stripped or stripped != stripped.upper() or not re.search(r"[A-Z]", stripped):
+        return None
+    cols = []
+    for match in re.finditer(r"\S+", header):
+        if cols and f"{cols[-1][0]} {match.group()}" in TWO_WORD_COLUMNS:
+            cols[-1] = (f"{cols[-1][0]} {match.group()}", cols[-1][1])
+        else:
+            cols.append((match.group(), match.start()))
+    if len(cols) < 2 or cols[0][0] not in ("NAME", "UNIT", "CONTAINER ID", "NAMESPACE"):
+        return None
+    return cols
+
+
+def _cells(row: str, cols: List[tuple]) -> Dict[str, str]:
+    # Values never contain double spaces, so splitting on them is exact when
+    # every column is filled; otherwise fall back to the header positions
+    values = re.split(r"\s{2,}", row.strip())
+    if len(values) == len(cols):
+        return {name: value for (name, _), value in zip(cols, values)}
+    cells = {}
+    for i, (name, start) in enumerate(cols):
+        end = cols[i + 1][1] if i + 1 < len(cols) else None
+        cells[name] = row[start:end].strip()
+    return cells
+
+
+def _ratio_mismatch(value: str) -> bool:
+    if "/" not in value:
+        return False
+    ready, _, total = value.partition("/")
+    return ready.strip() != total.strip()
+
+
+def _restarts(value: str) -> int:
+    match = re.match(r"\d+", value)
+    return int(match.group()) if match else 0
+
+
+def _row_state(cells: Dict[str, str]) -> Optional[str]:
+    """Healthy state label for a table row, or None if the row is anomalous"""
+    if "LOAD" in cells and "ACTIVE" in cells:
+        # systemctl list-units
+        if cells["LOAD"] != "loaded" or cells["ACTIVE"] == "failed" or cells.get("UNIT", "").startswith("●"):
+            return None
+        return f"{cells['ACTIVE']}/{cells.get('SUB', '')}"
+    if "CONTAINER ID" in cells:
+        # docker ps -a
+        status = cells.get("STATUS", "")
+        if status.startswith("Up") and "unhealthy" not in status and "Restarting" not in status:
+            return "Up"
+        if status.startswith("Exited (0)"):
+            return "Exited (0)"
+        return None
+    if "DESIRED" in cells and "READY" in cells and cells["DESIRED"] != cells["READY"]:
+        return None
+    for column in ("READY", "COMPLETIONS"):
+        if _ratio_mismatch(cells.get(column, "")):
+            return None
+    if _restarts(cells.get("RESTARTS", "")) >= RESTART_THRESHOLD:
+        return None
+    if cells.get("EXTERNAL-IP") == "<pending>":
+        return None
+    status = cells.get("STATUS")
+    if status is not None:
+        if status.split(",")[0] not in HEALTHY_STATUS:
+            return None
+        return status
+    return "ok"
+
+
+def _squeeze(line: str) -> str:
+    """Collapse alignment padding; the model doesn't need columns lined up"""
+    return re.sub(r" {3,}", "  ", line.rstrip())
+
+
+def compact_table(lines: List[str], cols: List[tuple]) -> List[str]:
+    """Header, anomalous rows and the first KEEP_ROWS healthy rows; the rest as counts"""
+    rows = [line for line in lines[1:] if line.strip()]
+    if len(rows) <= KEEP_ROWS:
+        return [_squeeze(line) for line in lines]
+    out = [_squeeze(lines[0])]
+    anomalous = kept = 0
+    collapsed: Dict[str, int] = {}
+    for row in rows:
+        state = _row_state(_cells(row, cols))
+        if state is None:
+            out.append(_squeeze(row))
+            anomalous += 1
+        elif kept < KEEP_ROWS:
+            out.append(_squeeze(row))
+            kept += 1
+        else:
+            collapsed[state] = collapsed.get(state, 0) + 1
+    if collapsed:
+        counts = ", ".join(f"{state} x{n}" for state, n in sorted(collapsed.items(), key=lambda c: -c[1]))
+        out.append(f"[... {sum(collapsed.values())} more healthy rows omitted: {counts}]")
+    out.append(f"[{len(rows)} rows, {anomalous} need attention]")
+    return out
+
+
+def is_log_call(tool: str, args: Dict) -> bool:
+    """Whether a tool call returns log output"""
+    if tool in ("systemd", "kubernetes"):
+        return args.get("action") == "logs"
+    if tool == "execute_command":
+        return bool(LOG_COMMANDS.search(args.get("command") or ""))
+    return False
+
+
+def looks_like_log(lines: List[str]) -> bool:
+    """Most lines start with a timestamp or a log level"""
+    records = sum(1 for line in lines if LOG_PREFIX.match(line) or LOG_LEVEL.match(line))
+    return records * 2 >= len(lines)
+
+
+def compact_log(lines: List[str]) -> List[str]:
+    """Dedupe repeated lines (ignoring timestamps and numbers), then keep important and recent ones"""
+    first: Dict[str, int] = {}
+    counts: Dict[str, int] = {}
+    unique: List[str] = []
+    for line in lines:
+        if not line.strip():
+            continue
+        key = NUMBERS.sub("#", LOG_PREFIX.sub("", line)).strip()
+        if key in counts:
+            counts[key] += 1
+            continue
+        counts[key] = 1
+        first[key] = len(unique)
+        unique.append(line.rstrip())
+    for key, count in counts.items():
+        if count > 1:
+            unique[first[key]] += f" [x{count}]"
+
+    if len(unique) <= MAX_LOG_LINES:
+        out = unique
+    else:
+        important = [i for i, line in enumerate(unique) if IMPORTANT_LOG.search(line)]
+        budget = max(MAX_LOG_LINES - len(important), MAX_LOG_LINES // 3)
+        keep = set(important[-(MAX_LOG_LINES - budget):]) | set(range(len(unique) - budget, len(unique)))
+        out = [line for i, line in enumerate(unique) if i in keep]
+        out.insert(0, f"[{len(unique) - len(out)} routine lines omitted; showing errors/warnings and the newest lines]")
+    if len(lines) != len(unique):
+        out.append(f"[{len(lines)} lines, {len(unique)} distinct]")
+    return out
+
+
+def compact(text: str, logs: bool = False) -> str:
+    """Compact digest of a tool output (unchanged when short or unrecognised).
+
+    logs=True marks the text as log output, deduping it even when its lines
+    carry no timestamp or level.
+    """
+    if not isinstance(text, str) or text.count("\n") < MIN_LINES:
+        return text
+
+    # `kubectl get all` prints one table per resource kind, separated by blank lines
+    blocks: List[List[str]] = [[]]
+    for line in text.split("\n"):
+        if line.strip():
+            blocks[-1].append(line)
+        elif blocks[-1]:
+            blocks.append([])
+
+    out: List[str] = []
+    saw_table = False
+    for block in blocks:
+        if not block:
+            continue
+        cols = _columns(block[0])
+        if cols:
+            saw_table = True
+            out.extend(compact_table(block, cols))
+        elif saw_table and all(SYSTEMD_LEGEND.match(line) or line.startswith(" ") for line in block):
+            # systemctl's column legend
+            continue
+        elif saw_table and len(block) <= 3:
+            out.extend(block)
+        elif logs or looks_like_log(block):
+            out.extend(compact_log(block))
+        else:
+            out.extend(block)
+        out.append("")
+    result = "\n".join(out).rstrip()
+    return result if len(result) < len(text) else text
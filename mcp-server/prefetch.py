@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Speculative Prefetch
+While the LLM is still choosing a tool, cheap keyword rules guess the
+read-only calls it is likely to pick ("pods" -> kubernetes pods, "disk" ->
+system_status disk) and start them in the background. If the model then
+chooses the same call, its result is already there (or on its way);
+otherwise the prefetched result is discarded. Hit rates are counted so the
+rules can be tuned.
+"""
+
+import contextvars
+import re
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Optional
+
+from tool_registry import REGISTRY
+from tool_result_cache import cache_key
+
+# Most calls started per request, and the cost budget they share: the LLM is
+# competing for the same CPU, so at most one of them may be expensive
+MAX_PREFETCH = 2
+PREFETCH_BUDGET = 3
+COST_WEIGHT = {"low": 1, "medium": 1, "high": 2}
+
+# (pattern, tool, arguments), most specific first
+RULES = [
+    (r"\b(crash\w*|unhealthy|failing pods?|cluster health|pods? (issues|problems|errors))\b",
+     "kubernetes", {"action": "check-health"}),
+    (r"\bpods?\b", "kubernetes", {"action": "pods"}),
+    (r"\bdeployments?\b", "kubernetes", {"action": "deployments"}),
+    (r"(?<!all )\bnamespaces\b", "kubernetes", {"action": "namespaces"}),
+    (r"\b(disk|storage|free space)\b", "system_status", {"component": "disk"}),
+    (r"\b(memory|ram|swap)\b", "system_status", {"component": "memory"}),
+    (r"\b(cpu|load average)\b", "system_status", {"component": "cpu"}),
+    (r"\b(docker|containers?)\b", "system_status", {"component": "docker"}),
+    (r"\bwi-?fi\b", "network", {"action": "wifi-list"}),
+    (r"\b(dns|network connections?)\b", "network", {"action": "connections"}),
+    (r"\b(network status|interfaces?)\b", "network", {"action": "status"}),
+    (r"\bkey ?bindings?\b", "sway", {"action": "list-keybindings"}),
+    (r"\bsway config\w*\b", "sway", {"action": "show-config"}),
+    (r"\bwaybar config\w*\b", "waybar", {"action": "show-config"}),
+    (r"\b(failed|all) (services|units)\b", "systemd", {"action": "list"}),
+]
+# "pods in grafana", "grafana namespace", "-n grafana", "all namespaces"
+NAMESPACE = re.compile(r"(?:\bin (?:the )?|-n |\bnamespace )([a-z0-9][a-z0-9-]*)\b|\b([a-z0-9][a-z0-9-]*) namespace\b")
+NOT_NAMESPACES = {"the", "my", "this", "that", "a", "cluster", "kubernetes", "k8s", "each", "every"}
+_COMPILED = [(re.compile(pattern, re.IGNORECASE), tool, args) for pattern, tool, args in RULES]
+
+
+def _namespace(request: str) -> Optional[str]:
+    if re.search(r"\ball namespaces\b", request, re.IGNORECASE):
+        return "all"
+    for match in NAMESPACE.finditer(request.lower()):
+        name = match.group(1) or match.group(2)
+        if name not in NOT_NAMESPACES:
+            return name
+    return None
+
+
+def guess_calls(request: str, budget: int = PREFETCH_BUDGET) -> List[Dict[str, Any]]:
+    """Read-only tool calls the request most likely needs, per the keyword rules, within the cost budget"""
+    calls = []
+    spent = 0
+    for pattern, tool, args in _COMPILED:
+        if not pattern.search(request):
+            continue
+        args = dict(args)
+        if tool == "kubernetes" and args["action"] != "namespaces":
+            namespace = _namespace(request)
+            if namespace:
+                args["namespace"] = namespace
+        spec = REGISTRY.get(tool)
+        if spec is None or not spec.is_read_only(args):
+            continue
+        if any(c["tool"] == tool and c["arguments"] == args for c in calls):
+            continue
+        weight = COST_WEIGHT.get(spec.cost, 1)
+        if spent + weight > budget:
+            continue
+        calls.append({"tool": tool, "arguments": args})
+        spent += weight
+        if spent >= budget or len(calls) >= MAX_PREFETCH:
+            break
+    return calls
+
+
+class Prefetcher:
+    """Runs guessed calls on daemon threads and hands matching results over.
+
+    run(tool, args) executes a call. Unused prefetches are discarded when the
+    next request starts, so a one-shot process never waits for them at exit,
+    and after any call that changes the system, since they may predate it.
+    """
+
+    def __init__(self, run: Callable[[str, Dict[str, Any]], Dict[str, Any]]):
+        self.run = run
+        self.started = 0
+        self.hits = 0
+        self.wasted = 0
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def discard(self):
+        """Drop every pending or finished prefetch; take() misses until the next start()"""
+        with self._lock:
+            self.wasted += len(self._pending)
+            self._pending = {}
+
+    def start(self, calls: List[Dict[str, Any]]):
+        """Discard leftovers of the previous request and start prefetching calls"""
+        self.discard()
+        with self._lock:
+            for call in calls:
+                future: Future = Future()
+                self._pending[cache_key(call["tool"], call["arguments"])] = future
+                # Run in the caller's context, so per-request output routing still applies
+                threading.Thread(target=contextvars.copy_context().run, args=(self._run, future, call),
+                                 daemon=True).start()
+                self.started += 1
+
+    def _run(self, future: Future, call: Dict[str, Any]):
+        try:
+            future.set_result(self.run(call["tool"], call["arguments"]))
+        except Exception as e:
+            future.set_exception(e)
+
+    def take(self, tool: str, args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The prefetched result of this call (waiting for it if still running), or None"""
+        with self._lock:
+            future = self._pending.pop(cache_key(tool, args), None)
+        if future is None:
+            return None
+        try:
+            result = future.result()
+        except Exception:
+            # Run it again in the foreground so the user sees the real error
+            self.wasted += 1
+            return None
+        self.hits += 1
+        return result
+
+    def summary(self) -> str:
+        wasted = self.wasted + len(self._pending)
+        if not self.started:
+            return "prefetch: nothing started"
+        return (f"prefetch: {self.started} started, {self.hits} used ({100 * self.hits / self.started:.0f}%), "
+                f"{wasted} discarded")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Persistent request -> tool call cache so repeated questions ("check disk
+space", "any pods failing?") skip the LLM entirely. Keyed on normalized
+prompt text with an optional word-overlap index for near-duplicates, bounded
+by LRU size and TTL, and invalidated when the model or tool catalogue changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from system_context import CACHE_DIR
+
+CACHE_FILE = "response-cache.json"
+MAX_ENTRIES = 500
+TTL = 24 * 60 * 60
+# Minimum Jaccard word overlap for a fuzzy (near-duplicate) hit
+SIMILARITY_THRESHOLD = 0.85
+
+# Requests that refer back to earlier output depend on conversation history
+REFERENTIAL_WORDS = {"that", "it", "this", "those", "these", "them", "previous", "above", "last", "again"}
+STOP_WORDS = {"the", "a", "an", "my", "me", "please", "for", "of", "to", "is", "are", "any", "can", "you"}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s./:-]", " ", text.lower()).split())
+
+
+def _words(key: str) -> frozenset:
+    return frozenset(word for word in key.split() if word not in STOP_WORDS)
+
+
+class ResponseCache:
+    """LRU + TTL cache of tool calls, persisted as JSON"""
+
+    def __init__(self, fingerprint: str, cache_dir: str = CACHE_DIR, max_entries: int = MAX_ENTRIES,
+                 ttl: float = TTL, fuzzy: bool = False):
+        self.path = os.path.join(cache_dir, CACHE_FILE)
+        self.fingerprint = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fuzzy = fuzzy
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        # Different model or tool catalogue: every cached call may be wrong now
+        if data.get("fingerprint") != self.fingerprint:
+            return {}
+        return data.get("entries", {})
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"fingerprint": self.fingerprint, "entries": self.entries}, f)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def cacheable(request: str) -> bool:
+        """Whether a request stands on its own (no references to earlier turns)"""
+        return not REFERENTIAL_WORDS.intersection(normalize(request).split())
+
+    def _find(self, key: str) -> Optional[str]:
+        if key in self.entries:
+            return key
+        if not self.fuzzy:
+            return None
+        words = _words(key)
+        best, best_score = None, SIMILARITY_THRESHOLD
+        for candidate in self.entries:
+            other = _words(candidate)
+            union = len(words | other)
+            score = len(words & other) / union if union else 0.0
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def lookup(self, request: str) -> Optional[Dict[str, Any]]:
+        """Cached tool call for this request, or None"""
+        if not self.cacheable(request):
+            return None
+        with self._lock:
+            key = self._find(normalize(request))
+            entry = self.entries.get(key) if key else None
+            if entry is None or time.time() - entry["ts"] > self.ttl:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            # Move to the end: dict order is the LRU order
+            self.entries[key] = self.entries.pop(key)
+            entry["hits"] = entry.get("hits", 0) + 1
+            self.hits += 1
+            self._save()
+            return entry["tool_call"]
+
+    def store(self, request: str, tool_call: Dict[str, Any]):
+        """Remember the tool call the LLM chose for this request"""
+        if not self.cacheable(request):
+            return
+        key = normalize(request)
+        with self._lock:
+            self.entries.pop(key, None)
+            self.entries[key] = {"tool_call": tool_call, "ts": time.time(), "hits": 0}
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            self._save()
@@ -6,237 +6,274 @@ Provides tools for command execution, file operations, and network management
 
 import asyncio
 import json
-import subprocess
 import os
+import time
 from typing import Any, Dict
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+from system_collectors import collect
+from output_capture import CHUNK_SIZE, HeadTailBuffer, build_result
+from file_reader import read_file
+from tool_registry import REGISTRY, ToolSpec
+from tracing import TraceLog
+
 # Create server instance
 app = Server("system-ops-mcp")
 
 # Track command history
 command_history = []
 
+# Maximum number of tool calls doing subprocess/file work at the same time
+MAX_CONCURRENCY = int(os.environ.get("MCP_MAX_CONCURRENCY", "8"))
+_semaphore = None
+
+# One JSONL record per tool call when set (summarize with `python3 tracing.py --log FILE`)
+TRACE_LOG = TraceLog(os.environ.get("MCP_TRACE_FILE"))
+
+
+def _limit() -> asyncio.Semaphore:
+    """Concurrency limiter, created lazily inside the running event loop"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def run_command(cmd, shell: bool = False, cwd: str = None, timeout: float = 30) -> Dict[str, Any]:
+    """Run a subprocess without blocking the event loop"""
+    async with _limit():
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                cmd, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise TimeoutError(f"Command timed out after {timeout} seconds")
+        return {
+            "stdout": stdout.decode(errors="replace"),
+            "stderr": stderr.decode(errors="replace"),
+            "returncode": proc.returncode,
+        }
+
+
+async def run_command_streaming(command: str, cwd: str = None, timeout: float = 30,
+                                on_progress=None) -> Dict[str, Any]:
+    """Run a shell command, reading its pipes in chunks into bounded head/tail buffers"""
+    async with _limit():
+        proc = await asyncio.create_subprocess_shell(
+            command, cwd=cwd, stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        buffers = {"stdout": HeadTailBuffer(), "stderr": HeadTailBuffer()}
+        
+        async def pump(stream, name):
+            while True:
+                chunk = await stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                buffers[name].write(chunk)
+                if on_progress:
+                    await on_progress(buffers["stdout"].total + buffers["stderr"].total)
+        
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(pump(proc.stdout, "stdout"), pump(proc.stderr, "stderr"), proc.wait()),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return build_result(buffers, proc.returncode, f"Command timed out after {timeout} seconds")
+        return build_result(buffers, proc.returncode)
+
+
+def _progress_reporter(interval: float = 0.25):
+    """Send MCP progress notifications (bytes of output so far) if the client asked for them"""
+    try:
+        ctx = app.request_context
+        token = ctx.meta.progressToken if ctx.meta else None
+    except (LookupError, AttributeError):
+        return None
+    if token is None:
+        return None
+    
+    last_sent = 0.0
+    
+    async def report(total_bytes: int):
+        nonlocal last_sent
+        now = asyncio.get_running_loop().time()
+        if now - last_sent < interval:
+            return
+        last_sent = now
+        try:
+            await ctx.session.send_progress_notification(token, total_bytes)
+        except Exception:
+            pass
+    
+    return report
+
+
+async def run_in_thread(fn, *args):
+    """Run blocking file I/O or /proc collection off the event loop"""
+    async with _limit():
+        return await asyncio.to_thread(fn, *args)
+
+
+def _write_text(path: str, content: str):
+    # Create directory if needed
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+async def _execute_command(arguments: Dict[str, Any], spec: ToolSpec) -> list[TextContent]:
+    command = arguments["command"]
+    working_dir = arguments.get("working_dir", os.getcwd())
+    
+    # Log command
+    command_history.append(command)
+    
+    output = await run_command_streaming(
+        command, cwd=working_dir, timeout=spec.timeout, on_progress=_progress_reporter()
+    )
+    output["command"] = command
+    
+    return [TextContent(
+        type="text",
+        text=json.dumps(output, indent=2)
+    )]
+
+
+async def _read_file(arguments: Dict[str, Any], spec: ToolSpec) -> list[TextContent]:
+    path = arguments["path"]
+    result = await run_in_thread(
+        lambda: read_file(
+            path,
+            offset=arguments.get("offset"),
+            length=arguments.get("length"),
+            start_line=arguments.get("start_line"),
+            end_line=arguments.get("end_line"),
+            tail=arguments.get("tail")
+        )
+    )
+    if set(result) == {"size", "content"}:
+        # Whole small file: plain content as before
+        return [TextContent(type="text", text=result["content"])]
+    return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+
+async def _write_file(arguments: Dict[str, Any], spec: ToolSpec) -> list[TextContent]:
+    path = arguments["path"]
+    content = arguments["content"]
+    
+    await run_in_thread(_write_text, path, content)
+    
+    return [TextContent(
+        type="text",
+        text=f"Successfully wrote to {path}"
+    )]
+
+
+async def _network_info(arguments: Dict[str, Any], spec: ToolSpec) -> list[TextContent]:
+    result = await run_command(["nmcli", "device", "status"], timeout=spec.timeout)
+    return [TextContent(type="text", text=result["stdout"])]
+
+
+async def _system_status(arguments: Dict[str, Any], spec: ToolSpec) -> list[TextContent]:
+    component = arguments["component"]
+    
+    async def collector(name):
+        data = await run_in_thread(collect, name)
+        return json.dumps(data, separators=(",", ":"))
+    
+    async def probe(cmd):
+        return (await run_command(cmd, timeout=spec.timeout))["stdout"]
+    
+    # Native /proc and /sys collectors (returned as compact JSON) and
+    # docker/kubectl probes all run concurrently
+    probes = {}
+    for name in ["cpu", "memory", "disk", "network"]:
+        if component in [name, "all"]:
+            probes[name.capitalize()] = collector(name)
+    if component in ["docker", "all"]:
+        probes["Docker"] = probe(["docker", "ps"])
+    if component in ["kubernetes", "all"]:
+        probes["Kubernetes"] = probe(["kubectl", "get", "pods"])
+    
+    results = await asyncio.gather(*probes.values(), return_exceptions=True)
+    outputs = []
+    for label, result in zip(probes, results):
+        if isinstance(result, Exception):
+            result = f"Error: {result}"
+        outputs.append(f"{label}:\n{result}")
+    
+    return [TextContent(type="text", text="\n\n".join(outputs))]
+
+
+# Tools with a native async implementation; the rest run their registry
+# handler in a worker thread
+SERVER_HANDLERS = {
+    "execute_command": _execute_command,
+    "read_file": _read_file,
+    "write_file": _write_file,
+    "network_info": _network_info,
+    "system_status": _system_status,
+}
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools"""
-    return [
-        Tool(
-            name="execute_command",
-            description="Execute a bash command on the system. Use with caution.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "The bash command to execute"
-                    },
-                    "working_dir": {
-                        "type": "string",
-                        "description": "Working directory (optional, defaults to current)",
-                        "default": os.getcwd()
-                    }
-                },
-                "required": ["command"]
-            }
-        ),
-        Tool(
-            name="read_file",
-            description="Read the contents of a file",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Absolute path to the file"
-                    }
-                },
-                "required": ["path"]
-            }
-        ),
-        Tool(
-            name="write_file",
-            description="Write content to a file",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "path": {
-                        "type": "string",
-                        "description": "Absolute path to the file"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Content to write"
-                    }
-                },
-                "required": ["path", "content"]
-            }
-        ),
-        Tool(
-            name="network_info",
-            description="Get network interface information",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="configure_network",
-            description="Configure network interface using nmcli",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "interface": {
-                        "type": "string",
-                        "description": "Network interface name (e.g., eth0, wlan0)"
-                    },
-                    "setting_type": {
-                        "type": "string",
-                        "description": "Type of setting: static_ip, dns, dhcp",
-                        "enum": ["static_ip", "dns", "dhcp"]
-                    },
-                    "value": {
-                        "type": "string",
-                        "description": "Value for the setting (IP address, DNS server, etc.)"
-                    }
-                },
-                "required": ["interface", "setting_type"]
-            }
-        ),
-        Tool(
-            name="system_status",
-            description="Get system status information",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "component": {
-                        "type": "string",
-                        "description": "Component to check: cpu, memory, disk, network, docker, kubernetes",
-                        "enum": ["cpu", "memory", "disk", "network", "docker", "kubernetes", "all"]
-                    }
-                },
-                "required": ["component"]
-            }
-        )
-    ]
+    return [Tool(name=spec.name, description=spec.description, inputSchema=spec.input_schema)
+            for spec in REGISTRY if not spec.agent_only]
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls"""
+    """Handle tool calls, tracing their latency when MCP_TRACE_FILE is set"""
+    started = time.monotonic()
+    cpu = os.times()
+    content = await _call_tool(name, arguments)
+    if TRACE_LOG.path:
+        ended = os.times()
+        TRACE_LOG.write({
+            "ts": round(time.time(), 3), "tool": name, "seconds": round(time.monotonic() - started, 4),
+            # Process-wide: includes subprocesses of concurrent calls that finished meanwhile
+            "child_cpu": round(ended.children_user + ended.children_system - cpu.children_user - cpu.children_system, 4),
+            "bytes": sum(len(c.text) for c in content),
+            "error": content[0].text.startswith(("Error:", "Unknown tool:")) if content else False,
+        })
+    return content
+
+async def _call_tool(name: str, arguments: Any) -> list[TextContent]:
+    spec = REGISTRY.get(name)
+    if spec is None or spec.agent_only:
+        return [TextContent(
+            type="text",
+            text=f"Unknown tool: {name}"
+        )]
     
     try:
-        if name == "execute_command":
-            command = arguments["command"]
-            working_dir = arguments.get("working_dir", os.getcwd())
-            
-            # Log command
-            command_history.append(command)
-            
-            result = subprocess.run(
-                command,
-                shell=True,
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            output = {
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "returncode": result.returncode,
-                "command": command
-            }
-            
-            return [TextContent(
-                type="text",
-                text=json.dumps(output, indent=2)
-            )]
-            
-        elif name == "read_file":
-            path = arguments["path"]
-            with open(path, 'r') as f:
-                content = f.read()
-            return [TextContent(type="text", text=content)]
-            
-        elif name == "write_file":
-            path = arguments["path"]
-            content = arguments["content"]
-            
-            # Create directory if needed
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            
-            with open(path, 'w') as f:
-                f.write(content)
-            
-            return [TextContent(
-                type="text",
-                text=f"Successfully wrote to {path}"
-            )]
-            
-        elif name == "network_info":
-            result = subprocess.run(
-                ["nmcli", "device", "status"],
-                capture_output=True,
-                text=True
-            )
-            return [TextContent(type="text", text=result.stdout)]
-            
-        elif name == "configure_network":
-            interface = arguments["interface"]
-            setting_type = arguments["setting_type"]
-            value = arguments.get("value", "")
-            
-            if setting_type == "dhcp":
-                cmd = f"nmcli device modify {interface} ipv4.method auto"
-            elif setting_type == "static_ip":
-                cmd = f"nmcli device modify {interface} ipv4.method manual ipv4.addresses {value}"
-            elif setting_type == "dns":
-                cmd = f"nmcli device modify {interface} ipv4.dns {value}"
-            else:
-                return [TextContent(
-                    type="text",
-                    text=f"Unknown setting type: {setting_type}"
-                )]
-            
-            return [TextContent(
-                type="text",
-                text=f"Generated command: {cmd}\n\nThis command needs root privileges."
-            )]
-            
-        elif name == "system_status":
-            component = arguments["component"]
-            outputs = []
-            
-            if component in ["cpu", "all"]:
-                result = subprocess.run(["top", "-bn1"], capture_output=True, text=True)
-                outputs.append(f"CPU:\n{result.stdout.split(chr(10))[2]}")
-            
-            if component in ["memory", "all"]:
-                result = subprocess.run(["free", "-h"], capture_output=True, text=True)
-                outputs.append(f"Memory:\n{result.stdout}")
-            
-            if component in ["disk", "all"]:
-                result = subprocess.run(["df", "-h"], capture_output=True, text=True)
-                outputs.append(f"Disk:\n{result.stdout}")
-            
-            if component in ["docker", "all"]:
-                result = subprocess.run(["docker", "ps"], capture_output=True, text=True)
-                outputs.append(f"Docker:\n{result.stdout}")
-            
-            if component in ["kubernetes", "all"]:
-                result = subprocess.run(["kubectl", "get", "pods"], capture_output=True, text=True)
-                outputs.append(f"Kubernetes:\n{result.stdout}")
-            
-            return [TextContent(type="text", text="\n\n".join(outputs))]
-            
-        else:
-            return [TextContent(
-                type="text",
-                text=f"Unknown tool: {name}"
-            )]
+        handler = SERVER_HANDLERS.get(name)
+        if handler:
+            return await handler(arguments, spec)
+        
+        try:
+            result = await asyncio.wait_for(run_in_thread(spec.handler, arguments), spec.timeout)
+        except asyncio.TimeoutError:
+            # The worker thread can't be stopped; its subprocess has its own timeout
+            return [TextContent(type="text", text=f"Error: {name} timed out after {spec.timeout} seconds")]
+        if len(result) == 1 and ("output" in result or "error" in result):
+            # Single message: plain text
+            return [TextContent(type="text", text=next(iter(result.values())))]
+        return [TextContent(type="text", text=json.dumps(result, indent=2))]
             
     except Exception as e:
         return [TextContent(
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Native System Collectors
+Reads /proc, /sys and statvfs directly instead of forking top/free/df/lscpu/nmcli
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# Filesystems that df -h would show but that are not real storage
+PSEUDO_FILESYSTEMS = {
+    "proc", "sysfs", "devpts", "devtmpfs", "cgroup", "cgroup2", "securityfs", "debugfs",
+    "tracefs", "pstore", "bpf", "mqueue", "hugetlbfs", "configfs", "fusectl", "autofs",
+    "binfmt_misc", "nsfs", "ramfs", "efivarfs", "rpc_pipefs", "selinuxfs", "squashfs",
+}
+
+
+def _read(path: str) -> str:
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def _read_optional(path: str) -> Optional[str]:
+    try:
+        return _read(path).strip()
+    except OSError:
+        return None
+
+
+def _human(num_bytes: float) -> str:
+    """Format bytes like `free -h` / `df -h` do"""
+    for unit in ("B", "Ki", "Mi", "Gi", "Ti"):
+        if abs(num_bytes) < 1024 or unit == "Ti":
+            return f"{num_bytes:.1f}{unit}" if unit != "B" else f"{int(num_bytes)}B"
+        num_bytes /= 1024
+
+
+class CpuSampler:
+    """Computes CPU usage from deltas between /proc/stat snapshots.
+
+    The previous snapshot is kept, so repeated calls measure usage since the
+    last call instead of sleeping for a fresh sampling interval every time.
+    A snapshot older than max_age would average over minutes and hide the
+    current load, so then a fresh interval is sampled instead.
+    """
+
+    def __init__(self, interval: float = 0.1, max_age: float = 10.0):
+        self.interval = interval
+        self.max_age = max_age
+        self._last = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _snapshot() -> Dict[str, List[int]]:
+        snapshot = {}
+        for line in _read("/proc/stat").splitlines():
+            if line.startswith("cpu"):
+                name, *values = line.split()
+                snapshot[name] = [int(v) for v in values]
+        return snapshot
+
+    @staticmethod
+    def _busy_percent(before: List[int], after: List[int]) -> float:
+        # user nice system idle iowait irq softirq steal (guest is already in user)
+        idle_before = before[3] + (before[4] if len(before) > 4 else 0)
+        idle_after = after[3] + (after[4] if len(after) > 4 else 0)
+        total = sum(after[:8]) - sum(before[:8])
+        if total <= 0:
+            return 0.0
+        return round(100.0 * (total - (idle_after - idle_before)) / total, 1)
+
+    def usage(self) -> Dict[str, float]:
+        """Busy percentage for the whole machine ("cpu") and each core"""
+        with self._lock:
+            now = time.monotonic()
+            age = now - self._last[0] if self._last else None
+            if age is None or age < self.interval / 2 or age > self.max_age:
+                before = self._snapshot()
+                time.sleep(self.interval)
+                now = time.monotonic()
+            else:
+                before = self._last[1]
+            after = self._snapshot()
+            self._last = (now, after)
+        return {name: self._busy_percent(before[name], after[name])
+                for name in after if name in before}
+
+
+_cpu_sampler = CpuSampler()
+
+
+def collect_cpu() -> Dict[str, Any]:
+    """CPU model, core count, load average and usage"""
+    model = None
+    sockets = set()
+    for line in _read("/proc/cpuinfo").splitlines():
+        if line.startswith("model name") and model is None:
+            model = line.split(":", 1)[1].strip()
+        elif line.startswith("physical id"):
+            sockets.add(line.split(":", 1)[1].strip())
+
+    usage = _cpu_sampler.usage()
+    load1, load5, load15 = os.getloadavg()
+    return {
+        "model": model or "Unknown",
+        "cores": os.cpu_count(),
+        "sockets": len(sockets) or 1,
+        "usage_percent": usage.pop("cpu", 0.0),
+        "per_core_percent": [usage[name] for name in sorted(usage, key=lambda n: int(n[3:]))],
+        "load_average": [round(load1, 2), round(load5, 2), round(load15, 2)],
+    }
+
+
+def collect_memory() -> Dict[str, Any]:
+    """Memory and swap usage from /proc/meminfo"""
+    info = {}
+    for line in _read("/proc/meminfo").splitlines():
+        key, value = line.split(":", 1)
+        info[key] = int(value.split()[0]) * 1024
+
+    total = info.get("MemTotal", 0)
+    available = info.get("MemAvailable", info.get("MemFree", 0))
+    swap_total = info.get("SwapTotal", 0)
+    swap_used = swap_total - info.get("SwapFree", 0)
+    return {
+        "total": _human(total),
+        "used": _human(total - available),
+        "available": _human(available),
+        "used_percent": round(100.0 * (total - available) / total, 1) if total else 0.0,
+        "buffers_cache": _human(info.get("Buffers", 0) + info.get("Cached", 0)),
+        "swap_total": _human(swap_total),
+        "swap_used": _human(swap_used),
+    }
+
+
+def collect_disk() -> List[Dict[str, Any]]:
+    """Usage of every real mounted filesystem via statvfs"""
+    disks = []
+    seen = set()
+    for line in _read("/proc/mounts").splitlines():
+        device, mountpoint, fstype = line.split()[:3]
+        if fstype in PSEUDO_FILESYSTEMS or (fstype == "tmpfs" and mountpoint != "/tmp"):
+            continue
+        mountpoint = mountpoint.replace("\\040", " ")
+        if device in seen and device.startswith("/"):
+            continue
+        try:
+            st = os.statvfs(mountpoint)
+        except OSError:
+            continue
+        total = st.f_blocks * st.f_frsize
+        if total == 0:
+            continue
+        seen.add(device)
+        free = st.f_bavail * st.f_frsize
+        used = total - st.f_bfree * st.f_frsize
+        disks.append({
+            "mount": mountpoint,
+            "device": device,
+            "fstype": fstype,
+            "size": _human(total),
+            "used": _human(used),
+            "available": _human(free),
+            "used_percent": round(100.0 * used / (used + free), 1) if used + free else 0.0,
+        })
+    return disks
+
+
+def collect_network() -> List[Dict[str, Any]]:
+    """Interface state, address and traffic counters from /sys/class/net"""
+    interfaces = []
+    base = "/sys/class/net"
+    try:
+        names = sorted(os.listdir(base))
+    except OSError:
+        return interfaces
+
+    for name in names:
+        path = os.path.join(base, name)
+        speed = _read_optional(os.path.join(path, "speed"))
+        rx = _read_optional(os.path.join(path, "statistics", "rx_bytes"))
+        tx = _read_optional(os.path.join(path, "statistics", "tx_bytes"))
+        interfaces.append({
+            "interface": name,
+            "state": _read_optional(os.path.join(path, "operstate")) or "unknown",
+            "type": "wifi" if os.path.isdir(os.path.join(path, "wireless")) else
+                    "loopback" if name == "lo" else
+                    "virtual" if not os.path.exists(os.path.join(path, "device")) else "ethernet",
+            "mac": _read_optional(os.path.join(path, "address")),
+            "speed_mbps": int(speed) if speed and speed.lstrip("-").isdigit() and int(speed) > 0 else None,
+            "rx": _human(int(rx)) if rx else None,
+            "tx": _human(int(tx)) if tx else None,
+        })
+    return interfaces
+
+
+COLLECTORS = {
+    "cpu": collect_cpu,
+    "memory": collect_memory,
+    "disk": collect_disk,
+    "network": collect_network,
+}
+
+
+def collect(component: str) -> Any:
+    """Run a single collector by component name"""
+    return COLLECTORS[component]()
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps({name: fn() for name, fn in COLLECTORS.items()}, indent=2))
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+System Context Cache
+Python port of get-system-context.sh backed by an on-disk cache with
+per-field TTLs, so agent startup does not fork ~20 probes every time.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Dict, Optional, List
+
+CACHE_DIR = os.environ.get(
+    "OLLAMA_MCP_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ollama-mcp-agent")
+)
+CACHE_FILE = "system-context.json"
+LOCK_STALE_SECONDS = 60
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+def _run(cmd: List[str], timeout: float = 3, cwd: Optional[str] = None) -> str:
+    """Run a probe command, returning stripped stdout or "" on any failure"""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=cwd)
+        return result.stdout.strip() if result.returncode == 0 else ""
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+# --- Probes -------------------------------------------------------------
+
+def _os_name() -> str:
+    for line in _read("/etc/os-release").splitlines():
+        if line.startswith("PRETTY_NAME="):
+            return line.split("=", 1)[1].strip().strip('"')
+    return "Unknown"
+
+
+def _cpu_model() -> str:
+    for line in _read("/proc/cpuinfo").splitlines():
+        if line.startswith("model name"):
+            return line.split(":", 1)[1].strip()
+    for line in _run(["lscpu"]).splitlines():
+        if line.startswith("Model name"):
+            return line.split(":", 1)[1].strip()
+    return "Unknown"
+
+
+def _meminfo_gib(key: str) -> str:
+    for line in _read("/proc/meminfo").splitlines():
+        if line.startswith(key + ":"):
+            kib = int(line.split()[1])
+            return f"{kib / 1024 / 1024:.1f}Gi"
+    return "?"
+
+
+def _pci_device(pattern: str) -> str:
+    matches = [line.split(":", 2)[-1].strip() for line in _run(["lspci"]).splitlines()
+               if pattern in line.lower()]
+    return matches[0] if matches else ""
+
+
+def _kube_context() -> str:
+    if not shutil.which("kubectl"):
+        return "Not configured"
+    return _run(["kubectl", "config", "current-context"]) or "Not configured"
+
+
+def _kube_namespace() -> str:
+    if not shutil.which("kubectl"):
+        return "default"
+    return _run(["kubectl", "config", "view", "--minify", "--output", "jsonpath={..namespace}"]) or "default"
+
+
+def _docker_installed() -> str:
+    if not shutil.which("docker"):
+        return "No"
+    version = _run(["docker", "--version"]).split()
+    return f"Yes ({version[2].rstrip(',')})" if len(version) > 2 else "Yes"
+
+
+def _docker_running() -> str:
+    if not shutil.which("docker"):
+        return "0"
+    names = _run(["docker", "ps", "--format", "{{.Names}}"])
+    return str(len(names.splitlines()))
+
+
+def _window_manager() -> str:
+    for line in _run(["wmctrl", "-m"]).splitlines():
+        if line.startswith("Name:"):
+            return line.split(":", 1)[1].strip()
+    return "Not detected"
+
+
+def _projects() -> str:
+    try:
+        entries = sorted(os.listdir(os.path.expanduser("~/projects")))[:10]
+    except OSError:
+        return "  None"
+    return "\n".join(f"  - {name}" for name in entries) or "  None"
+
+
+# Cached fields: name -> (ttl_seconds, probe). Hardware basically never changes,
+# cluster/container state changes often.
+FIELDS: Dict[str, tuple] = {
+    "hostname": (DAY, lambda: os.uname().nodename),
+    "os": (DAY, _os_name),
+    "kernel": (HOUR, lambda: os.uname().release),
+    "arch": (7 * DAY, lambda: os.uname().machine),
+    "cpu": (7 * DAY, _cpu_model),
+    "cores": (7 * DAY, lambda: str(os.cpu_count())),
+    "mem_total": (7 * DAY, lambda: _meminfo_gib("MemTotal")),
+    "mem_available": (MINUTE, lambda: _meminfo_gib("MemAvailable")),
+    "gpu": (7 * DAY, lambda: _pci_device("vga") or "Not detected"),
+    "npu": (7 * DAY, lambda: _pci_device("neural processing") or "None"),
+    "kube_context": (5 * MINUTE, _kube_context),
+    "kube_namespace": (5 * MINUTE, _kube_namespace),
+    "docker_installed": (DAY, _docker_installed),
+    "docker_running": (MINUTE, _docker_running),
+    "window_manager": (HOUR, _window_manager),
+    "projects": (5 * MINUTE, _projects),
+}
+
+
+class SystemContextCache:
+    """On-disk cache of system context fields with lazy background refresh"""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, CACHE_FILE)
+        self.lock_path = self.path + ".lock"
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+    def stale_fields(self, now: Optional[float] = None) -> List[str]:
+        """Fields that are missing or older than their TTL"""
+        now = now or time.time()
+        return [name for name, (ttl, _) in FIELDS.items()
+                if name not in self.entries or now - self.entries[name]["ts"] > ttl]
+
+    def refresh(self, fields: Optional[List[str]] = None):
+        """Re-run the probes for the given fields (default: all) and persist"""
+        refreshed = {}
+        for name in fields if fields is not None else FIELDS:
+            _, probe = FIELDS[name]
+            try:
+                value = probe()
+            except Exception:
+                value = ""
+            refreshed[name] = {"value": value, "ts": time.time()}
+        # Another refresher may have written newer values meanwhile; only the
+        # fields probed here replace what is on disk
+        self.entries = {**self.entries, **self._load(), **refreshed}
+        self._save()
+
+    def _take_lock(self) -> bool:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(self.lock_path) > LOCK_STALE_SECONDS:
+                os.unlink(self.lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except OSError:
+            return False
+
+    def refresh_in_background(self, fields: List[str]):
+        """Refresh stale fields in a detached process so it outlives one-shot runs"""
+        if not fields or not self._take_lock():
+            return
+        try:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--refresh", ",".join(fields)],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True,
+                env=dict(os.environ, OLLAMA_MCP_CACHE_DIR=self.cache_dir)
+            )
+        except OSError:
+            os.unlink(self.lock_path)
+
+    def get(self, force_refresh: bool = False) -> Dict[str, str]:
+        """Return all field values, probing synchronously only for missing ones"""
+        if force_refresh:
+            self.refresh()
+        else:
+            missing = [name for name in FIELDS if name not in self.entries]
+            if missing:
+                self.refresh(missing)
+            self.refresh_in_background(self.stale_fields())
+        return {name: entry["value"] for name, entry in self.entries.items()}
+
+    def render(self, force_refresh: bool = False, cwd: Optional[str] = None) -> str:
+        """Render the context text in the same layout as get-system-context.sh.
+
+        cwd is the working directory to describe (default: the process's).
+        """
+        v = self.get(force_refresh)
+        cwd = cwd or os.getcwd()
+        wayland = "Wayland" if os.environ.get("WAYLAND_DISPLAY") else "X11"
+
+        git_info = ""
+        if os.path.isdir(os.path.join(cwd, ".git")):
+            remote = _run(["git", "remote", "get-url", "origin"], cwd=cwd) or "local repo"
+            branch = _run(["git", "branch", "--show-current"], cwd=cwd)
+            git_info = f"\n- Git repo: {remote}\n- Branch: {branch}"
+
+        return f"""You are a helpful AI assistant running locally on this system. Here is the current system information:
+
+SYSTEM INFORMATION:
+- Hostname: {v['hostname']}
+- OS: {v['os']}
+- Kernel: {v['kernel']}
+- Architecture: {v['arch']}
+- User: {os.environ.get('USER', '')}
+- Home: {os.environ.get('HOME', '')}
+- Current Directory: {cwd}
+- Shell: {os.environ.get('SHELL', '')}
+
+HARDWARE:
+- CPU: {v['cpu']}
+- Cores: {v['cores']} cores
+- Memory: {v['mem_total']} total, {v['mem_available']} available
+- GPU: {v['gpu']}
+- NPU: {v['npu']}
+
+KUBERNETES:
+- Current Context: {v['kube_context']}
+- Current Namespace: {v['kube_namespace']}
+
+DOCKER:
+- Docker installed: {v['docker_installed']}
+- Running containers: {v['docker_running']}
+
+DESKTOP ENVIRONMENT:
+- Session Type: {os.environ.get('XDG_SESSION_TYPE', 'Not detected')}
+- Desktop: {os.environ.get('XDG_CURRENT_DESKTOP', 'Not detected')}
+- Window Manager: {v['window_manager']}
+- Wayland Compositor: {wayland}
+
+PROJECT DIRECTORIES:
+{v['projects']}
+
+RECENT WORK:
+- Working directory: {cwd}{git_info}
+
+Please use this context to provide relevant, system-specific advice.
+"""
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cached system context for the agent")
+    parser.add_argument("--refresh", metavar="FIELDS", help="Comma separated fields to refresh (internal)")
+    parser.add_argument("--force", action="store_true", help="Re-probe every field before printing")
+    args = parser.parse_args()
+
+    cache = SystemContextCache()
+    if args.refresh is not None:
+        try:
+            cache.refresh([f for f in args.refresh.split(",") if f in FIELDS])
+        finally:
+            try:
+                os.unlink(cache.lock_path)
+            except OSError:
+                pass
+        return
+
+    print(cache.render(force_refresh=args.force))
+
+
+if __name__ == "__main__":
+    main()
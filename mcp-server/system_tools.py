@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+System Tools
+Handlers for the desktop, service and cluster management tools (sway,
+waybar, network, systemd, kubernetes), shared by the agent and the MCP server.
+"""
+
+import os
+import subprocess
+from typing import Dict, Any, List
+
+from kube_health import check_health
+
+# Seconds a single nmcli/systemctl/journalctl/swaymsg call may take; kubectl
+# talks to a possibly distant API server and gets longer. The registry
+# advertises the same values as each tool's timeout.
+COMMAND_TIMEOUT = 30
+KUBECTL_TIMEOUT = 60
+
+
+def _run(cmd: List[str], timeout: float = COMMAND_TIMEOUT) -> subprocess.CompletedProcess:
+    """Run a command with captured text output, raising TimeoutError when it hangs"""
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"{' '.join(cmd[:3])} timed out after {timeout} seconds")
+
+
+def sway_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Manage Sway window manager configuration"""
+    action = args.get("action", "help")
+    config_path = os.path.expanduser("~/.config/sway/config")
+
+    if action == "show-config":
+        try:
+            with open(config_path, 'r') as f:
+                return {"content": f.read()}
+        except FileNotFoundError:
+            return {"error": f"Config file not found: {config_path}"}
+
+    elif action == "list-keybindings":
+        try:
+            with open(config_path, 'r') as f:
+                lines = f.readlines()
+            keybindings = [line.strip() for line in lines if line.strip().startswith('bindsym')]
+            return {"keybindings": "\n".join(keybindings)}
+        except FileNotFoundError:
+            return {"error": f"Config file not found: {config_path}"}
+
+    elif action == "add-keybinding":
+        key = args.get("key")
+        command = args.get("command")
+        if not key or not command:
+            return {"error": "Both 'key' and 'command' arguments required"}
+
+        binding_line = f"bindsym {key} exec {command}\n"
+        try:
+            with open(config_path, 'a') as f:
+                f.write(binding_line)
+            return {"status": "success", "message": f"Added: {binding_line.strip()}"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    elif action == "reload":
+        result = _run(["swaymsg", "reload"])
+        return {"output": result.stdout, "status": "success" if result.returncode == 0 else "failed"}
+
+    else:
+        return {"error": f"Unknown action: {action}. Available: show-config, list-keybindings, add-keybinding, reload"}
+
+
+def waybar_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Manage Waybar configuration"""
+    action = args.get("action", "help")
+    config_path = os.path.expanduser("~/.config/waybar/config.jsonc")
+
+    if action == "show-config":
+        try:
+            with open(config_path, 'r') as f:
+                return {"content": f.read()}
+        except FileNotFoundError:
+            # Try without .jsonc extension
+            config_path = os.path.expanduser("~/.config/waybar/config")
+            try:
+                with open(config_path, 'r') as f:
+                    return {"content": f.read()}
+            except FileNotFoundError:
+                return {"error": "Waybar config not found"}
+
+    elif action == "restart":
+        # Kill existing waybar
+        _run(["killall", "waybar"])
+        # Start new one, detached from this process
+        subprocess.Popen(["waybar"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        return {"status": "success", "message": "Waybar restarted"}
+
+    elif action == "reload":
+        _run(["killall", "-SIGUSR2", "waybar"])
+        return {"status": "success", "message": "Waybar reloaded"}
+
+    else:
+        return {"error": f"Unknown action: {action}. Available: show-config, restart, reload"}
+
+
+def network_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Manage network configuration"""
+    action = args.get("action", "status")
+
+    if action == "status":
+        result = _run(["nmcli", "device", "status"])
+        return {"output": result.stdout}
+
+    elif action == "connections":
+        result = _run(["nmcli", "connection", "show"])
+        return {"output": result.stdout}
+
+    elif action == "wifi-list":
+        result = _run(["nmcli", "device", "wifi", "list"])
+        return {"output": result.stdout}
+
+    elif action == "set-dns":
+        connection = args.get("connection")
+        dns = args.get("dns")
+        if not connection or not dns:
+            return {"error": "Both 'connection' and 'dns' required"}
+
+        result = _run(["nmcli", "connection", "modify", connection, "ipv4.dns", dns])
+        if result.returncode == 0:
+            # Reload connection
+            _run(["nmcli", "connection", "up", connection])
+            return {"status": "success", "message": f"DNS set to {dns} for {connection}"}
+        return {"error": result.stderr}
+
+    else:
+        return {"error": f"Unknown action: {action}. Available: status, connections, wifi-list, set-dns"}
+
+
+def systemd_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Manage systemd services"""
+    action = args.get("action", "status")
+    service = args.get("service", "")
+
+    if action == "status":
+        if not service:
+            return {"error": "Service name required"}
+        result = _run(["systemctl", "status", service])
+        return {"output": result.stdout}
+
+    elif action == "restart":
+        if not service:
+            return {"error": "Service name required"}
+        result = _run(["systemctl", "restart", service])
+        return {"status": "success" if result.returncode == 0 else "failed", "output": result.stderr}
+
+    elif action == "enable":
+        if not service:
+            return {"error": "Service name required"}
+        result = _run(["systemctl", "enable", service])
+        return {"status": "success" if result.returncode == 0 else "failed", "output": result.stdout}
+
+    elif action == "disable":
+        if not service:
+            return {"error": "Service name required"}
+        result = _run(["systemctl", "disable", service])
+        return {"status": "success" if result.returncode == 0 else "failed", "output": result.stdout}
+
+    elif action == "logs":
+        if not service:
+            return {"error": "Service name required"}
+        lines = args.get("lines", "50")
+        result = _run(["journalctl", "-u", service, "-n", str(lines)])
+        return {"output": result.stdout}
+
+    elif action == "list":
+        result = _run(["systemctl", "list-units", "--type=service", "--all"])
+        return {"output": result.stdout}
+
+    else:
+        return {"error": f"Unknown action: {action}. Available: status, restart, enable, disable, logs, list"}
+
+
+def network_info_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Get network interface information"""
+    result = _run(["nmcli", "device", "status"])
+    return {"output": result.stdout}
+
+
+def configure_network_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate (but do not run) the nmcli command for a network setting"""
+    interface = args.get("interface", "")
+    setting_type = args.get("setting_type", "")
+    value = args.get("value", "")
+    
+    if setting_type == "dhcp":
+        cmd = f"nmcli device modify {interface} ipv4.method auto"
+    elif setting_type == "static_ip":
+        cmd = f"nmcli device modify {interface} ipv4.method manual ipv4.addresses {value}"
+    elif setting_type == "dns":
+        cmd = f"nmcli device modify {interface} ipv4.dns {value}"
+    else:
+        return {"error": f"Unknown setting type: {setting_type}"}
+    
+    return {"output": f"Generated command: {cmd}\n\nThis command needs root privileges."}
+
+
+def kubernetes_tool(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Query Kubernetes resources with kubectl"""
+    action = args.get("action", "status")
+    namespace = args.get("namespace", "")
+    resource = args.get("resource", "pods")
+    
+    # Special case for all namespaces
+    if namespace == "all" or action == "check-health":
+        ns_flag = ["--all-namespaces"]
+    elif namespace:
+        ns_flag = ["-n", namespace]
+    else:
+        ns_flag = []
+    
+    if action == "check-health":
+        # One JSON listing of pods and nodes, evaluated in a single pass
+        try:
+            return {"output": check_health()}
+        except Exception as e:
+            return {"error": f"Health check failed: {e}"}
+    
+    elif action == "pods":
+        result = _run(["kubectl", "get", "pods"] + ns_flag, KUBECTL_TIMEOUT)
+    elif action == "deployments":
+        result = _run(["kubectl", "get", "deployments"] + ns_flag, KUBECTL_TIMEOUT)
+    elif action == "services":
+        result = _run(["kubectl", "get", "services"] + ns_flag, KUBECTL_TIMEOUT)
+    elif action == "logs":
+        pod_name = args.get("pod", "")
+        tail_lines = args.get("tail", "100")
+        container = args.get("container", "")
+        
+        if not pod_name:
+            return {"error": "Pod name required for logs"}
+        
+        log_cmd = ["kubectl", "logs", pod_name] + ns_flag + ["--tail=" + str(tail_lines)]
+        if container:
+            log_cmd.extend(["-c", container])
+        
+        result = _run(log_cmd, KUBECTL_TIMEOUT)
+    elif action == "describe":
+        pod_name = args.get("pod", "")
+        if not pod_name:
+            return {"error": "Pod name required for describe"}
+        
+        result = _run(["kubectl", "describe", "pod", pod_name] + ns_flag, KUBECTL_TIMEOUT)
+    elif action == "namespaces":
+        result = _run(["kubectl", "get", "namespaces"], KUBECTL_TIMEOUT)
+    elif action == "all":
+        result = _run(["kubectl", "get", "all"] + ns_flag, KUBECTL_TIMEOUT)
+    else:
+        result = _run(["kubectl", "get", resource] + ns_flag, KUBECTL_TIMEOUT)
+    
+    return {"output": result.stdout if result.returncode == 0 else result.stderr}
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Modules import each other by bare name, as when run from mcp-server/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the system context cache (and trace log) out of the real cache directory
+os.environ.setdefault("OLLAMA_MCP_CACHE_DIR", tempfile.mkdtemp(prefix="mcp-tests-"))
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from agent import MCPAgent, TOOL_NUM_PREDICT  # noqa: E402
+from mock_ollama import MockOllama  # noqa: E402
+from ollama_client import OllamaClient  # noqa: E402
+
+LONG_ANSWER = " ".join(f"word{n}" for n in range(400))
+
+
+@pytest.fixture
+def mock():
+    server = MockOllama().start()
+    yield server
+    server.stop()
+
+
+def make_agent(mock, stream):
+    return MCPAgent(llm=OllamaClient(host=mock.host), stream=stream, response_cache=False, prefetch=False)
+
+
+def test_streamed_answer_is_rerun_uncapped_and_printed_once(mock, capsys):
+    mock.responses = [json.dumps({"answer": LONG_ANSWER}), LONG_ANSWER]
+    result = make_agent(mock, stream=True).process_request("explain something at length")
+
+    assert result == LONG_ANSWER
+    out = capsys.readouterr().out
+    assert out.count("word399") == 1
+    assert '{"answer"' not in out
+    first, rerun = mock.request_log
+    assert first["options"]["num_predict"] == TOOL_NUM_PREDICT and "format" in first
+    assert "num_predict" not in rerun["options"] and "format" not in rerun
+
+
+def test_truncated_answer_is_rerun_without_cap(mock, capsys):
+    mock.responses = [json.dumps({"answer": LONG_ANSWER})]
+    result = make_agent(mock, stream=False).process_request("explain something at length")
+
+    assert result == LONG_ANSWER
+    assert capsys.readouterr().out.count("word399") == 1
+    assert [r["options"].get("num_predict") for r in mock.request_log] == [TOOL_NUM_PREDICT, None]
+
+
+def test_tool_calls_stay_capped(mock):
+    mock.responses = ['{"tool": "execute_command", "arguments": {"command": "echo ok"}}']
+    make_agent(mock, stream=True).process_request("say ok")
+
+    assert mock.request_log[0]["options"]["num_predict"] == TOOL_NUM_PREDICT
+    assert len(mock.request_log) == 1
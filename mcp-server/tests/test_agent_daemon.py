@@ -0,0 +1,147 @@
+import io
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import threading
+import types
+
+import pytest
+
+from agent import MCPAgent
+from agent_daemon import ThreadRouter
+
+
+def test_agent_uses_client_directory_without_chdir(tmp_path):
+    before = str(tmp_path.cwd())
+    agent = MCPAgent(llm=object(), response_cache=False, prefetch=False, cwd=str(tmp_path))
+
+    assert f"Current Directory: {tmp_path}" in agent.system_context
+    assert agent._execute_command({"command": "pwd"})["stdout"].strip() == str(tmp_path)
+    assert str(tmp_path.cwd()) == before
+
+
+def test_worker_and_prefetch_output_follow_the_request(monkeypatch):
+    daemon_out, client_out = io.StringIO(), io.StringIO()
+    router = ThreadRouter(daemon_out)
+    monkeypatch.setattr(sys, "stdout", router)
+
+    agent = MCPAgent(llm=object(), auto_approve=True, response_cache=False)
+    agent._handlers["system_status"] = lambda args: print(f"probing {args['component']}") or {"output": "ok"}
+
+    def request():
+        router.bind(client_out)
+        agent.prefetcher.start([{"tool": "system_status", "arguments": {"component": "cpu"}}])
+        agent._run_calls([{"tool": "system_status", "arguments": {"component": "disk"}},
+                          {"tool": "system_status", "arguments": {"component": "memory"}}])
+        agent.prefetcher.take("system_status", {"component": "cpu"})
+
+    thread = threading.Thread(target=request)
+    thread.start()
+    thread.join()
+
+    for component in ("cpu", "disk", "memory"):
+        assert f"probing {component}" in client_out.getvalue()
+    assert daemon_out.getvalue() == ""
+
+
+def test_agents_are_built_from_agent_options(tmp_path):
+    from agent import agent_options
+    from agent_daemon import AgentDaemon, PER_REQUEST_OPTIONS
+
+    daemon = AgentDaemon(str(tmp_path / "agent.sock"))
+    try:
+        built = []
+        daemon.agent_class = lambda **kwargs: built.append(kwargs) or object()
+        args = daemon.parser.parse_args(["--no-prefetch", "--route", "--max-steps", "5", "-y", "hello"])
+        first, _ = daemon._agent_for(args, "/srv")
+        again, _ = daemon._agent_for(daemon.parser.parse_args(["--no-prefetch", "--route", "--max-steps", "5",
+                                                              "hello"]), "/srv")
+    finally:
+        daemon.server_close()
+
+    expected = {k: v for k, v in agent_options(args).items() if k not in PER_REQUEST_OPTIONS}
+    assert len(built) == 1 and first is again
+    assert {k: v for k, v in built[0].items() if k not in ("llm", "cwd")} == expected
+    assert built[0]["cwd"] == "/srv"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    from agent_daemon import AgentDaemon
+
+    daemon = AgentDaemon(str(tmp_path / "agent.sock"))
+    daemon.agent_class = lambda **kwargs: types.SimpleNamespace(**kwargs)
+    yield daemon
+    daemon.server_close()
+
+
+def serve_in_background(daemon, monkeypatch):
+    for name in ("stdout", "stderr", "stdin"):
+        monkeypatch.setattr(sys, name, ThreadRouter(getattr(sys, name)))
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+
+
+def test_socket_is_created_owner_only(daemon):
+    assert stat.S_IMODE(os.stat(daemon.server_address).st_mode) == 0o600
+
+
+def test_least_recently_used_agent_is_evicted(daemon):
+    daemon.max_agents = 2
+    args = daemon.parser.parse_args(["hello"])
+    first, _ = daemon._agent_for(args, "/a")
+    daemon._agent_for(args, "/b")
+    assert daemon._agent_for(args, "/a")[0] is first
+    daemon._agent_for(args, "/c")
+
+    assert [key[1] for key in daemon.agents] == ["/a", "/c"]
+
+
+def test_agents_share_one_kube_cache(daemon):
+    daemon.kube_cache = object()
+    args = daemon.parser.parse_args(["--kube-cache", "hello"])
+    first, _ = daemon._agent_for(args, "/a")
+    second, _ = daemon._agent_for(args, "/b")
+
+    assert first is not second
+    assert first.kube_cache is second.kube_cache is daemon.kube_cache
+
+
+def test_request_with_another_environment_falls_back(daemon, monkeypatch):
+    ran = []
+    daemon.run_request = lambda argv, cwd: ran.append(argv) or 0
+    monkeypatch.setenv("KUBECONFIG", "/daemon/kubeconfig")
+    serve_in_background(daemon, monkeypatch)
+
+    client = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent_client.py")
+    env = dict(os.environ, OLLAMA_MCP_AGENT_SOCKET=daemon.server_address, KUBECONFIG="/client/kubeconfig")
+    result = subprocess.run([sys.executable, client, "hello"], env=env, input="y\n",
+                            capture_output=True, text=True, timeout=10)
+
+    assert result.returncode == 75 and result.stdout == ""
+    assert ran == []
+
+
+def test_env_differs(daemon, monkeypatch):
+    monkeypatch.setenv("KUBECONFIG", "/daemon/kubeconfig")
+    monkeypatch.delenv("DOCKER_HOST", raising=False)
+
+    assert not daemon.env_differs({"KUBECONFIG": "/daemon/kubeconfig", "DOCKER_HOST": None})
+    assert daemon.env_differs({"KUBECONFIG": "/client/kubeconfig"})
+    assert daemon.env_differs({"DOCKER_HOST": "tcp://elsewhere:2375"})
+
+
+def test_accepted_request_streams_output(daemon, monkeypatch):
+    daemon.run_request = lambda argv, cwd: print(f"ran {' '.join(argv)} in {cwd}") or 3
+    serve_in_background(daemon, monkeypatch)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(daemon.server_address)
+        env = {"PATH": os.environ.get("PATH"), "NOT_SET_ANYWHERE": None}
+        sock.sendall(json.dumps({"argv": ["hello"], "cwd": "/srv", "env": env}).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        reply = b"".join(iter(lambda: sock.recv(65536), b""))
+
+    assert reply == b"\0READY\nran hello in /srv\n\0EXIT 3\n"
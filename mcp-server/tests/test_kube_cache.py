@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fake_system  # noqa: E402
+from kube_cache import KubeCache, pod_status  # noqa: E402
+
+WATCHED = ("default", "watched-pod")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_PODS", "5")
+    monkeypatch.setenv("FAKE_WATCH_GATE", str(tmp_path / "gate"))
+    kubectl = os.path.join(fake_system.install(str(tmp_path / "bin")), "kubectl")
+    cache = KubeCache(kubectl=kubectl, resources=["pods"]).start()
+    yield cache
+    cache.stop()
+
+
+def send_event(tmp_path, n):
+    (tmp_path / "gate").write_text(str(n))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "kube cache did not apply the watch event"
+        time.sleep(0.01)
+
+
+def test_watch_events_update_store(cache, tmp_path):
+    assert cache.ready("pods", wait=5)
+    assert len(cache.store["pods"]) == 5
+    assert WATCHED not in cache.store["pods"]
+
+    send_event(tmp_path, 1)
+    wait_for(lambda: WATCHED in cache.store["pods"])
+    assert pod_status(cache.store["pods"][WATCHED]) == "Running"
+    assert len(cache.store["pods"]) == 6
+
+    send_event(tmp_path, 2)
+    wait_for(lambda: pod_status(cache.store["pods"][WATCHED]) == "CrashLoopBackOff")
+    assert cache.get("pods", "default").split("\n")[-2].split()[:4] == [
+        "watched-pod", "0/1", "CrashLoopBackOff", "1"]
+
+    send_event(tmp_path, 3)
+    wait_for(lambda: WATCHED not in cache.store["pods"])
+    assert len(cache.store["pods"]) == 5
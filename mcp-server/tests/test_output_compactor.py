@@ -0,0 +1,44 @@
+from output_compactor import compact, is_log_call
+
+SWAY_CONFIG = "\n".join(
+    ["# Sway config", "set $mod Mod4", "set $term foot", ""]
+    + [f"bindsym $mod+{n} workspace number {n}" for n in range(1, 10)]
+    + [""]
+    + [f"bindsym $mod+Shift+{n} move container to workspace number {n}" for n in range(1, 10)]
+)
+
+CODE = "\n".join(["def main():"] + [f"    x{n} = compute({n})" for n in range(40)] + ["    return x0"])
+
+JOURNAL = "\n".join(
+    f"Oct 16 10:00:{n % 60:02d} host sshd[{1000 + n}]: Connection closed by 10.0.0.{n % 250} port 22"
+    for n in range(40)
+)
+
+
+def test_config_passes_through_unchanged():
+    assert compact(SWAY_CONFIG) == SWAY_CONFIG
+
+
+def test_code_passes_through_unchanged():
+    assert compact(CODE) == CODE
+
+
+def test_timestamped_logs_are_deduped():
+    digest = compact(JOURNAL)
+    assert "[x40]" in digest
+    assert len(digest) < len(JOURNAL)
+
+
+def test_known_log_source_is_deduped_without_timestamps():
+    logs = "\n".join("GET /healthz 200" for _ in range(30))
+    assert compact(logs) == logs
+    assert "[x30]" in compact(logs, logs=True)
+
+
+def test_is_log_call():
+    assert is_log_call("systemd", {"action": "logs", "service": "sshd"})
+    assert is_log_call("kubernetes", {"action": "logs", "pod": "web-1"})
+    assert is_log_call("execute_command", {"command": "journalctl -u sshd -n 200"})
+    assert is_log_call("execute_command", {"command": "kubectl -n grafana logs web-1"})
+    assert not is_log_call("execute_command", {"command": "cat ~/.config/sway/config"})
+    assert not is_log_call("sway", {"action": "show-config"})
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from agent import MCPAgent
+from prefetch import Prefetcher, guess_calls
+from tracing import Trace
+
+
+def make_agent():
+    agent = MCPAgent(llm=object(), auto_approve=True, response_cache=False)
+    docker = {"state": "failed"}
+
+    def systemd(args):
+        docker["state"] = "active"
+        return {"output": f"restarted {args['service']}"}
+
+    agent._handlers["systemd"] = systemd
+    agent._handlers["system_status"] = lambda args: {"output": f"docker: {docker['state']}"}
+    return agent
+
+
+def test_restart_then_status_does_not_use_stale_prefetch():
+    agent = make_agent()
+    agent.prefetcher.start([{"tool": "system_status", "arguments": {"component": "docker"}}])
+    # Let the prefetch finish before the restart, so its snapshot is the old state
+    next(iter(agent.prefetcher._pending.values())).result(timeout=5)
+
+    results = agent._run_calls([
+        {"tool": "systemd", "arguments": {"action": "restart", "service": "docker"}},
+        {"tool": "system_status", "arguments": {"component": "docker"}},
+    ])
+
+    assert results[1][0] == {"output": "docker: active"}
+    assert agent.prefetcher.hits == 0
+    assert agent.prefetcher.wasted == 1
+
+
+def test_prefetch_used_without_intervening_change():
+    agent = make_agent()
+    agent.prefetcher.start([{"tool": "system_status", "arguments": {"component": "docker"}}])
+
+    results = agent._run_calls([{"tool": "system_status", "arguments": {"component": "docker"}}])
+
+    assert results[0][0] == {"output": "docker: failed"}
+    assert agent.prefetcher.hits == 1
+
+
+def test_discard_drops_running_prefetches():
+    release = threading.Event()
+    prefetcher = Prefetcher(lambda tool, args: release.wait(5) and {"output": "old"})
+    prefetcher.start([{"tool": "system_status", "arguments": {"component": "disk"}}])
+    prefetcher.discard()
+    release.set()
+
+    assert prefetcher.take("system_status", {"component": "disk"}) is None
+    assert prefetcher.wasted == 1
+
+
+def test_guesses_at_most_one_expensive_call():
+    calls = guess_calls("deployments and pods using too much disk")
+
+    assert [c["tool"] for c in calls] == ["kubernetes", "system_status"]
+
+
+def test_prefetches_share_the_tool_slots():
+    agent = MCPAgent(llm=object(), response_cache=False)
+    agent.tool_slots = threading.BoundedSemaphore(1)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def probe(args):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return {"output": args["component"]}
+
+    agent._handlers["system_status"] = probe
+    agent.prefetcher.start([{"tool": "system_status", "arguments": {"component": "disk"}},
+                            {"tool": "system_status", "arguments": {"component": "memory"}}])
+    for component in ("disk", "memory"):
+        assert agent.prefetcher.take("system_status", {"component": component}) == {"output": component}
+    assert peak[0] == 1
+
+
+def test_trace_counts_prefetch_hits_and_misses():
+    agent = make_agent()
+    agent.trace = Trace("status")
+    agent._prefetch("is docker running? check disk space")
+    agent._run_calls([{"tool": "system_status", "arguments": {"component": "docker"}}])
+    trace = agent.trace.finish()
+
+    assert trace.prefetch_counts() == (2, 1)
+    assert "prefetch: 1 of 2 used, 1 missed" in trace.summary()
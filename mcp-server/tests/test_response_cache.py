@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from agent import MCPAgent  # noqa: E402
+from mock_ollama import MockOllama  # noqa: E402
+from ollama_client import OllamaClient  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+def call(command):
+    return {"tool": "execute_command", "arguments": {"command": command}, "explanation": command}
+
+
+@pytest.fixture
+def mock():
+    server = MockOllama().start()
+    yield server
+    server.stop()
+
+
+def make_agent(mock, tmp_path):
+    agent = MCPAgent(llm=OllamaClient(host=mock.host), stream=False, auto_approve=True, prefetch=False)
+    agent.response_cache = ResponseCache("test", cache_dir=str(tmp_path))
+    return agent
+
+
+def test_successful_call_is_cached(mock, tmp_path):
+    mock.responses = [json.dumps(call("echo ok"))]
+    agent = make_agent(mock, tmp_path)
+    agent.process_request("say ok")
+
+    assert agent.response_cache.lookup("say ok")["arguments"]["command"] == "echo ok"
+
+
+def test_failed_call_is_not_cached(mock, tmp_path):
+    mock.responses = [json.dumps(call("exit 3"))]
+    agent = make_agent(mock, tmp_path)
+    agent.process_request("fail please")
+
+    assert agent.response_cache.lookup("fail please") is None
+
+
+def test_plan_caches_only_succeeded_calls(mock, tmp_path):
+    mock.responses = [json.dumps([call("echo one"), call("false")]), "Done."]
+    agent = make_agent(mock, tmp_path)
+    agent.process_request("run the plan")
+
+    assert agent.response_cache.lookup("run the plan")["arguments"]["command"] == "echo one"
@@ -0,0 +1,38 @@
+import threading
+
+from agent import MCPAgent
+
+
+def make_agent():
+    return MCPAgent(llm=object(), auto_approve=True, response_cache=False, prefetch=False)
+
+
+def test_read_only_command_output_printed_once(capsys):
+    agent = make_agent()
+    [(result, streamed)] = agent._run_calls([{"tool": "execute_command", "arguments": {"command": "echo hello"}}])
+    agent._print_result(result, streamed)
+
+    assert streamed
+    assert capsys.readouterr().out.count("hello") == 1
+
+
+def test_streaming_does_not_depend_on_thread(capsys):
+    agent = make_agent()
+    results = []
+    worker = threading.Thread(target=lambda: results.extend(
+        agent._run_calls([{"tool": "execute_command", "arguments": {"command": "echo hello"}}])))
+    worker.start()
+    worker.join()
+
+    assert results[0][1]
+    assert "hello" in capsys.readouterr().out
+
+
+def test_parallel_commands_are_not_streamed(capsys):
+    agent = make_agent()
+    results = agent._run_calls([{"tool": "execute_command", "arguments": {"command": "echo one"}},
+                                {"tool": "execute_command", "arguments": {"command": "echo two"}}])
+
+    assert [streamed for _, streamed in results] == [False, False]
+    assert [r["stdout"].strip() for r, _ in results] == ["one", "two"]
+    assert "one" not in capsys.readouterr().out
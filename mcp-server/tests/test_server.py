@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+
+def _stub_mcp():
+    """Minimal mcp.server / mcp.types so server.py imports without the SDK"""
+    class Server:
+        def __init__(self, name):
+            self.name = name
+
+        def list_tools(self):
+            return lambda fn: fn
+
+        def call_tool(self):
+            return lambda fn: fn
+
+    class TextContent:
+        def __init__(self, type, text):
+            self.type = type
+            self.text = text
+
+    class Tool:
+        def __init__(self, **fields):
+            self.__dict__.update(fields)
+
+    modules = {
+        "mcp": types.ModuleType("mcp"),
+        "mcp.server": types.ModuleType("mcp.server"),
+        "mcp.server.stdio": types.ModuleType("mcp.server.stdio"),
+        "mcp.types": types.ModuleType("mcp.types"),
+    }
+    modules["mcp.server"].Server = Server
+    modules["mcp.server.stdio"].stdio_server = None
+    modules["mcp.types"].TextContent = TextContent
+    modules["mcp.types"].Tool = Tool
+    sys.modules.update(modules)
+
+
+try:
+    import mcp.server  # noqa: F401
+except ImportError:
+    _stub_mcp()
+
+import server  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_semaphore():
+    # The concurrency limiter belongs to the event loop of the test that created it
+    server._semaphore = None
+    yield
+    server._semaphore = None
+
+
+def call_concurrently(calls):
+    """Results of the calls run at once, and the wall time until the last one returned"""
+    async def run_all():
+        started = time.monotonic()
+        results = await asyncio.gather(*(server.call_tool(name, arguments) for name, arguments in calls))
+        return results, time.monotonic() - started
+
+    return asyncio.run(run_all())
+
+
+def test_slow_commands_run_concurrently():
+    n, seconds = 4, 0.5
+    results, wall = call_concurrently([("execute_command", {"command": f"sleep {seconds}"})] * n)
+
+    assert all('"returncode": 0' in content[0].text for content in results)
+    assert wall < 2 * seconds
+
+
+def test_thread_handlers_are_cut_off_at_their_timeout(monkeypatch):
+    spec = server.REGISTRY.get("network")
+    monkeypatch.setattr(spec, "handler", lambda args: time.sleep(1) or {"output": "late"})
+    monkeypatch.setattr(spec, "timeout", 0.2)
+
+    [(content,)], wall = call_concurrently([("network", {"action": "status"})])
+
+    assert content.text == "Error: network timed out after 0.2 seconds"
+    assert wall < 0.5
@@ -0,0 +1,24 @@
+import time
+
+from system_collectors import CpuSampler
+
+
+def test_recent_snapshot_is_reused():
+    sampler = CpuSampler(interval=0.2, max_age=10)
+    sampler.usage()
+    time.sleep(0.15)
+
+    started = time.monotonic()
+    assert "cpu" in sampler.usage()
+    assert time.monotonic() - started < 0.1
+
+
+def test_old_snapshot_is_replaced_by_a_fresh_sample():
+    sampler = CpuSampler(interval=0.2, max_age=10)
+    sampler.usage()
+    # Pretend the last call was a minute ago
+    sampler._last = (sampler._last[0] - 60, sampler._last[1])
+
+    started = time.monotonic()
+    assert "cpu" in sampler.usage()
+    assert time.monotonic() - started >= 0.2
@@ -0,0 +1,23 @@
+from system_context import FIELDS, SystemContextCache
+
+
+def test_context_describes_the_given_directory(tmp_path):
+    (tmp_path / ".git").mkdir()
+    text = SystemContextCache().render(cwd=str(tmp_path))
+
+    assert f"Current Directory: {tmp_path}" in text
+    assert "Git repo: local repo" in text
+
+
+def test_refresh_keeps_fields_another_process_refreshed(tmp_path, monkeypatch):
+    monkeypatch.setitem(FIELDS, "mem_available", (60, lambda: "old"))
+    stale = SystemContextCache(cache_dir=str(tmp_path))
+    stale.refresh(["mem_available", "kernel"])
+
+    # A background refresher writes a newer value after `stale` loaded its entries
+    monkeypatch.setitem(FIELDS, "mem_available", (60, lambda: "new"))
+    SystemContextCache(cache_dir=str(tmp_path)).refresh(["mem_available"])
+    stale.refresh(["kernel"])
+
+    assert stale.entries["mem_available"]["value"] == "new"
+    assert SystemContextCache(cache_dir=str(tmp_path)).entries["mem_available"]["value"] == "new"
@@ -0,0 +1,48 @@
+import pytest
+
+from tool_registry import REGISTRY, command_is_read_only
+
+
+@pytest.mark.parametrize("command", [
+    "df -h",
+    "cat /etc/os-release | grep NAME",
+    "ip addr",
+    "ip -br a",
+    "ip route show",
+    "ip link show dev eth0",
+    "journalctl -u sshd -n 100",
+    "kubectl get pods -A",
+    "systemctl status docker",
+])
+def test_read_only_commands(command):
+    assert command_is_read_only({"command": command})
+
+
+@pytest.mark.parametrize("command", [
+    "env rm -rf /tmp/x",
+    "env touch /tmp/f",
+    "printenv",
+    "ip link set eth0 down",
+    "ip route del default",
+    "ip addr add 10.0.0.2/24 dev eth0",
+    "ip -br link set eth0 up",
+    "hostname newname",
+    "date -s '2020-01-01'",
+    "sort -o /tmp/out /tmp/in",
+    "uniq /tmp/in /tmp/out",
+    "journalctl --vacuum-size=100M",
+    "journalctl --vacuum-time=2d",
+    "journalctl --rotate",
+    "journalctl --flush",
+    "sensors -s",
+    "tail -f /var/log/syslog",
+    "kubectl delete pod web-1",
+    "echo hi > /tmp/f",
+])
+def test_commands_that_change_state_are_not_read_only(command):
+    assert not command_is_read_only({"command": command})
+
+
+def test_state_changing_commands_are_never_cached():
+    spec = REGISTRY.get("execute_command")
+    assert spec.ttl({"command": "env touch /tmp/zz"}) == 0
@@ -0,0 +1,19 @@
+from tool_result_cache import ToolResultCache, cache_key
+
+
+def test_inner_whitespace_is_part_of_the_key():
+    assert cache_key("execute_command", {"command": 'echo "a  b"'}) != \
+        cache_key("execute_command", {"command": 'echo "a b"'})
+
+
+def test_surrounding_whitespace_and_ignored_args_do_not_matter():
+    assert cache_key("execute_command", {"command": " df -h\n", "fresh": True}) == \
+        cache_key("execute_command", {"command": "df -h"})
+
+
+def test_cached_result_is_only_returned_for_the_same_command():
+    cache = ToolResultCache()
+    cache.put("execute_command", {"command": 'echo "a  b"'}, {"stdout": "a  b\n", "returncode": 0})
+
+    assert cache.get("execute_command", {"command": 'echo "a b"'}, ttl=10) is None
+    assert cache.get("execute_command", {"command": 'echo "a  b"'}, ttl=10)[0]["stdout"] == "a  b\n"
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Tool Call Parser
+Finds tool calls in LLM output: the first JSON object (or list of objects)
+anywhere in the text, even after a preamble or inside a code fence, detected
+incrementally while tokens stream in. Small-model glitches such as single
+quotes, trailing commas and Python literals are repaired, and every call is
+validated and normalized against the tool registry's schemas.
+"""
+
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+from tool_registry import REGISTRY, ToolRegistry
+
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _repair(text: str) -> str:
+    """Rewrite almost-JSON (single quotes, trailing commas, True/False/None) as JSON"""
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+            i += 1
+            while i < n and text[i] != quote:
+                if text[i] == "\\" and i + 1 < n:
+                    if quote == "'" and text[i + 1] == "'":
+                        out.append("'")
+                    else:
+                        out.append(text[i:i + 2])
+                    i += 2
+                    continue
+                out.append('\\"' if text[i] == '"' else text[i])
+                i += 1
+            out.append('"')
+            i += 1
+        elif ch == ",":
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and text[j] in "}]":
+                i += 1
+                continue
+            out.append(ch)
+            i += 1
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(PYTHON_LITERALS.get(word, word))
+            i = j
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def lenient_loads(text: str):
+    """json.loads that tolerates common small-model glitches"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_repair(text))
+
+
+def validate_call(call: Dict[str, Any], registry: ToolRegistry = REGISTRY) -> Tuple[Optional[dict], List[str]]:
+    """Normalized tool call, or None and the reasons it does not match the tool's schema"""
+    name = call.get("tool")
+    if name is None and call.get("name") in registry:
+        # OpenAI-style {"name": ..., "arguments": ...}
+        name = call["name"]
+    spec = registry.get(name)
+    if spec is None:
+        return None, [f"unknown tool {name!r} (available: {', '.join(registry.names)})"]
+
+    args = call.get("arguments") or {}
+    if isinstance(args, str):
+        try:
+            args = lenient_loads(args)
+        except json.JSONDecodeError:
+            pass
+    if not isinstance(args, dict):
+        return None, [f"{name}: arguments must be an object"]
+    args = dict(args)
+    # Arguments placed next to "tool" instead of inside "arguments"
+    for key in spec.properties:
+        if key in call and key not in args:
+            args[key] = call[key]
+
+    errors = [f"{name}: missing required argument {key!r}" for key in spec.required if args.get(key) in (None, "")]
+    for key, value in list(args.items()):
+        prop = spec.properties.get(key)
+        if prop is None or value is None:
+            continue
+        if prop.get("type") == "integer" and not isinstance(value, int):
+            try:
+                args[key] = value = int(str(value).strip())
+            except ValueError:
+                errors.append(f"{name}: {key} must be an integer")
+                continue
+        elif prop.get("type") == "string" and isinstance(value, (int, float, bool)):
+            args[key] = value = str(value)
+        if "enum" in prop and value not in prop["enum"]:
+            errors.append(f"{name}: {key} must be one of {'|'.join(prop['enum'])}, not {value!r}")
+    if errors:
+        return None, errors
+
+    normalized = {"tool": name, "arguments": args}
+    if call.get("explanation"):
+        normalized["explanation"] = call["explanation"]
+    return normalized, []
+
+
+def _as_calls(value, registry: ToolRegistry = REGISTRY) -> Optional[list]:
+    """The tool call dicts in a parsed JSON value, or None if it is not a tool call"""
+    if isinstance(value, dict):
+        value = value.get("tool_calls", [value])
+    if not isinstance(value, list) or not value:
+        return None
+    if not all(isinstance(c, dict) and ("tool" in c or c.get("name") in registry) for c in value):
+        return None
+    return value
+
+
+class ToolCallExtractor:
+    """Incrementally finds the first tool call JSON anywhere in streamed text.
+
+    feed() returns True as soon as a complete, schema-valid call (or list of
+    calls) has arrived, so the rest of the generation can be cancelled.
+    Candidates that are not JSON or not tool calls are skipped; calls that
+    parse but fail validation are remembered in errors.
+    """
+
+    def __init__(self, registry: ToolRegistry = REGISTRY):
+        self.registry = registry
+        self.text = ""
+        self.calls: Optional[list] = None
+        self.span: Optional[Tuple[int, int]] = None
+        self.errors: List[str] = []
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._quote = None
+        self._escape = False
+
+    def feed(self, token: str) -> bool:
+        self.text += token
+        if self.calls is None:
+            self._scan()
+        return self.calls is not None
+
+    def _scan(self):
+        text = self.text
+        while self._pos < len(text):
+            ch = text[self._pos]
+            self._pos += 1
+            if self._start is None:
+                if ch in "{[":
+                    self._start = self._pos - 1
+                    self._depth = 1
+                    self._quote = None
+                continue
+            if self._quote:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == self._quote:
+                    self._quote = None
+            elif ch == '"':
+                self._quote = ch
+            elif ch == "'" and text[:self._pos - 1].rstrip()[-1:] in ("{", "[", ",", ":"):
+                # Single-quoted string in key/value position (not an apostrophe in prose)
+                self._quote = ch
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._check(self._start, self._pos):
+                        return
+                    # Not a tool call: look for one starting inside this candidate
+                    self._pos = self._start + 1
+                    self._start = None
+
+    def _check(self, start: int, end: int) -> bool:
+        try:
+            calls = _as_calls(lenient_loads(self.text[start:end]), self.registry)
+        except (json.JSONDecodeError, RecursionError):
+            return False
+        if calls is None:
+            return False
+        valid = []
+        for call in calls:
+            normalized, errors = validate_call(call, self.registry)
+            if normalized:
+                valid.append(normalized)
+            self.errors.extend(e for e in errors if e not in self.errors)
+        if not valid:
+            return False
+        self.calls = valid
+        self.span = (start, end)
+        return True
+
+    def finish(self) -> Optional[list]:
+        """Final pass once the stream has ended: retry past any unclosed opening bracket"""
+        while self.calls is None and self._start is not None:
+            self._pos = self._start + 1
+            self._start = None
+            self._scan()
+        return self.calls
+
+    @property
+    def tool_call_text(self) -> Optional[str]:
+        if self.span is None:
+            return None
+        return self.text[self.span[0]:self.span[1]]
+
+
+def extract_tool_calls(text: str, registry: ToolRegistry = REGISTRY) -> Tuple[Optional[list], List[str]]:
+    """(validated tool calls or None, validation errors) for a complete LLM response"""
+    extractor = ToolCallExtractor(registry)
+    extractor.feed(text)
+    return extractor.finish(), extractor.errors
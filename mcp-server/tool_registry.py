@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Tool Registry
+Single table of every tool the agent and the MCP server expose: name,
+JSON schema, default handler, read-only rules, timeout and cost hints.
+The agent's prompt catalogue and the server's list_tools are generated
+from it, and dispatch is a dict lookup.
+"""
+
+import json
+import os
+import re
+import shlex
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+from system_tools import (
+    sway_tool, waybar_tool, network_tool, systemd_tool, kubernetes_tool, network_info_tool, configure_network_tool,
+    COMMAND_TIMEOUT, KUBECTL_TIMEOUT
+)
+
+PROMPT_HEADER = """You have access to system tools via MCP (Model Context Protocol).
+
+When the user asks you to do something, respond with a JSON tool call in this format:
+{
+  "tool": "tool_name",
+  "arguments": {"arg1": "value1"},
+  "explanation": "what this will do"
+}
+
+If the request needs several independent checks, respond with a JSON list of
+tool calls instead; read-only calls run in parallel and you get all results back:
+[{"tool": "system_status", "arguments": {"component": "disk"}, "explanation": "Check disk"}, {"tool": "kubernetes", "arguments": {"action": "check-health"}, "explanation": "Check pods"}]
+
+Available tools:"""
+
+
+class ToolSpec:
+    """Description of one tool.
+
+    read_only is either a bool for the whole tool, the set of actions that
+    only inspect state (for action based tools), or a predicate on the
+    arguments. cache_ttl is how long a read-only result may be reused: seconds,
+    a per-action dict or a function of the arguments. timeout bounds a call
+    in seconds (the MCP server cancels it after that). cost ("low", "medium",
+    "high") is how expensive a call is to run; speculative prefetch spends a
+    per-request budget by it. Tools with in_prompt=False are served over MCP
+    but not advertised to the agent's LLM; agent_only tools need agent state
+    and are not served over MCP.
+    """
+
+    def __init__(self, name: str, description: str, properties: Dict[str, dict],
+                 required: Tuple[str, ...] = (), handler: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 read_only=True, timeout: float = COMMAND_TIMEOUT, cost: str = "low", args_help: str = "",
+                 examples: Tuple[Tuple[dict, str], ...] = (), notes: Tuple[str, ...] = (),
+                 in_prompt: bool = True, agent_only: bool = False, cache_ttl=0):
+        self.name = name
+        self.description = description
+        self.properties = properties
+        self.required = required
+        self.handler = handler
+        self.read_only = read_only
+        self.timeout = timeout
+        self.cost = cost
+        self.args_help = args_help
+        self.examples = examples
+        self.notes = notes
+        self.in_prompt = in_prompt
+        self.agent_only = agent_only
+        self.cache_ttl = cache_ttl
+
+    def is_read_only(self, args: Dict[str, Any]) -> bool:
+        """Whether this particular call only inspects state"""
+        if isinstance(self.read_only, bool):
+            return self.read_only
+        if callable(self.read_only):
+            return self.read_only(args)
+        return args.get("action") in self.read_only
+
+    def ttl(self, args: Dict[str, Any]) -> float:
+        """Seconds a result of this call may be reused (0 = never)"""
+        if not self.is_read_only(args):
+            return 0
+        if callable(self.cache_ttl):
+            return self.cache_ttl(args)
+        if isinstance(self.cache_ttl, dict):
+            return self.cache_ttl.get(args.get("action"), 0)
+        return self.cache_ttl
+
+    @property
+    def input_schema(self) -> Dict[str, Any]:
+        schema = {"type": "object", "properties": self.properties}
+        if self.required:
+            schema["required"] = list(self.required)
+        return schema
+
+    def prompt_entry(self) -> str:
+        lines = [f"- {self.name}: {self.description}" + (f" (args: {self.args_help})" if self.args_help else "")]
+        for arguments, explanation in self.examples:
+            call = {"tool": self.name, "arguments": arguments, "explanation": explanation}
+            lines.append(f"  Example: {json.dumps(call)}")
+        lines.extend(f"  {note}" for note in self.notes)
+        return "\n".join(lines)
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._tools: Dict[str, ToolSpec] = {}
+        self._prompt: Optional[str] = None
+        self._schema: Optional[Dict[str, Any]] = None
+
+    def register(self, spec: ToolSpec):
+        self._tools[spec.name] = spec
+        self._prompt = None
+        self._schema = None
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._tools.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __iter__(self) -> Iterator[ToolSpec]:
+        return iter(self._tools.values())
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def prompt_section(self) -> str:
+        """Tool catalogue for the LLM system prompt (built once, then cached)"""
+        if self._prompt is None:
+            entries = "\n\n".join(spec.prompt_entry() for spec in self._tools.values() if spec.in_prompt)
+            self._prompt = f"{PROMPT_HEADER}\n{entries}\n"
+        return self._prompt
+
+
+    def response_schema(self) -> Dict[str, Any]:
+        """JSON schema for Ollama's `format` option on tool-selection turns.
+
+        The reply must be one valid tool call, a list of them, or
+        {"answer": "..."} for questions that need no tool.
+        """
+        if self._schema is None:
+            call = {"anyOf": [
+                {"type": "object",
+                 "properties": {"tool": {"type": "string", "enum": [spec.name]},
+                                "arguments": spec.input_schema,
+                                "explanation": {"type": "string"}},
+                 "required": ["tool", "arguments"]}
+                for spec in self._tools.values() if spec.in_prompt
+            ]}
+            self._schema = {"anyOf": [
+                *call["anyOf"],
+                {"type": "array", "items": call, "minItems": 1},
+                {"type": "object", "properties": {"answer": {"type": "string"}}, "required": ["answer"]},
+            ]}
+        return self._schema
+
+
+# Commands execute_command may treat as read-only (safe to run in parallel,
+# cache or prefetch); tools with subcommands list their read-only ones.
+# Commands that can also set state (hostname, date, env, sort -o, uniq OUT)
+# are left out.
+READ_ONLY_COMMANDS = {
+    "cat", "ls", "df", "du", "free", "uptime", "uname", "whoami", "id", "ps",
+    "lsblk", "lscpu", "lsusb", "lspci", "nproc", "head", "tail", "wc", "grep",
+    "stat", "file", "which", "echo", "sensors", "journalctl",
+}
+READ_ONLY_SUBCOMMANDS = {
+    "kubectl": {"get", "describe", "logs", "top", "version"},
+    "docker": {"ps", "images", "inspect", "logs", "version", "info"},
+    "systemctl": {"status", "list-units", "list-unit-files", "is-active", "is-enabled", "show", "--failed"},
+}
+# Flags that make an otherwise read-only command change state
+MUTATING_FLAGS = {
+    "journalctl": re.compile(r"^--(vacuum-|rotate|flush|sync|relinquish-var|smart-relinquish-var|setup-keys|"
+                             r"update-catalog)"),
+    "sensors": re.compile(r"^(-s|--set)$"),
+}
+# `ip [-br] OBJECT [show|list] ...` for these objects; anything else (set, add, del, flush) changes state
+IP_OBJECTS = {"addr", "address", "a", "route", "r", "link", "l"}
+IP_VIEW_VERBS = {"show", "list", "ls"}
+# Output changes from second to second, so never reuse it
+TIME_VARYING_COMMANDS = {"uptime", "ps"}
+# Flags that make a command run until interrupted
+FOLLOW_FLAGS = {"-f", "--follow", "-w", "--watch"}
+
+
+def _command_words(command: str) -> Optional[List[List[str]]]:
+    """Words of each pipeline segment, or None if the command uses other shell syntax"""
+    if any(c in command for c in ";&<>`$\n"):
+        return None
+    try:
+        segments = [shlex.split(segment) for segment in command.split("|")]
+    except ValueError:
+        return None
+    return segments if all(segments) else None
+
+
+def _ip_is_read_only(words: List[str]) -> bool:
+    rest = [word for word in words[1:] if word not in ("-br", "-brief")]
+    if not rest or rest[0] not in IP_OBJECTS:
+        return False
+    return len(rest) == 1 or rest[1] in IP_VIEW_VERBS
+
+
+def command_is_read_only(args: Dict[str, Any]) -> bool:
+    """Whether a shell command only inspects state (conservative allowlist)"""
+    segments = _command_words(args.get("command", ""))
+    if not segments:
+        return False
+    for words in segments:
+        program = os.path.basename(words[0])
+        if FOLLOW_FLAGS.intersection(words):
+            return False
+        if program == "ip":
+            if not _ip_is_read_only(words):
+                return False
+        elif program in READ_ONLY_SUBCOMMANDS:
+            if len(words) < 2 or words[1] not in READ_ONLY_SUBCOMMANDS[program]:
+                return False
+        elif program not in READ_ONLY_COMMANDS:
+            return False
+        if program in MUTATING_FLAGS and any(MUTATING_FLAGS[program].match(word) for word in words[1:]):
+            return False
+    return True
+
+
+def command_ttl(args: Dict[str, Any]) -> float:
+    segments = _command_words(args.get("command", "")) or [[""]]
+    if any(os.path.basename(words[0]) in TIME_VARYING_COMMANDS for words in segments):
+        return 0
+    return 10
+
+
+def _action(actions: str, description: str = "") -> dict:
+    return {"type": "string", "enum": actions.split("|"), "description": description or "Action to perform"}
+
+
+def _string(description: str) -> dict:
+    return {"type": "string", "description": description}
+
+
+def _integer(description: str) -> dict:
+    return {"type": "integer", "description": description}
+
+
+REGISTRY = ToolRegistry()
+
+REGISTRY.register(ToolSpec(
+    "execute_command", "Run bash commands",
+    {"command": _string("The bash command to execute"),
+     "working_dir": _string("Working directory (optional, defaults to current)")},
+    required=("command",), read_only=command_is_read_only, cache_ttl=command_ttl, timeout=30, cost="medium",
+    args_help="command, working_dir",
+    examples=(({"command": "cat /etc/os-release"}, "Check OS version"),
+              ({"command": "df -h"}, "Check disk space")),
+    notes=("Use this for: OS version, hostname, date/time, uptime, specific file operations, package info",),
+))
+
+REGISTRY.register(ToolSpec(
+    "read_file", "Read file contents",
+    {"path": _string("Absolute path to the file"),
+     "offset": _integer("Byte offset to start reading at (optional)"),
+     "length": _integer("Number of bytes to read from offset (optional)"),
+     "start_line": _integer("First line to return, 1-based (optional)"),
+     "end_line": _integer("Last line to return, inclusive (optional)"),
+     "tail": _integer("Return only the last N lines (optional)")},
+    required=("path",), cache_ttl=10, args_help="path, optional: offset + length in bytes, start_line + end_line, tail = last N lines",
+    examples=(({"path": "/etc/hostname"}, "Read hostname file"),
+              ({"path": "/var/log/syslog", "tail": 50}, "Show last 50 lines of syslog"),
+              ({"path": "/var/log/app.log", "start_line": 1000, "end_line": 1050}, "Show lines 1000-1050")),
+    notes=("Large files are capped; use a range or tail instead of reading them whole.",),
+))
+
+REGISTRY.register(ToolSpec(
+    "write_file", "Write to files",
+    {"path": _string("Absolute path to the file"), "content": _string("Content to write")},
+    required=("path", "content"), read_only=False, args_help="path, content",
+))
+
+REGISTRY.register(ToolSpec(
+    "sway", "Manage Sway window manager",
+    {"action": _action("show-config|list-keybindings|add-keybinding|reload"),
+     "key": _string("Key combination, for add-keybinding"),
+     "command": _string("Command to bind, for add-keybinding")},
+    required=("action",), handler=sway_tool, read_only={"show-config", "list-keybindings"},
+    cache_ttl={"show-config": 300, "list-keybindings": 300},
+    args_help="action = show-config|list-keybindings|add-keybinding|reload, key = for add-keybinding, command = for add-keybinding",
+    examples=(({"action": "show-config"}, "Show Sway configuration file"),
+              ({"action": "list-keybindings"}, "List all Sway keybindings"),
+              ({"action": "add-keybinding", "key": "Mod+d", "command": "rofi -show drun"}, "Add Mod+d keybinding for rofi"),
+              ({"action": "reload"}, "Reload Sway configuration")),
+))
+
+REGISTRY.register(ToolSpec(
+    "waybar", "Manage Waybar status bar",
+    {"action": _action("show-config|restart|reload")},
+    required=("action",), handler=waybar_tool, read_only={"show-config"}, cache_ttl={"show-config": 300},
+    args_help="action = show-config|restart|reload",
+    examples=(({"action": "show-config"}, "Show Waybar configuration"),
+              ({"action": "restart"}, "Restart Waybar"),
+              ({"action": "reload"}, "Reload Waybar config without restarting")),
+))
+
+REGISTRY.register(ToolSpec(
+    "network", "Manage network configuration",
+    {"action": _action("status|connections|wifi-list|set-dns"),
+     "connection": _string("Connection name, for set-dns"),
+     "dns": _string("DNS server, for set-dns")},
+    required=("action",), handler=network_tool, read_only={"status", "connections", "wifi-list"},
+    cache_ttl={"status": 15, "connections": 15, "wifi-list": 60}, cost="medium",
+    args_help="action = status|connections|wifi-list|set-dns, connection = for set-dns, dns = for set-dns",
+    examples=(({"action": "status"}, "Show network device status"),
+              ({"action": "connections"}, "List network connections"),
+              ({"action": "set-dns", "connection": "Wired connection 1", "dns": "8.8.8.8"}, "Set DNS to Google DNS")),
+))
+
+REGISTRY.register(ToolSpec(
+    "network_info", "Get network interface information",
+    {}, handler=network_info_tool, cache_ttl=15, in_prompt=False,
+))
+
+REGISTRY.register(ToolSpec(
+    "configure_network", "Generate (without running) the nmcli command to configure an interface",
+    {"interface": _string("Network interface name (e.g., eth0, wlan0)"),
+     "setting_type": {"type": "string", "description": "Type of setting: static_ip, dns, dhcp",
+                      "enum": ["static_ip", "dns", "dhcp"]},
+     "value": _string("Value for the setting (IP address, DNS server, etc.)")},
+    required=("interface", "setting_type"), handler=configure_network_tool,
+    args_help="interface, setting_type = static_ip|dns|dhcp, value", in_prompt=False,
+))
+
+REGISTRY.register(ToolSpec(
+    "systemd", "Manage system services",
+    {"action": _action("status|restart|enable|disable|logs|list"),
+     "service": _string("Service name"),
+     "lines": _string("Number of log lines, for logs")},
+    required=("action",), handler=systemd_tool, read_only={"status", "logs", "list"},
+    cache_ttl={"status": 10, "logs": 5, "list": 30},
+    args_help="action = status|restart|enable|disable|logs|list, service = service name, lines = for logs",
+    examples=(({"action": "status", "service": "docker"}, "Check Docker service status"),
+              ({"action": "restart", "service": "networkmanager"}, "Restart NetworkManager"),
+              ({"action": "logs", "service": "sshd", "lines": "100"}, "Show last 100 lines of SSH logs"),
+              ({"action": "list"}, "List all systemd services")),
+))
+
+REGISTRY.register(ToolSpec(
+    "kubernetes", "Manage Kubernetes resources",
+    {"action": _action("pods|deployments|services|namespaces|all|check-health|logs|describe"),
+     "namespace": _string("Namespace, or 'all' for every namespace (optional)"),
+     "pod": _string("Pod name, required for logs/describe"),
+     "container": _string("Container name, for logs (optional)"),
+     "tail": _string("Number of log lines, for logs (optional)"),
+     "resource": _string("Other resource type to list (optional)")},
+    required=("action",), handler=kubernetes_tool, read_only=True, timeout=KUBECTL_TIMEOUT, cost="high",
+    cache_ttl=lambda args: 5 if args.get("action") == "logs" else 15,
+    args_help="action = pods|deployments|services|namespaces|all|check-health|logs|describe, namespace = optional|all, pod = required for logs/describe, tail = optional for logs, resource = optional",
+    examples=(({"action": "pods", "namespace": "grafana"}, "Get pods in grafana namespace"),
+              ({"action": "pods", "namespace": "all"}, "Get pods in all namespaces"),
+              ({"action": "check-health"}, "Check for any pods with issues across entire cluster"),
+              ({"action": "logs", "pod": "grafana-6cf4bffb9-9mlkq", "namespace": "grafana", "tail": "50"}, "Get last 50 logs from grafana pod"),
+              ({"action": "describe", "pod": "gpu-operator-node-feature-discovery-prune-nf4tp", "namespace": "gpu-operator"}, "Describe pod to see why it's in error state")),
+    notes=('Use action "check-health" when user asks about problems, issues, or health status.',
+           "IMPORTANT: When showing logs or describing a pod, use the SAME namespace where that pod was found!"),
+))
+
+REGISTRY.register(ToolSpec(
+    "system_status", "Check system resources ONLY",
+    {"component": {"type": "string", "description": "Component to check",
+                   "enum": ["cpu", "memory", "disk", "network", "docker", "kubernetes", "all"]}},
+    required=("component",), cache_ttl=5, timeout=10, cost="medium",
+    args_help="component = cpu|memory|disk|network|docker|kubernetes|all",
+    examples=(({"component": "disk"}, "Check disk usage"),),
+    notes=("Use this ONLY for: memory usage, disk space summary, CPU info",
+           'DO NOT use this for OS version - use execute_command with "cat /etc/os-release" instead'),
+))
+
+REGISTRY.register(ToolSpec(
+    "recall_output", "Read more of an earlier tool output that was stored as a handle",
+    {"handle": _string("Output handle from the conversation, e.g. out-3"),
+     "start_line": _integer("First line to return, 1-based (optional)"),
+     "end_line": _integer("Last line to return, inclusive (optional)")},
+    required=("handle",), agent_only=True,
+    args_help="handle, optional: start_line + end_line",
+    examples=(({"handle": "out-3", "start_line": 200, "end_line": 400}, "Show more of the earlier pod listing"),),
+))
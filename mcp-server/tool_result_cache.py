@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tool Result Cache
+In-memory memoization of read-only tool results within a session, keyed on
+tool name plus normalized arguments. Entries expire after the tool's TTL,
+the cache is bounded by entry count and size (least recently used first),
+and everything is dropped as soon as a mutating tool runs.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+MAX_ENTRIES = 128
+MAX_BYTES = 4 * 1024 * 1024
+# Arguments that never change what a tool returns
+IGNORED_ARGS = {"fresh"}
+
+
+def cache_key(tool: str, args: Dict[str, Any]) -> str:
+    normalized = {}
+    for key, value in args.items():
+        if key in IGNORED_ARGS or value in (None, ""):
+            continue
+        # Only surrounding whitespace: inside a command it can be significant (echo "a  b")
+        normalized[key] = value.strip() if isinstance(value, str) else value
+    return f"{tool}:{json.dumps(normalized, sort_keys=True)}"
+
+
+class ToolResultCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, tool: str, args: Dict[str, Any], ttl: float) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(result, age in seconds) if a fresh enough result is cached"""
+        key = cache_key(tool, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > ttl:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2], time.monotonic() - entry[0]
+
+    def contains(self, tool: str, args: Dict[str, Any], ttl: float) -> bool:
+        """Whether get() would hit, without counting it or touching LRU order"""
+        with self._lock:
+            entry = self._entries.get(cache_key(tool, args))
+            return entry is not None and time.monotonic() - entry[0] <= ttl
+
+    def put(self, tool: str, args: Dict[str, Any], result: Dict[str, Any]):
+        if not isinstance(result, dict) or result.get("error") or result.get("returncode", 0) != 0:
+            # Failures are worth retrying, not remembering
+            return
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes // 4:
+            return
+        key = cache_key(tool, args)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._size -= old[1]
+            self._entries[key] = (time.monotonic(), size, result)
+            self._size += size
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self):
+        """Drop everything (called after any tool that changes system state)"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
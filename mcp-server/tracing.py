@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Latency Tracing
+Records where the time of one agent request goes: system context, prompt
+building, each LLM turn (with Ollama's prompt-eval and generation counts and
+durations), tool-call parsing, confirmation, each tool (with the CPU time of
+its subprocesses) and output handling. Traces can be printed as a summary
+(--profile) and appended as JSONL for offline analysis.
+
+Usage: python3 tracing.py [--log FILE]   # per-phase percentiles over all traces
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple
+
+from system_context import CACHE_DIR
+
+TRACE_FILE = "traces.jsonl"
+DEFAULT_TRACE_PATH = os.path.join(CACHE_DIR, TRACE_FILE)
+
+# Ollama reports durations in nanoseconds
+OLLAMA_STATS = ("load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration",
+                "total_duration")
+
+
+def prefetch_counts(phases: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """(prefetches started, prefetched results used) across trace phases"""
+    started = sum(p.get("started", 0) for p in phases if p["phase"] == "prefetch")
+    hits = sum(1 for p in phases if p["phase"] == "tool" and p.get("source") == "prefetch")
+    return started, hits
+
+
+def _child_cpu() -> float:
+    """User + system CPU seconds of finished child processes so far"""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def ollama_stats(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Eval counts and durations (in seconds) from a final /api/chat or /api/generate response"""
+    stats = {}
+    for key in OLLAMA_STATS:
+        if key in response:
+            value = response[key]
+            stats[key] = round(value / 1e9, 4) if key.endswith("_duration") else value
+    return stats
+
+
+class Trace:
+    """Timed phases of one request, in the order they finished"""
+
+    def __init__(self, request: str, model: str = ""):
+        self.request = request
+        self.model = model
+        self.ts = time.time()
+        self.phases: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str, **fields):
+        """Time a block; the yielded dict can be filled with details along the way.
+
+        child_cpu is process-wide, so phases overlapping on other threads
+        (parallel tools, prefetch) may see each other's subprocesses.
+        """
+        entry = {"phase": name, **fields}
+        started = time.monotonic()
+        cpu = _child_cpu()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] = round(time.monotonic() - started, 4)
+            child_cpu = _child_cpu() - cpu
+            if child_cpu:
+                entry["child_cpu"] = round(child_cpu, 4)
+            self.add(entry)
+
+    def add(self, entry: Dict[str, Any]):
+        with self._lock:
+            self.phases.append(entry)
+
+    def finish(self) -> "Trace":
+        # Startup phases (system context) ran before the trace was created
+        startup = sum(p["seconds"] for p in self.phases if p.get("startup"))
+        self.seconds = round(time.monotonic() - self._started + startup, 4)
+        return self
+
+    def prefetch_counts(self) -> Tuple[int, int]:
+        """(prefetches started, prefetched results used) in this request"""
+        return prefetch_counts(self.phases)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ts": round(self.ts, 3), "request": self.request[:200], "model": self.model,
+                "seconds": self.seconds, "phases": self.phases}
+
+    def summary(self) -> str:
+        """Per-phase breakdown for --profile"""
+        total = self.seconds or sum(p["seconds"] for p in self.phases) or 1
+        lines = [f"{'phase':<24} {'seconds':>8} {'share':>6}  details"]
+        for p in self.phases:
+            label = p["phase"] + (f" {p['tool']}" if "tool" in p else "")
+            details = []
+            if "prompt_eval_count" in p:
+                details.append(f"prompt {p['prompt_eval_count']} tok in {p.get('prompt_eval_duration', 0):.2f}s")
+            if "eval_count" in p:
+                rate = p["eval_count"] / p["eval_duration"] if p.get("eval_duration") else 0
+                details.append(f"gen {p['eval_count']} tok in {p.get('eval_duration', 0):.2f}s ({rate:.1f} tok/s)")
+            elif "tokens" in p:
+                details.append(f"first token {p.get('first_token', 0):.2f}s, {p['tokens']} tok streamed")
+            if p.get("load_duration", 0) > 0.01:
+                details.append(f"load {p['load_duration']:.2f}s")
+            if p.get("cancelled"):
+                details.append("cancelled after tool call")
+            for key in ("model", "source", "rerun", "started", "child_cpu", "messages"):
+                if key in p:
+                    details.append(f"{key} {p[key]}")
+            lines.append(f"{label:<24} {p['seconds']:>8.3f} {100 * p['seconds'] / total:>5.0f}%  {', '.join(details)}")
+        lines.append(f"{'total':<24} {self.seconds:>8.3f}")
+        started, hits = self.prefetch_counts()
+        if started:
+            lines.append(f"prefetch: {hits} of {started} used, {started - hits} missed")
+        return "\n".join(lines)
+
+
+class TraceLog:
+    """Appends finished traces to a JSONL file"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_TRACE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        if not self.path:
+            return
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def summarize(records: List[Dict[str, Any]]) -> str:
+    """p50/p95 per phase across many traces (agent requests and server tool calls)"""
+    by_phase: Dict[str, List[float]] = {}
+    started = hits = 0
+    for record in records:
+        if "phases" in record:
+            by_phase.setdefault("request", []).append(record["seconds"])
+            counts = prefetch_counts(record["phases"])
+            started, hits = started + counts[0], hits + counts[1]
+            for p in record["phases"]:
+                name = p["phase"] + (f" {p['tool']}" if "tool" in p else "")
+                by_phase.setdefault(name, []).append(p["seconds"])
+        else:
+            # server.py call_tool records
+            by_phase.setdefault(f"server {record.get('tool')}", []).append(record["seconds"])
+    lines = [f"{'phase':<28} {'count':>6} {'p50 s':>8} {'p95 s':>8} {'total s':>9}"]
+    for name, values in sorted(by_phase.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        lines.append(f"{name:<28} {len(values):>6} {_percentile(values, 0.5):>8.3f} {_percentile(values, 0.95):>8.3f} "
+                     f"{sum(values):>9.2f}")
+    if started:
+        lines.append(f"prefetch: {hits} of {started} used ({100 * hits / started:.0f}%)")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize latency traces")
+    parser.add_argument("--log", default=DEFAULT_TRACE_PATH)
+    args = parser.parse_args()
+    try:
+        with open(args.log) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"No traces at {args.log}")
+        return
+    print(summarize(records) if records else "Trace log is empty")
+
+
+if __name__ == "__main__":
+    main()
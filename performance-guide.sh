@@ -42,6 +42,7 @@ Quick switch for one command:
   ./ask "question" qwen2.5-coder:7b
   ./chat qwen2.5-coder:1.5b
   ./agent -m qwen2.5-coder:7b "complex task"
+  ./agent --route -i                  # Let the agent pick 1.5b/3b/7b per request
 
 Set environment variable:
   export QUICK_FIX_MODEL=qwen2.5-coder:7b